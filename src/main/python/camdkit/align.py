@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""Alignment of camera clips with tracking clips
+
+Camera metadata (e.g. from the ARRI, RED or Venice readers) and tracking
+data (e.g. from Mo-Sys F4 or OpenTrackIO) are recorded as separate clips,
+usually at different rates. `merge` matches every camera frame with a
+tracking sample by time, using sorted index joins, and builds one clip at
+the camera frame rate.
+
+Frame times are taken from the timecode or the sample timestamp of each
+clip. Camera readers that do not record either per frame are given the
+time of the first frame, and the following frames are spaced by the
+capture frame rate.
+"""
+
+import dataclasses
+import functools
+from fractions import Fraction
+from typing import Final, Literal, Optional
+
+import numpy as np
+
+from camdkit.clip import Clip
+from camdkit.identifiers import new_sample_ids
+from camdkit.timing_types import Timecode, Timestamp
+
+__all__ = ['MergeResult', 'frame_count', 'frame_times', 'match', 'merge']
+
+KEYS: Final[tuple[str, ...]] = ("timecode", "timestamp")
+METHODS: Final[tuple[str, ...]] = ("nearest", "asof")
+
+_SECONDS_PER_DAY: Final[int] = 24 * 60 * 60
+
+
+@dataclasses.dataclass(frozen=True)
+class MergeResult:
+    """Merged clip, holding the matched camera frames, and the indices of the
+    camera frames and tracking samples matched or not"""
+    clip: Clip
+    camera_frames: np.ndarray
+    tracking_frames: np.ndarray
+    unmatched_camera_frames: np.ndarray
+    unmatched_tracking_frames: np.ndarray
+
+
+@functools.cache
+def _clip_properties() -> tuple[tuple[str, bool], ...]:
+    # (name, is static) of every clip property, in schema order
+    properties = []
+
+    def collect(property_name, property_schema, model_path, field_name) -> None:
+        clip_property = property_schema["clip_property"]
+        properties.append((clip_property, "static" in model_path or clip_property == "duration"))
+
+    full_schema = Clip.make_json_schema(mode='validation', exclude_camdkit_internals=False)
+    Clip.traverse_json_schema(Clip, full_schema, ('',), collect)
+    return tuple(properties)
+
+
+def frame_count(clip: Clip) -> int:
+    """Return the number of frames of a clip: the length of its regular
+    parameters or, without any, its duration at its capture frame rate"""
+    for name, static in _clip_properties():
+        if not static and (values := getattr(clip, name)) is not None:
+            return len(values)
+    if clip.duration is not None and clip.capture_frame_rate is not None:
+        duration = Fraction(clip.duration.num, clip.duration.denom)
+        rate = Fraction(clip.capture_frame_rate.num, clip.capture_frame_rate.denom)
+        return round(duration * rate)
+    return 0
+
+
+def _timecode_seconds(timecode: Timecode) -> float:
+    # time of day labelled by a timecode, frames counted at the nominal rate
+    nominal_rate = Fraction(timecode.frame_rate.num, timecode.frame_rate.denom).__ceil__()
+    return (timecode.hours * 3600 + timecode.minutes * 60 + timecode.seconds
+            + timecode.frames / nominal_rate)
+
+
+def _unwrap_midnight(times: np.ndarray) -> np.ndarray:
+    # timecodes restart at midnight; a backwards step of more than half a
+    # day is taken to be a wrap
+    if len(times) < 2:
+        return times
+    wraps = np.concatenate(([0], np.cumsum(np.diff(times) < -_SECONDS_PER_DAY / 2)))
+    return times + wraps * _SECONDS_PER_DAY
+
+
+def frame_times(clip: Clip, key: Literal["timecode", "timestamp"],
+                start: Timecode | Timestamp | float | None = None) -> np.ndarray:
+    """Return the time of every frame of a clip in seconds: the time of day of
+    its timecodes, or the seconds since the epoch of its sample timestamps.
+
+    `start`: time of the first frame, used when the clip has no timecodes
+    or timestamps; frames are then spaced by the capture frame rate.
+    """
+    if key not in KEYS:
+        raise ValueError(f"key must be one of {', '.join(KEYS)}")
+    values = clip.timing_timecode if key == "timecode" else clip.timing_sample_timestamp
+    if values is not None:
+        if key == "timecode":
+            return _unwrap_midnight(np.fromiter(map(_timecode_seconds, values), dtype=np.float64,
+                                                count=len(values)))
+        return np.fromiter((t.seconds + t.nanoseconds * 1e-9 for t in values), dtype=np.float64,
+                           count=len(values))
+    if start is None:
+        raise ValueError(f"the clip has no {key}s and no start time was given")
+    if clip.capture_frame_rate is None:
+        raise ValueError(f"the clip has no {key}s and no capture frame rate")
+    if isinstance(start, Timecode):
+        start = _timecode_seconds(start)
+    elif isinstance(start, Timestamp):
+        start = start.seconds + start.nanoseconds * 1e-9
+    rate = clip.capture_frame_rate.num / clip.capture_frame_rate.denom
+    return start + np.arange(frame_count(clip), dtype=np.float64) / rate
+
+
+def match(left_times: np.ndarray, right_times: np.ndarray,
+          method: Literal["nearest", "asof"] = "nearest",
+          tolerance: Optional[float] = None) -> np.ndarray:
+    """Return, for every left time, the index of the matching right time, or
+    -1 if there is none within `tolerance` seconds.
+
+    "nearest" matches the closest right time, the earlier one on ties;
+    "asof" matches the last right time not after the left time. Right times
+    need not be sorted.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {', '.join(METHODS)}")
+    left_times = np.asarray(left_times, dtype=np.float64)
+    right_times = np.asarray(right_times, dtype=np.float64)
+    if not len(right_times):
+        return np.full(len(left_times), -1, dtype=np.int64)
+    order = np.argsort(right_times, kind="stable")
+    sorted_times = right_times[order]
+    if method == "asof":
+        positions = np.searchsorted(sorted_times, left_times, side="right") - 1
+        valid = positions >= 0
+        positions = np.maximum(positions, 0)
+    else:
+        after = np.minimum(np.searchsorted(sorted_times, left_times, side="left"), len(sorted_times) - 1)
+        before = np.maximum(after - 1, 0)
+        positions = np.where(np.abs(left_times - sorted_times[before])
+                             <= np.abs(sorted_times[after] - left_times), before, after)
+        valid = np.ones(len(left_times), dtype=bool)
+    if tolerance is not None:
+        valid &= np.abs(left_times - sorted_times[positions]) <= tolerance
+    return np.where(valid, order[positions], -1)
+
+
+def _take(values, indices: list[int]) -> tuple:
+    values = tuple(values)
+    return tuple(values[i] for i in indices)
+
+
+def merge(camera_clip: Clip, tracking_clip: Clip,
+          key: Literal["timecode", "timestamp"] = "timecode",
+          method: Literal["nearest", "asof"] = "nearest",
+          tolerance: Optional[float] = None,
+          camera_start: Timecode | Timestamp | float | None = None,
+          tracking_start: Timecode | Timestamp | float | None = None) -> MergeResult:
+    """Merge a camera clip and a tracking clip into a clip at the camera frame
+    rate, holding the camera frames matched with a tracking sample.
+
+    Regular parameters come from the camera clip where it has them, and from
+    the matched tracking samples otherwise; static parameters likewise. The
+    sample ids are those of the camera frames, or new ones: a tracking
+    sample can be matched with several camera frames. The sample rate of the
+    merged clip is the capture frame rate of the camera, and its duration
+    that of the matched frames.
+
+    `key`: "timecode" or "timestamp", the times to match.
+    `method`: "nearest" or "asof", see `match`.
+    `tolerance`: largest difference in seconds between matched times, by
+    default half the median interval between tracking samples.
+    `camera_start`, `tracking_start`: time of the first frame of clips
+    without timecodes or timestamps, see `frame_times`.
+    """
+    camera_times = frame_times(camera_clip, key, camera_start)
+    tracking_times = frame_times(tracking_clip, key, tracking_start)
+    if tolerance is None and len(tracking_times) > 1:
+        tolerance = float(np.median(np.abs(np.diff(tracking_times)))) / 2
+    matches = match(camera_times, tracking_times, method, tolerance)
+    matched = matches >= 0
+    camera_frames = np.flatnonzero(matched)
+    tracking_frames = matches[matched]
+    used = np.zeros(len(tracking_times), dtype=bool)
+    used[tracking_frames] = True
+
+    result = Clip()
+    camera_indices = camera_frames.tolist()
+    tracking_indices = tracking_frames.tolist()
+    for name, static in _clip_properties():
+        if name == "duration":
+            continue
+        if static:
+            value = getattr(camera_clip, name)
+            if value is None:
+                value = getattr(tracking_clip, name)
+            if value is not None:
+                setattr(result, name, value)
+            continue
+        if (values := getattr(camera_clip, name)) is not None:
+            if camera_indices:
+                setattr(result, name, _take(values, camera_indices))
+        elif name == "sample_id":
+            if camera_indices:
+                result.sample_id = tuple(new_sample_ids(len(camera_indices)))
+        elif (values := getattr(tracking_clip, name)) is not None:
+            if tracking_indices:
+                setattr(result, name, _take(values, tracking_indices))
+    if camera_clip.capture_frame_rate is not None and camera_indices:
+        result.timing_sample_rate = (camera_clip.capture_frame_rate,) * len(camera_indices)
+        rate = Fraction(camera_clip.capture_frame_rate.num, camera_clip.capture_frame_rate.denom)
+        result.duration = len(camera_indices) / rate
+
+    return MergeResult(clip=result,
+                       camera_frames=camera_frames,
+                       tracking_frames=tracking_frames,
+                       unmatched_camera_frames=np.flatnonzero(~matched),
+                       unmatched_tracking_frames=np.flatnonzero(~used))
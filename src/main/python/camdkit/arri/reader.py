@@ -7,10 +7,12 @@
 '''ARRI camera metadata reader'''
 
 import csv
+import itertools
 import math
 import typing
 from fractions import Fraction
 
+import camdkit.mapped_io as mapped_io
 import camdkit.model
 import camdkit.utils as utils
 
@@ -27,69 +29,149 @@ def t_number_from_linear_iris_value(lin_value: int) -> typing.Optional[Fraction]
   """
   return math.pow(2, (lin_value - 1000)/1000/2)
 
-def to_clip(csv_path: str) -> camdkit.model.Clip:
-  """Read ARRI camera metadata into a `Clip`. `csv_path` is the path to a CSV
-  file extracted using ARRI Meta Extract (AME)."""
+# Frames per chunk yielded by `iter_chunks`
+DEFAULT_CHUNK_FRAMES = 1024
+
+def _static_properties(columns: dict, row: list) -> dict:
+  """Return the values of the static clip properties from the first row"""
+  properties = {}
+
+  properties["iso"] = int(row[columns["Exposure Index ASA"]])
+
+  properties["camera_make"] = "ARRI"
+
+  properties["camera_model"] = row[columns["Camera Model"]]
+
+  properties["camera_serial_number"] = row[columns["Camera Serial Number"]]
 
-  with open(csv_path, encoding="utf-8") as csvfile:
-    csv_data = list(csv.DictReader(csvfile, dialect="excel-tab"))
+  lens_model = row[columns["Lens Model"]]
+
+  if lens_model.startswith("ARRI "):
+    properties["lens_make"] = "ARRI"
+    properties["lens_model"] = lens_model[5:]
+  else:
+    properties["lens_model"] = lens_model
+
+  properties["lens_serial_number"] = row[columns["Lens Serial Number"]]
+
+  properties["capture_frame_rate"] = utils.guess_fps(Fraction(row[columns["Project FPS"]]))
+
+  properties["shutter_angle"] = float(row[columns["Shutter Angle"]])
+
+  properties["anamorphic_squeeze"] = Fraction(row[columns["Lens Squeeze"]])
+
+  pix_dims = camdkit.model.Dimensions(
+    width=int(row[columns["Image Width"]]),
+    height=int(row[columns["Image Height"]])
+  )
+  pixel_pitch = _CAMERA_FAMILY_PIXEL_PITCH_MAP[(row[columns["Camera Family"]], pix_dims.width)]
+  properties["active_sensor_physical_dimensions"] = camdkit.model.Dimensions(
+      width=pix_dims.width * pixel_pitch / 1000.0,
+      height=pix_dims.height * pixel_pitch / 1000.0
+    )
 
-    n_frames = len(csv_data)
+  return properties
 
-    if n_frames <= 0:
+def iter_chunks(csv_path: str, chunk_frames: int = DEFAULT_CHUNK_FRAMES) -> typing.Iterator[camdkit.model.Clip]:
+  """Read ARRI camera metadata as a sequence of `Clip` objects of at most
+  `chunk_frames` frames each. `csv_path` is the path to a CSV file extracted
+  using ARRI Meta Extract (AME). The file is memory-mapped and read in a
+  single pass and only the needed columns are parsed, so memory use does not
+  depend on the length of the take. Every chunk carries the static metadata
+  and a duration covering its own frames; the nominal focal length is set on
+  a chunk if it is constant over that chunk."""
+
+  if chunk_frames < 1:
+    raise ValueError("chunk_frames must be strictly positive")
+
+  with mapped_io.open_lines(csv_path) as lines:
+    reader = csv.reader(lines, dialect="excel-tab")
+
+    header = next(reader, None)
+    # blank lines are skipped, as by csv.DictReader
+    rows = filter(None, reader)
+    first_row = next(rows, None) if header is not None else None
+
+    if first_row is None:
       raise ValueError("No data")
 
-    clip = camdkit.model.Clip()
+    # later columns win over earlier columns of the same name (AME repeats
+    # "Master TC"), as with csv.DictReader
+    columns = {name: i for i, name in enumerate(header)}
 
-    if csv_data[0]["Lens Distance Unit"] != "Meter":
-      raise ValueError(f"Unsupported lens distance unit: {csv_data[0]['Lens Distance Unit']!r}; expected 'Meter'")
+    distance_unit = first_row[columns["Lens Distance Unit"]]
+    if distance_unit != "Meter":
+      raise ValueError(f"Unsupported lens distance unit: {distance_unit!r}; expected 'Meter'")
 
-    clip.iso = int(csv_data[0]["Exposure Index ASA"])
+    fps = Fraction(first_row[columns["Project FPS"]])
 
-    clip.duration = len(csv_data)/Fraction(csv_data[0]["Project FPS"])
+    static_properties = _static_properties(columns, first_row)
 
-    clip.camera_make = "ARRI"
+    focal_length_index = columns["Lens Focal Length"]
+    focus_distance_index = columns["Lens Focus Distance"]
+    linear_iris_index = columns["Lens Linear Iris"]
 
-    clip.camera_model = csv_data[0]["Camera Model"]
+    focal_lengths = set()
+    focus_distances = []
+    t_numbers = []
 
-    clip.camera_serial_number = csv_data[0]["Camera Serial Number"]
+    def make_chunk() -> camdkit.model.Clip:
+      clip = camdkit.model.Clip()
 
-    lens_model = csv_data[0]["Lens Model"]
+      for name, value in static_properties.items():
+        setattr(clip, name, value)
 
-    if lens_model.startswith("ARRI "):
-      clip.lens_make = "ARRI"
-      clip.lens_model = lens_model[5:]
-    else:
-      clip.lens_model = lens_model
+      clip.duration = len(focus_distances)/fps
 
-    clip.lens_serial_number = csv_data[0]["Lens Serial Number"]
+      if len(focal_lengths) == 1:
+        clip.lens_nominal_focal_length = float(focal_lengths.pop())
 
-    clip.capture_frame_rate = utils.guess_fps(Fraction(csv_data[0]["Project FPS"]))
+      clip.lens_focus_distance = tuple(focus_distances)
 
-    clip.shutter_angle = float(csv_data[0]["Shutter Angle"])
+      clip.lens_t_number = tuple(t_numbers)
 
-    clip.anamorphic_squeeze = Fraction(csv_data[0]["Lens Squeeze"])
+      # TODO: Entrance Pupil Position
 
-    pix_dims = camdkit.model.Dimensions(
-      width=int(csv_data[0]["Image Width"]),
-      height=int(csv_data[0]["Image Height"])
-    )
-    pixel_pitch = _CAMERA_FAMILY_PIXEL_PITCH_MAP[(csv_data[0]["Camera Family"], pix_dims.width)]
-    clip.active_sensor_physical_dimensions = camdkit.model.Dimensions(
-        width=pix_dims.width * pixel_pitch / 1000.0,
-        height=pix_dims.height * pixel_pitch / 1000.0
-      )
+      return clip
+
+    for row in itertools.chain((first_row,), rows):
+      focal_lengths.add(row[focal_length_index])
+      focus_distances.append(float(row[focus_distance_index]))
+      t_numbers.append(t_number_from_linear_iris_value(int(row[linear_iris_index])))
+
+      if len(focus_distances) == chunk_frames:
+        yield make_chunk()
+        focal_lengths = set()
+        focus_distances = []
+        t_numbers = []
+
+    if focus_distances:
+      yield make_chunk()
+
+def to_clip(csv_path: str) -> camdkit.model.Clip:
+  """Read ARRI camera metadata into a `Clip`. `csv_path` is the path to a CSV
+  file extracted using ARRI Meta Extract (AME)."""
+
+  clip = None
+  duration = Fraction(0)
+  nominal_focal_lengths = set()
+  focus_distances = []
+  t_numbers = []
+
+  for chunk in iter_chunks(csv_path):
+    if clip is None:
+      clip = chunk
+    duration += Fraction(chunk.duration.num, chunk.duration.denom)
+    nominal_focal_lengths.add(chunk.lens_nominal_focal_length)
+    focus_distances.extend(chunk.lens_focus_distance)
+    t_numbers.extend(chunk.lens_t_number)
 
-    focal_lengths = set([m["Lens Focal Length"] for m in csv_data])
-    if len(focal_lengths) == 1:
-      focal_length = float(focal_lengths.pop())
-      clip.lens_nominal_focal_length = focal_length
+  clip.duration = duration
 
-    clip.lens_focus_distance = tuple(float(m["Lens Focus Distance"]) for m in csv_data)
+  clip.lens_nominal_focal_length = nominal_focal_lengths.pop() if len(nominal_focal_lengths) == 1 else None
 
-    clip.lens_t_number = tuple(t_number_from_linear_iris_value(int(m["Lens Linear Iris"])) for m in csv_data)
+  clip.lens_focus_distance = tuple(focus_distances)
 
-    # TODO: Entrance Pupil Position
-    # TODO: Sensor physical dimensions
+  clip.lens_t_number = tuple(t_numbers)
 
   return clip
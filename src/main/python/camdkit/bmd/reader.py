@@ -6,49 +6,113 @@
 
 '''Blackmagic camera reader'''
 
+import array
+import math
 import typing
-import re
 from fractions import Fraction
 
 import camdkit.model
 
-_CLIP_HEADING_RE = re.compile(r"^Clip Metadata$")
-_FRAME_HEADING_RE = re.compile(r"^Frame (\d+) Metadata$")
-_METADATA_LINE_RE = re.compile(r"^([^:]+): (.+)$")
+_CLIP_HEADING = "Clip Metadata"
+_FRAME_HEADING_PREFIX = "Frame "
+_FRAME_HEADING_SUFFIX = " Metadata"
+_METADATA_SEPARATOR = ": "
+
+# keys retained from the clip section and from the first frame section
+_CLIP_KEYS = frozenset((
+  "manufacturer", "camera_id", "camera_type", "firmware_version", "crop_size",
+  "lens_type", "anamorphic", "anamorphic_enable"
+))
+_FIRST_FRAME_KEYS = frozenset(("sensor_rate", "shutter_value", "iso"))
+
+# per-frame keys, with the unit suffix or prefix stripped from their values
+_FOCAL_LENGTH_KEY = "focal_length"
+_DISTANCE_KEY = "distance"
+_APERTURE_KEY = "aperture"
+# T-stop or f-stop prefix of aperture values, e.g. "T2.8" or "f2.8"
+_APERTURE_PREFIXES = ("T", "t", "F", "f")
+
+_NO_SECTION, _CLIP_SECTION, _FRAME_SECTION = range(3)
+
+class _MetadataStream:
+  """Single-pass state machine over ExtractMetadata output, retaining only
+  the values used by `to_clip`"""
+
+  def __init__(self):
+    self.clip_data = {}
+    self.first_frame_data = {}
+    self.frame_count = 0
+    self.focal_lengths = set()
+    self.distances = array.array("d")
+    self.apertures = array.array("d")
+    self._section = _NO_SECTION
+
+  def _is_frame_heading(self, line: str) -> bool:
+    return (line.startswith(_FRAME_HEADING_PREFIX)
+            and line.endswith(_FRAME_HEADING_SUFFIX)
+            and line[len(_FRAME_HEADING_PREFIX):-len(_FRAME_HEADING_SUFFIX)].isdigit())
+
+  def _start_frame(self) -> None:
+    self._section = _FRAME_SECTION
+    self.frame_count += 1
+    self.distances.append(math.nan)
+    self.apertures.append(math.nan)
+
+  def feed(self, line: str) -> None:
+    line = line.rstrip("\r\n")
+
+    key, separator, value = line.partition(_METADATA_SEPARATOR)
+
+    if separator and key and value and ":" not in key:
+      if self._section == _FRAME_SECTION:
+        if key == _DISTANCE_KEY:
+          self.distances[-1] = float(value.removesuffix("mm"))
+        elif key == _APERTURE_KEY:
+          self.apertures[-1] = float(value[1:] if value.startswith(_APERTURE_PREFIXES) else value)
+        elif key == _FOCAL_LENGTH_KEY:
+          self.focal_lengths.add(value.removesuffix("mm"))
+        elif self.frame_count == 1 and key in _FIRST_FRAME_KEYS:
+          self.first_frame_data[key] = value
+      elif self._section == _CLIP_SECTION and key in _CLIP_KEYS:
+        self.clip_data[key] = value
+
+    elif line == _CLIP_HEADING:
+      self._section = _CLIP_SECTION
+
+    elif self._is_frame_heading(line):
+      self._start_frame()
 
 
 def to_clip(metadata_file: typing.IO) -> camdkit.model.Clip:
   """Read Blackmagic camera metadata into a `Clip`.
   `metadata_raw_sdk`: Output of the ExtractMetadata sample tool from the Blackmagic RAW SDK
+
+  The file is read in a single pass and only the values used are retained,
+  so memory use grows by a few bytes per frame regardless of the amount of
+  metadata per frame.
   """
 
-  clip_data = {}
-  frame_data = []
-  cur_metadata = {}
+  stream = _MetadataStream()
 
   for line in metadata_file:
+    stream.feed(line)
 
-    m = _METADATA_LINE_RE.match(line)
-
-    if m:
-      cur_metadata[m.group(1)] = m.group(2)
-
-    elif _CLIP_HEADING_RE.match(line):
-      cur_metadata = clip_data
+  if stream.frame_count == 0:
+    raise ValueError("Camera data does not contain frame information")
 
-    elif _FRAME_HEADING_RE.match(line):
-      frame_data.append({})
-      cur_metadata = frame_data[-1]
+  if any(math.isnan(v) for v in stream.distances):
+    raise ValueError("Camera data does not contain a distance for every frame")
 
+  if any(math.isnan(v) for v in stream.apertures):
+    raise ValueError("Camera data does not contain an aperture for every frame")
 
-  if len(frame_data) == 0:
-    raise ValueError("Camera data does not contain frame information")
+  clip_data = stream.clip_data
 
   # read clip metadata
   clip = camdkit.model.Clip()
 
   # read frame metadata
-  first_frame_data = frame_data[0]
+  first_frame_data = stream.first_frame_data
 
   # clip metadata
 
@@ -56,27 +120,29 @@ def to_clip(metadata_file: typing.IO) -> camdkit.model.Clip:
   if clip_data.get("camera_type") == "Blackmagic URSA Mini Pro 12K":
     crop_size = clip_data.get("crop_size")
     if crop_size is not None:
-      width, height, _ = clip_data.get("crop_size").split(",")
+      width, height, _ = crop_size.split(",")
       clip.active_sensor_physical_dimensions = camdkit.model.Dimensions(
         width=round(int(width) * 270030 / 12288),
         height=round(int(height) * 14250 / 6480)
       )
 
   # frame rate
+  frame_rate = None
   sensor_rate = first_frame_data.get("sensor_rate")
   if sensor_rate is not None:
     num, denom, _ = sensor_rate.split(",")
-    clip.capture_frame_rate = Fraction(int(num), int(denom))
+    frame_rate = Fraction(int(num), int(denom))
+    clip.capture_frame_rate = frame_rate
 
   # duration
-  if clip.capture_frame_rate is not None:
-    clip.duration = clip.capture_frame_rate * len(frame_data)
+  if frame_rate is not None:
+    clip.duration = stream.frame_count / frame_rate
 
   # anamorphic_squeeze
   anamorphic_enable = int(clip_data.get("anamorphic_enable", 0))
   anamorphic = clip_data.get("anamorphic")
   if anamorphic_enable != 0 and anamorphic is not None:
-    clip.anamorphic_squeeze = Fraction(anamorphic[:-1])
+    clip.anamorphic_squeeze = Fraction(anamorphic.removesuffix("x"))
 
   # ISO
   iso = first_frame_data.get("iso", None)
@@ -94,7 +160,6 @@ def to_clip(metadata_file: typing.IO) -> camdkit.model.Clip:
   clip.lens_model = clip_data.get("lens_type")
 
   # clip.lens_serial_number is not supported
-  # clip.active_sensor_physical_dimensions is not supported
 
   # white_balance
   # white_balance_kelvin = first_frame_data.get("white_balance_kelvin")
@@ -104,22 +169,21 @@ def to_clip(metadata_file: typing.IO) -> camdkit.model.Clip:
   # shutter angle
   shutter_value = first_frame_data.get("shutter_value")
   if shutter_value is not None:
-    clip.shutter_angle = float(shutter_value[:-1])
+    clip.shutter_angle = float(shutter_value.removesuffix("°"))
 
   # sampled metadata
 
   # focal_length
-    focal_lengths = set([m["focal_length"][:-2] for m in frame_data])
-    if len(focal_lengths) == 1:
-      focal_length = float(focal_lengths.pop())
-      clip.lens_nominal_focal_length = focal_length
+  if len(stream.focal_lengths) == 1:
+    focal_length = float(stream.focal_lengths.pop())
+    clip.lens_nominal_focal_length = focal_length
 
   # focus_position
-  clip.lens_focus_distance = tuple(float(m["distance"][:-2]) for m in frame_data)
+  clip.lens_focus_distance = tuple(stream.distances)
 
   # entrance_pupil_offset not supported
 
   # t_number
-  clip.lens_t_number = tuple(float(m["aperture"][1:]) for m in frame_data)
+  clip.lens_t_number = tuple(stream.apertures)
 
   return clip
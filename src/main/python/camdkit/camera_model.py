@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""Batch generation of projection and view matrices for renderers
+
+Matrices follow the OpenGL conventions: camera space has x to the right, y
+up and looks down -z, and the projection maps the view frustum to normalized
+device coordinates in [-1, 1]. Matrices are stored row-major and act on
+column vectors, i.e. p_clip = projection @ view @ p_stage. View matrices map
+stage coordinates (right-handed, Z up) to camera space.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from camdkit.clip import Clip
+
+__all__ = ['CameraMatrices', 'projection_matrices', 'transform_matrices']
+
+
+@dataclass(frozen=True)
+class CameraMatrices:
+    """Per-frame camera matrices and frustum of a clip.
+
+    `projection` and `view` are (N, 4, 4) arrays, `view` being None when the
+    clip has no transforms. Fields of view are in degrees, and the frustum
+    extents `left`, `right`, `bottom` and `top` are measured on the near
+    plane, as taken by glFrustum.
+    """
+    projection: np.ndarray
+    view: Optional[np.ndarray]
+    horizontal_fov: np.ndarray
+    vertical_fov: np.ndarray
+    left: np.ndarray
+    right: np.ndarray
+    bottom: np.ndarray
+    top: np.ndarray
+    near: float
+    far: float
+
+
+def _rotations(pan: np.ndarray, tilt: np.ndarray, roll: np.ndarray) -> np.ndarray:
+    # intrinsic rotations about Z (pan), then X (tilt), then Y (roll)
+    cp, sp = np.cos(np.radians(pan)), np.sin(np.radians(pan))
+    ct, st = np.cos(np.radians(tilt)), np.sin(np.radians(tilt))
+    cr, sr = np.cos(np.radians(roll)), np.sin(np.radians(roll))
+    zeros, ones = np.zeros_like(cp), np.ones_like(cp)
+    rz = np.stack((cp, -sp, zeros, sp, cp, zeros, zeros, zeros, ones), axis=-1).reshape(-1, 3, 3)
+    rx = np.stack((ones, zeros, zeros, zeros, ct, -st, zeros, st, ct), axis=-1).reshape(-1, 3, 3)
+    ry = np.stack((cr, zeros, sr, zeros, ones, zeros, -sr, zeros, cr), axis=-1).reshape(-1, 3, 3)
+    return rz @ rx @ ry
+
+
+def transform_matrices(clip: Clip) -> Optional[np.ndarray]:
+    """Return the (N, 4, 4) compound transforms of a clip, mapping camera
+    sensor coordinates to stage coordinates, or None without transforms"""
+    transforms = clip.transforms
+    if not transforms:
+        return None
+    n = len(transforms)
+    depth = max(len(frame) for frame in transforms)
+    result = np.broadcast_to(np.eye(4), (n, 4, 4)).copy()
+    for level in range(depth):
+        # frames with shorter transform chains compose with the identity
+        present = np.array([len(frame) > level for frame in transforms])
+        chain = [frame[level] for frame in transforms if len(frame) > level]
+        values = np.array([(t.translation.x or 0.0, t.translation.y or 0.0, t.translation.z or 0.0,
+                            t.rotation.pan or 0.0, t.rotation.tilt or 0.0, t.rotation.roll or 0.0,
+                            1.0 if t.scale is None or t.scale.x is None else t.scale.x,
+                            1.0 if t.scale is None or t.scale.y is None else t.scale.y,
+                            1.0 if t.scale is None or t.scale.z is None else t.scale.z)
+                           for t in chain])
+        matrices = np.broadcast_to(np.eye(4), (len(chain), 4, 4)).copy()
+        matrices[:, :3, :3] = _rotations(values[:, 3], values[:, 4], values[:, 5]) * values[:, None, 6:9]
+        matrices[:, :3, 3] = values[:, 0:3]
+        result[present] = result[present] @ matrices
+    return result
+
+
+# camera sensor axes (x right, y forward, z up) to OpenGL camera axes
+_SENSOR_TO_GL = np.array([[1.0, 0.0, 0.0, 0.0],
+                          [0.0, 0.0, 1.0, 0.0],
+                          [0.0, -1.0, 0.0, 0.0],
+                          [0.0, 0.0, 0.0, 1.0]])
+
+
+def projection_matrices(clip: Clip, near: float, far: float,
+                        use_entrance_pupil: bool = True) -> CameraMatrices:
+    """Return the projection and view matrices of every frame of a clip.
+
+    The projection is built from the pinhole focal length, the active sensor
+    physical dimensions, the anamorphic squeeze and the projection offset.
+    The horizontal field of view is that of the de-squeezed image. With
+    `use_entrance_pupil`, the view is centred on the entrance pupil rather
+    than the sensor.
+    """
+    if not 0.0 < near < far:
+        raise ValueError("clipping planes must satisfy 0 < near < far")
+    focal_length = clip.lens_pinhole_focal_length
+    if not focal_length:
+        raise ValueError("projection matrices require the pinhole focal length")
+    sensor = clip.active_sensor_physical_dimensions
+    if sensor is None:
+        raise ValueError("projection matrices require the active sensor physical dimensions")
+    f = np.array(focal_length, dtype=np.float64)
+    n = len(f)
+    squeeze = clip.anamorphic_squeeze
+    squeeze = 1.0 if squeeze is None else squeeze.num / squeeze.denom
+    offsets = clip.lens_projection_offset
+    offset_x = np.array([o.x for o in offsets]) if offsets else np.zeros(n)
+    offset_y = np.array([o.y for o in offsets]) if offsets else np.zeros(n)
+    width, height = sensor.width, sensor.height
+
+    sx = 2.0 * f / (width * squeeze)
+    sy = 2.0 * f / height
+    # principal point in NDC; screen y points down, NDC y up
+    cx = 2.0 * offset_x / width
+    cy = -2.0 * offset_y / height
+    projection = np.zeros((n, 4, 4))
+    projection[:, 0, 0] = sx
+    projection[:, 0, 2] = -cx
+    projection[:, 1, 1] = sy
+    projection[:, 1, 2] = -cy
+    projection[:, 2, 2] = -(far + near) / (far - near)
+    projection[:, 2, 3] = -2.0 * far * near / (far - near)
+    projection[:, 3, 2] = -1.0
+
+    view = None
+    camera_to_stage = transform_matrices(clip)
+    if camera_to_stage is not None:
+        if len(camera_to_stage) != n:
+            raise ValueError("the clip has a different number of transforms and focal lengths")
+        pupil = clip.lens_entrance_pupil_offset
+        if use_entrance_pupil and pupil:
+            shift = np.broadcast_to(np.eye(4), (n, 4, 4)).copy()
+            shift[:, 1, 3] = pupil
+            camera_to_stage = camera_to_stage @ shift
+        view = _SENSOR_TO_GL @ np.linalg.inv(camera_to_stage)
+
+    return CameraMatrices(projection=projection,
+                          view=view,
+                          horizontal_fov=np.degrees(2.0 * np.arctan(1.0 / sx)),
+                          vertical_fov=np.degrees(2.0 * np.arctan(1.0 / sy)),
+                          left=near * (-1.0 - cx) / sx,
+                          right=near * (1.0 - cx) / sx,
+                          bottom=near * (-1.0 - cy) / sy,
+                          top=near * (1.0 - cy) / sy,
+                          near=near,
+                          far=far)
@@ -7,15 +7,30 @@
 '''Canon camera reader'''
 
 import csv
+import functools
 import typing
 import struct
 from fractions import Fraction
 
+import numpy as np
+
 import camdkit.model
 
 def _read_float32_as_hex(float32_hex: str) -> float:
   return struct.unpack('>f', bytes.fromhex(float32_hex))[0]
 
+def _read_float32_column_as_hex(float32_hexes: typing.Sequence[str]) -> np.ndarray:
+  """Decode a column of big-endian float32 hex strings with a single
+  `bytes.fromhex` call"""
+  if any(len(h) != 8 for h in float32_hexes):
+    raise ValueError("float32 hex values must be 8 hex digits long")
+  return np.frombuffer(bytes.fromhex("".join(float32_hexes)), dtype=">f4")
+
+@functools.lru_cache(maxsize=4096)
+def _parse_rational(rational: str) -> Fraction:
+  """Parse a "num/denom" value; per-frame columns repeat few distinct values"""
+  return Fraction(rational)
+
 def to_clip(static_csv: typing.IO, frames_csv: typing.IO) -> camdkit.model.Clip:
   """Read Canon camera metadata into a `Clip`.
   `static_csv`: Static camera metadata.
@@ -26,9 +41,27 @@ def to_clip(static_csv: typing.IO, frames_csv: typing.IO) -> camdkit.model.Clip:
   clip_metadata = next(csv.DictReader(static_csv))
   clip = camdkit.model.Clip()
 
-  # read frame metadata
-  frame_data = list(csv.DictReader(frames_csv))
-  first_frame_data = frame_data[0]
+  # read frame metadata, keeping the first frame whole and only the
+  # sampled columns of the others
+  frames_reader = csv.reader(frames_csv)
+  header = next(frames_reader)
+  # blank lines are skipped, as by csv.DictReader
+  rows = filter(None, frames_reader)
+  first_row = next(rows)
+  first_frame_data = dict(zip(header, first_row))
+
+  columns = {name: i for i, name in enumerate(header)}
+  focal_length_index = columns["FocalLength"]
+  focus_position_index = columns["FocusPosition"]
+  aperture_number_index = columns["ApertureNumber"]
+
+  focal_lengths = [first_row[focal_length_index]]
+  focus_positions = [first_row[focus_position_index]]
+  aperture_numbers = [first_row[aperture_number_index]]
+  for row in rows:
+    focal_lengths.append(row[focal_length_index])
+    focus_positions.append(row[focus_position_index])
+    aperture_numbers.append(row[aperture_number_index])
 
   # clip metadata
 
@@ -61,20 +94,20 @@ def to_clip(static_csv: typing.IO, frames_csv: typing.IO) -> camdkit.model.Clip:
   # sampled metadata
 
   # focal_length
-  focal_lengths = set(Fraction(m["FocalLength"]) for m in frame_data)
-  if len(focal_lengths) == 1:
-    focal_length = float(focal_lengths.pop())
+  distinct_focal_lengths = set(map(_parse_rational, set(focal_lengths)))
+  if len(distinct_focal_lengths) == 1:
+    focal_length = float(distinct_focal_lengths.pop())
     clip.lens_nominal_focal_length = focal_length
 
   # focus_position
-  clip.lens_focus_distance = tuple(_read_float32_as_hex(m["FocusPosition"]) for m in frame_data)
+  clip.lens_focus_distance = tuple(_read_float32_column_as_hex(focus_positions).tolist())
 
   # entrance_pupil_offset not supported
 
   # t_number
   if int(first_frame_data['ApertureMode']) == 2:
-    clip.lens_t_number = tuple(Fraction(m["ApertureNumber"]) for m in frame_data)
+    clip.lens_t_number = tuple(map(_parse_rational, aperture_numbers))
   elif int(first_frame_data['ApertureMode']) == 1:
-    clip.lens_f_number = tuple(Fraction(m["ApertureNumber"]) for m in frame_data)
+    clip.lens_f_number = tuple(map(_parse_rational, aperture_numbers))
 
   return clip
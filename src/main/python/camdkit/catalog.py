@@ -0,0 +1,416 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""Catalog of converted clips
+
+A `Catalog` indexes the clips converted by `camdkit.ingest` into an SQLite
+database: the static parameters of every clip, the minimum, maximum and
+mean of its numeric regular parameters, and the range of its timecodes and
+sample timestamps. Takes are then found by query without reading the clip
+files, e.g. all takes shot with a given lens at a 35 mm focal length
+between two timecodes.
+
+Parameters are named after the clip properties, e.g. "lens_model" or
+"lens_pinhole_focal_length"; the members of structured parameters are
+named with a dot, e.g. "lens_encoders.focus" or
+"active_sensor_physical_dimensions.width". Rationals are indexed as their
+value.
+
+Updates are incremental: like the ingest manifest, a file whose size and
+modification time are unchanged is not read again.
+"""
+
+import functools
+import json
+import math
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from numbers import Number
+from typing import Any, Callable, Final, Iterator, Mapping, Optional, Sequence
+
+import cbor2
+
+from camdkit.clip import Clip
+from camdkit.ingest import find_files
+from camdkit.session import load_clip
+from camdkit.timing_types import Timecode, Timestamp
+
+__all__ = ['Statistics', 'CatalogEntry', 'CatalogUpdate', 'Catalog']
+
+CATALOG_VERSION: Final[int] = 1
+CLIP_EXTENSIONS: Final[tuple[str, ...]] = (".json", ".cbor")
+
+_SECONDS_PER_DAY: Final[int] = 24 * 60 * 60
+
+# Regular parameters indexed as the time range of the clip rather than as
+# statistics
+_TIME_PARAMETERS: Final[frozenset[str]] = frozenset(("timing_timecode",
+                                                     "timing_sample_timestamp",
+                                                     "timing_recorded_timestamp"))
+
+_SCHEMA: Final[str] = """
+CREATE TABLE clips (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    frame_count INTEGER NOT NULL,
+    source_id TEXT,
+    source_number INTEGER,
+    timecode_start REAL,
+    timecode_end REAL,
+    timestamp_start REAL,
+    timestamp_end REAL
+);
+CREATE TABLE static_parameters (
+    clip_id INTEGER NOT NULL REFERENCES clips(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value,
+    PRIMARY KEY (clip_id, name)
+);
+CREATE INDEX static_parameters_by_value ON static_parameters (name, value);
+CREATE TABLE regular_statistics (
+    clip_id INTEGER NOT NULL REFERENCES clips(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    minimum REAL NOT NULL,
+    maximum REAL NOT NULL,
+    mean REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (clip_id, name)
+);
+CREATE INDEX regular_statistics_by_range ON regular_statistics (name, minimum, maximum);
+CREATE INDEX clips_by_timecode ON clips (timecode_start, timecode_end);
+CREATE INDEX clips_by_timestamp ON clips (timestamp_start, timestamp_end);
+"""
+
+
+@functools.cache
+def _clip_parameters() -> dict[tuple[str, ...], tuple[str, bool]]:
+    # (clip property name, is static) of every clip property, by its path in
+    # the JSON form of a clip
+    parameters = {}
+
+    def collect(property_name, property_schema, model_path, field_name) -> None:
+        path = tuple(p for p in model_path if p) + (property_name,)
+        parameters[path] = (property_schema["clip_property"], path[0] == "static")
+
+    full_schema = Clip.make_json_schema(mode='validation', exclude_camdkit_internals=False)
+    Clip.traverse_json_schema(Clip, full_schema, ('',), collect)
+    return parameters
+
+
+def _is_rational(value: Any) -> bool:
+    return isinstance(value, dict) and value.keys() == {"num", "denom"}
+
+
+def _sql_value(value: Any) -> Any:
+    """Return the value stored for a parameter value"""
+    if _is_rational(value):
+        return value["num"] / value["denom"]
+    if hasattr(value, "num") and hasattr(value, "denom"):
+        return value.num / value.denom
+    if isinstance(value, (str, bool, int, float)) or value is None:
+        return value
+    return json.dumps(value, sort_keys=True)
+
+
+def _leaves(name: str, value: Any) -> Iterator[tuple[str, Any]]:
+    # (name, value) of the scalar members of a structured value
+    if isinstance(value, dict) and not _is_rational(value):
+        for key, member in value.items():
+            yield from _leaves(f"{name}.{key}", member)
+    else:
+        yield name, value
+
+
+def _parameters(content: Mapping[str, Any]) -> Iterator[tuple[str, bool, Any]]:
+    # (clip property name, is static, value) of every parameter of a clip in
+    # its JSON form
+    parameters = _clip_parameters()
+
+    def walk(level: Mapping[str, Any], path: tuple[str, ...]) -> Iterator[tuple[str, bool, Any]]:
+        for key, value in level.items():
+            if (parameter := parameters.get(path + (key,))) is not None:
+                yield parameter + (value,)
+            elif isinstance(value, dict):
+                yield from walk(value, path + (key,))
+            else:
+                raise ValueError(f"{'.'.join(path + (key,))} is not a clip parameter")
+
+    if not isinstance(content, dict):
+        raise ValueError("the file does not hold a clip")
+    return walk(content, ())
+
+
+def _timecode_seconds(hours: int, minutes: int, seconds: int, frames: int, frame_rate: float) -> float:
+    # time of day labelled by a timecode, as in camdkit.align.frame_times
+    return hours * 3600 + minutes * 60 + seconds + frames / math.ceil(frame_rate)
+
+
+def _timecode_range(timecodes: Sequence[dict]) -> tuple[float, float]:
+    first, last = ((_timecode_seconds(t["hours"], t["minutes"], t["seconds"], t["frames"],
+                                      _sql_value(t["frameRate"]))) for t in (timecodes[0], timecodes[-1]))
+    # a clip ending before it starts crossed midnight
+    return first, (last + _SECONDS_PER_DAY if last < first else last)
+
+
+def _timestamp_range(timestamps: Sequence[dict]) -> tuple[float, float]:
+    first, last = (t["seconds"] + t["nanoseconds"] * 1e-9 for t in (timestamps[0], timestamps[-1]))
+    return first, last
+
+
+def _seconds(value: Timecode | Timestamp | float) -> float:
+    if isinstance(value, Timecode):
+        return _timecode_seconds(value.hours, value.minutes, value.seconds, value.frames,
+                                 _sql_value(value.frame_rate))
+    if isinstance(value, Timestamp):
+        return value.seconds + value.nanoseconds * 1e-9
+    return float(value)
+
+
+@dataclass(frozen=True)
+class Statistics:
+    """Summary of the values of a numeric regular parameter over a clip"""
+    minimum: float
+    maximum: float
+    mean: float
+    count: int
+
+
+@dataclass(eq=False)
+class CatalogEntry:
+    """Catalogued clip. `timecode_start` and `timecode_end` are times of day
+    in seconds, `timestamp_start` and `timestamp_end` seconds since the
+    epoch. The clip itself is read from `path` on first use."""
+    path: str
+    frame_count: int
+    source_id: Optional[str] = None
+    source_number: Optional[int] = None
+    timecode_start: Optional[float] = None
+    timecode_end: Optional[float] = None
+    timestamp_start: Optional[float] = None
+    timestamp_end: Optional[float] = None
+    static: dict[str, Any] = field(default_factory=dict)
+    statistics: dict[str, Statistics] = field(default_factory=dict)
+    loader: Callable[[str], Clip] = field(default=load_clip, repr=False)
+    _clip: Optional[Clip] = field(default=None, repr=False)
+
+    @property
+    def loaded(self) -> bool:
+        return self._clip is not None
+
+    @property
+    def clip(self) -> Clip:
+        """The clip, read from `path` on first use"""
+        if self._clip is None:
+            self._clip = self.loader(self.path)
+        return self._clip
+
+    def unload(self) -> None:
+        self._clip = None
+
+
+@dataclass(frozen=True)
+class CatalogUpdate:
+    """Outcome of `Catalog.update`: the files indexed, removed and failed
+    (with the reason), and the number of files unchanged"""
+    indexed: list[str]
+    unchanged: int
+    removed: list[str]
+    failed: dict[str, str]
+
+
+_ENTRY_COLUMNS: Final[tuple[str, ...]] = ("id", "path", "frame_count", "source_id", "source_number",
+                                          "timecode_start", "timecode_end",
+                                          "timestamp_start", "timestamp_end")
+
+
+class Catalog:
+    """SQLite catalog of converted clips, kept in the file at `path` (or in
+    memory for ":memory:")"""
+
+    def __init__(self, path: str, loader: Callable[[str], Clip] = load_clip) -> None:
+        self.path = path
+        self.loader = loader
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0:
+            with self._connection:
+                self._connection.executescript(_SCHEMA)
+                self._connection.execute(f"PRAGMA user_version = {CATALOG_VERSION}")
+        elif version != CATALOG_VERSION:
+            self._connection.close()
+            raise ValueError(f"unsupported catalog version {version}")
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> "Catalog":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM clips").fetchone()[0]
+
+    def paths(self) -> list[str]:
+        return [row[0] for row in self._connection.execute("SELECT path FROM clips ORDER BY path")]
+
+    def add(self, path: str) -> None:
+        """Index a clip file, replacing any earlier entry of the same file"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        if path.lower().endswith(".cbor"):
+            with open(path, "rb") as fp:
+                content = cbor2.load(fp)
+        else:
+            with open(path, "r", encoding="utf-8") as fp:
+                content = json.load(fp)
+
+        static, statistics, frame_count = [], [], 0
+        row: dict[str, Any] = {"path": path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        for name, is_static, value in _parameters(content):
+            if is_static:
+                static.extend((name_, _sql_value(v)) for name_, v in _leaves(name, value))
+                continue
+            frame_count = max(frame_count, len(value))
+            if not value:
+                continue
+            if name == "timing_timecode":
+                row["timecode_start"], row["timecode_end"] = _timecode_range(value)
+            elif name == "timing_sample_timestamp":
+                row["timestamp_start"], row["timestamp_end"] = _timestamp_range(value)
+            elif name in ("source_id", "source_number"):
+                row[name] = value[0]
+            if name in _TIME_PARAMETERS:
+                continue
+            series: dict[str, list[float]] = {}
+            for sample in value:
+                for member, v in _leaves(name, sample):
+                    if _is_rational(v):
+                        v = v["num"] / v["denom"]
+                    elif not isinstance(v, Number) or isinstance(v, bool):
+                        continue
+                    series.setdefault(member, []).append(v)
+            statistics.extend((member, min(values), max(values), sum(values) / len(values), len(values))
+                              for member, values in series.items())
+        row["frame_count"] = frame_count
+
+        with self._connection:
+            self._connection.execute("DELETE FROM clips WHERE path = ?", (path,))
+            columns = ", ".join(row)
+            cursor = self._connection.execute(
+                f"INSERT INTO clips ({columns}) VALUES ({', '.join('?' * len(row))})", tuple(row.values()))
+            clip_id = cursor.lastrowid
+            self._connection.executemany("INSERT INTO static_parameters VALUES (?, ?, ?)",
+                                         ((clip_id,) + s for s in static))
+            self._connection.executemany("INSERT INTO regular_statistics VALUES (?, ?, ?, ?, ?, ?)",
+                                         ((clip_id,) + s for s in statistics))
+
+    def remove(self, path: str) -> None:
+        with self._connection:
+            self._connection.execute("DELETE FROM clips WHERE path = ?", (os.path.abspath(path),))
+
+    def update(self, roots: Sequence[str], prune: bool = True) -> CatalogUpdate:
+        """Index the JSON and CBOR clip files below `roots` that are new or
+        whose size or modification time changed. With `prune`, entries of
+        files below `roots` that no longer exist are removed."""
+        recorded = {path: (size, mtime_ns) for path, size, mtime_ns
+                    in self._connection.execute("SELECT path, size, mtime_ns FROM clips")}
+        seen = set()
+        indexed, failed, unchanged = [], {}, 0
+        for _, path in find_files(roots):
+            if os.path.splitext(path)[1].lower() not in CLIP_EXTENSIONS:
+                continue
+            path = os.path.abspath(path)
+            seen.add(path)
+            stat = os.stat(path)
+            if recorded.get(path) == (stat.st_size, stat.st_mtime_ns):
+                unchanged += 1
+                continue
+            try:
+                self.add(path)
+                indexed.append(path)
+            except Exception as e:
+                failed[path] = f"{type(e).__name__}: {e}"
+        removed = []
+        if prune:
+            directories = [os.path.join(os.path.abspath(root), "") for root in roots]
+            removed = [path for path in recorded
+                       if path not in seen
+                       and any(path.startswith(d) or path == d[:-1] for d in directories)
+                       and not os.path.exists(path)]
+            with self._connection:
+                self._connection.executemany("DELETE FROM clips WHERE path = ?", ((p,) for p in removed))
+        return CatalogUpdate(indexed, unchanged, removed, failed)
+
+    def query(self, criteria: Optional[Mapping[str, Any]] = None,
+              timecode: Optional[tuple[Timecode | float | None, Timecode | float | None]] = None,
+              timestamp: Optional[tuple[Timestamp | float | None, Timestamp | float | None]] = None
+              ) -> list[CatalogEntry]:
+        """Return the catalogued clips matching all criteria, in order of path.
+
+        `criteria` maps parameter names to a value, matching clips whose static
+        parameter has that value, or to a (low, high) range, matching clips
+        whose static parameter lies in the range or whose regular parameter
+        takes values in it. Either bound may be None.
+        `timecode`, `timestamp`: (start, end) range the clip must overlap, as
+        a Timecode or a time of day in seconds, and as a Timestamp or seconds
+        since the epoch.
+        """
+        conditions, parameters = [], []
+        for name, value in (criteria or {}).items():
+            if not isinstance(value, tuple):
+                conditions.append("id IN (SELECT clip_id FROM static_parameters WHERE name = ? AND value = ?)")
+                parameters.extend((name, _sql_value(value)))
+                continue
+            low, high = (None if bound is None else _sql_value(bound) for bound in value)
+            static_range, regular_range, bounds = [], [], []
+            if low is not None:
+                static_range.append("value >= ?")
+                regular_range.append("maximum >= ?")
+                bounds.append(low)
+            if high is not None:
+                static_range.append("value <= ?")
+                regular_range.append("minimum <= ?")
+                bounds.append(high)
+            conditions.append("id IN (SELECT clip_id FROM static_parameters WHERE "
+                              + " AND ".join(["name = ?"] + static_range)
+                              + " UNION SELECT clip_id FROM regular_statistics WHERE "
+                              + " AND ".join(["name = ?"] + regular_range) + ")")
+            parameters.extend([name] + bounds + [name] + bounds)
+        for column, time_range in (("timecode", timecode), ("timestamp", timestamp)):
+            if time_range is None:
+                continue
+            start, end = time_range
+            conditions.append(f"{column}_start IS NOT NULL")
+            if start is not None:
+                conditions.append(f"{column}_end >= ?")
+                parameters.append(_seconds(start))
+            if end is not None:
+                conditions.append(f"{column}_start <= ?")
+                parameters.append(_seconds(end))
+
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        entries: dict[int, CatalogEntry] = {}
+        for row in self._connection.execute(
+                f"SELECT {', '.join(_ENTRY_COLUMNS)} FROM clips{where} ORDER BY path", parameters):
+            clip_id, *values = row
+            entries[clip_id] = CatalogEntry(**dict(zip(_ENTRY_COLUMNS[1:], values)), loader=self.loader)
+        if entries:
+            selected = f"SELECT id FROM clips{where}"
+            for clip_id, name, value in self._connection.execute(
+                    f"SELECT clip_id, name, value FROM static_parameters WHERE clip_id IN ({selected})",
+                    parameters):
+                entries[clip_id].static[name] = value
+            for clip_id, name, *values in self._connection.execute(
+                    f"SELECT clip_id, name, minimum, maximum, mean, count FROM regular_statistics"
+                    f" WHERE clip_id IN ({selected})", parameters):
+                entries[clip_id].statistics[name] = Statistics(*values)
+        return list(entries.values())
@@ -19,6 +19,7 @@
                                    GLOBAL_POSITION,
                                    TRANSFORMS)
 from camdkit.utils import unwrap_clip_to_pseudo_frame
+from camdkit.columns import Categorical, CategoricalColumn, RunLength, RunLengthColumn
 from camdkit.units import METER, METERS_AND_DEGREES, SECOND
 from camdkit.numeric_types import (NonNegativeInt,
                                    StrictlyPositiveRational,
@@ -59,6 +60,20 @@ def coerce_duration_to_strictly_positive_rational(cls, v):
 ModelPath = tuple[str, ...]
 TraversingFunction = Callable[[str, JsonSchemaValue, ModelPath, str], None]
 
+# model path and field name of each clip property, in schema order
+_PROPERTY_PATHS: dict[str, tuple[ModelPath, str]] = {}
+
+
+def _field_value(instance: BaseModel, model_path: ModelPath, field_name: str) -> Any:
+    # the stored value of a clip property, e.g. a column, or None if unset
+    obj = instance
+    for model_field in model_path + (field_name,):
+        try:
+            obj = getattr(obj, model_field)
+        except AttributeError:
+            return None
+    return obj
+
 class Clip(CompatibleBaseModel):
 
     model_config = ConfigDict(extra="ignore")
@@ -70,7 +85,7 @@ class Clip(CompatibleBaseModel):
 
     # The "global_" prefix is here because, without it, we would have BaseModel attributes
     # with the same name, from the user's POV, as the property
-    global_protocol: Annotated[tuple[VersionedProtocol, ...] | None,
+    global_protocol: Annotated[RunLength[VersionedProtocol] | None,
       Field(alias="protocol",
             json_schema_extra={"clip_property": "protocol",
                                "constraints": PROTOCOL})] = None
@@ -86,7 +101,7 @@ class Clip(CompatibleBaseModel):
     being transported.
     """
 
-    global_source_id: Annotated[tuple[UUIDURN, ...] | None,
+    global_source_id: Annotated[RunLength[UUIDURN] | None,
       Field(alias="sourceId",
             json_schema_extra={"clip_property": "source_id",
                                "constraints": UUID_URN})] = None
@@ -94,7 +109,7 @@ class Clip(CompatibleBaseModel):
     being transported.
     """
 
-    global_source_number: Annotated[tuple[NonNegativeInt, ...] | None,
+    global_source_number: Annotated[RunLength[NonNegativeInt] | None,
       Field(alias="sourceNumber",
             json_schema_extra={"clip_property": "source_number",
                                "constraints": NON_NEGATIVE_INTEGER})] = None
@@ -180,23 +195,30 @@ def field_name_for_clip_property(model: BaseModel, clip_property_name: str) -> s
     def add_property(cls, clip_property_name: str, model_path: ModelPath, field_name: str):
 
         def get_through_path(instance):
-            obj = instance
-            model_fields: list[str] = [f for f in model_path] + [field_name]
-            # print(f"in getter, model_fields: {model_fields}")
-            for model_field in model_fields:
-                try:
-                    obj = getattr(obj, model_field)
-                except AttributeError:
-                    return None
+            obj = _field_value(instance, model_path, field_name)
+            if isinstance(obj, (CategoricalColumn, RunLengthColumn)):
+                # columns are a storage detail; properties hold tuples
+                return obj.as_tuple()
             return obj
 
+        # classes along model_path, resolved on first use per clip class
+        path_classes: dict[type, tuple[type, ...]] = {}
+
+        def classes_along_path(clip_class: type) -> tuple[type, ...]:
+            if clip_class not in path_classes:
+                classes = []
+                model_class = clip_class
+                for model_field in model_path:
+                    model_class = get_type_hints(model_class)[model_field]
+                    classes.append(model_class)
+                path_classes[clip_class] = tuple(classes)
+            return path_classes[clip_class]
+
         def set_through_path(instance, value: Any) -> None:
-            model_class = instance.__class__
             obj = instance
             # print(f"in setter, model_path: {model_path}, field_name: {field_name}")
             if model_path:
-                for model_field in model_path:
-                    model_class = get_type_hints(model_class)[model_field]
+                for model_field, model_class in zip(model_path, classes_along_path(instance.__class__)):
                     # print(f"in setter, model_field: {model_field} model_class: {model_class}")
                     if not hasattr(obj, model_field) or getattr(obj, model_field) is None:
                         defaulted_instance = model_class()
@@ -207,6 +229,7 @@ def set_through_path(instance, value: Any) -> None:
 
         # print(f"called setattr({cls}, {clip_property_name}, {property(get_through_path, set_through_path)}")
         setattr(cls, clip_property_name, property(get_through_path, set_through_path))
+        _PROPERTY_PATHS[clip_property_name] = (model_path, field_name)
         # print(f"called setattr({cls}, {name}, {property(lambda s: 'foo', lambda s, v: None)}")
         # setattr(cls, name, property(lambda s: 'foo', lambda s, v: None))
 
@@ -258,38 +281,24 @@ def make_json_schema(cls, mode: JsonSchemaMode = 'serialization',
         return result
 
     def append(self, other: Self) -> None:
-        full_schema = Clip.make_json_schema(mode='validation', exclude_camdkit_internals=False)
-
-        def appender(property_name: str,
-                     property_schema: JsonSchemaValue,
-                     model_path: ModelPath,
-                     field_name: str) -> None:
-            if "clip_property" in property_schema and 'static' not in model_path:
-                clip_property_name = property_schema["clip_property"]
-                if getattr(other, clip_property_name):  # anything to copy?
-                    if ours := getattr(self, clip_property_name):
-                        setattr(self, clip_property_name,
-                                getattr(self, clip_property_name) + getattr(other, clip_property_name))
+        # the stored values are concatenated, so columns extend their last
+        # run or add codes rather than being decoded and encoded again
+        for clip_property_name, (model_path, field_name) in _PROPERTY_PATHS.items():
+            if 'static' not in model_path:
+                theirs = _field_value(other, model_path, field_name)
+                if theirs:  # anything to copy?
+                    if ours := _field_value(self, model_path, field_name):
+                        setattr(self, clip_property_name, ours + theirs)
                     else:
-                        setattr(self, clip_property_name, getattr(other, clip_property_name))
-
-        Clip.traverse_json_schema(Clip, full_schema, ('',), appender)
+                        setattr(self, clip_property_name, theirs)
 
     def __getitem__(self, i) -> Self:
-        full_schema = Clip.make_json_schema(mode='validation', exclude_camdkit_internals=False)
         result = Clip()
-
-        def extractor(property_name: str,
-                      property_schema: JsonSchemaValue,
-                      model_path: ModelPath,
-                      field_name: str) -> None:
-            if "clip_property" in property_schema:
-                clip_property_name = property_schema["clip_property"]
-                if ours := getattr(self, clip_property_name):
-                    setattr(result, clip_property_name,
-                            ours if "static" in model_path else (ours[i],))
-
-        Clip.traverse_json_schema(Clip, full_schema, ('',), extractor)
+        for clip_property_name, (model_path, field_name) in _PROPERTY_PATHS.items():
+            # columns look frames up without building the tuple of values
+            if ours := _field_value(self, model_path, field_name):
+                setattr(result, clip_property_name,
+                        ours if "static" in model_path else (ours[i],))
         return result
 
     def to_json(self, i: Optional[int] = None) -> dict:
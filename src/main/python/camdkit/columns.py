@@ -0,0 +1,359 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""Compact storage of regular parameters
+
+The value of a regular parameter is a tuple with one element per frame.
+Parameters such as the tracker status take few distinct values over a
+clip, so they are stored as a `CategoricalColumn`: one small integer code
+per frame and a table of the distinct values, validated once each.
+
+Parameters such as the protocol usually keep one value for a whole take,
+and their values need not be hashable, so they are stored as a
+`RunLengthColumn`: the value and first frame of each run of equal values.
+
+Columns are sequences comparing equal to the tuple of their values, and are
+serialized as that tuple, so the JSON schema and the JSON of a clip do not
+depend on how the columns are stored. The value of a run is validated and
+serialized once for all its frames. Clip properties return the tuple of
+values of a column (see `as_tuple`), built on each read and not kept by the
+column; the columns themselves are the fields of the models.
+"""
+
+import copy
+import operator
+import threading
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
+from itertools import chain, islice, repeat
+from typing import Annotated, Any, Iterable, Iterator, TypeVar
+
+from pydantic import (Field, PlainSerializer, SerializerFunctionWrapHandler, ValidatorFunctionWrapHandler,
+                      WrapSerializer, WrapValidator)
+
+__all__ = ['CategoricalColumn', 'Categorical', 'RunLengthColumn', 'RunLength', 'NonEmptyRunLength']
+
+# array typecodes for codes up to 2**8, 2**16 and 2**32 distinct values
+_CODE_TYPES = (('B', 1 << 8), ('H', 1 << 16), ('I', 1 << 32))
+
+# guards the growth of code arrays shared by concatenated columns
+_GROWTH_LOCK = threading.Lock()
+
+
+def _code_type(category_count: int) -> str:
+    for typecode, limit in _CODE_TYPES:
+        if category_count <= limit:
+            return typecode
+    raise ValueError("too many distinct values for a categorical column")
+
+
+class CategoricalColumn(Sequence):
+    """Immutable dictionary-encoded sequence: `codes[i]` is the index in
+    `categories` of element i
+
+    A column is a prefix of its code array. Concatenation appends to the
+    array when no other column has grown it yet, so appending to a clip
+    costs as much for one frame as for a million.
+    """
+
+    __slots__ = ("_codes", "_length", "categories", "_index")
+
+    def __init__(self, values: Iterable[Any] = ()) -> None:
+        index: dict[Any, int] = {}
+        codes = [index.setdefault(value, len(index)) for value in values]
+        self._index = index
+        self.categories: tuple[Any, ...] = tuple(index)
+        self._codes = array(_code_type(len(index)), codes)
+        self._length = len(self._codes)
+
+    @classmethod
+    def from_codes(cls, codes: Iterable[int], categories: tuple[Any, ...]) -> "CategoricalColumn":
+        """Build a column from codes into `categories`, whose elements must
+        be distinct"""
+        column = cls.__new__(cls)
+        column._index = None
+        column.categories = tuple(categories)
+        column._codes = array(_code_type(len(column.categories)), codes)
+        column._length = len(column._codes)
+        if column._codes and max(column._codes) >= len(column.categories):
+            raise ValueError("codes must index categories")
+        return column
+
+    @property
+    def codes(self) -> array:
+        """The code of each element"""
+        if len(self._codes) == self._length:
+            return self._codes
+        return self._codes[:self._length]
+
+    def _extended(self, codes: Iterable[int], categories: tuple[Any, ...],
+                  index: dict[Any, int] | None) -> "CategoricalColumn":
+        # codes must index categories, which start with self.categories
+        typecode = _code_type(len(categories))
+        with _GROWTH_LOCK:
+            buffer = self._codes
+            if len(buffer) != self._length or array(typecode).itemsize > buffer.itemsize:
+                buffer = array(typecode, self.codes)
+            buffer.extend(codes)
+            length = len(buffer)
+        column = CategoricalColumn.__new__(CategoricalColumn)
+        column._codes = buffer
+        column._length = length
+        column.categories = categories
+        column._index = index
+        return column
+
+    def _lookup(self) -> dict[Any, int]:
+        if self._index is None:
+            self._index = {value: code for code, value in enumerate(self.categories)}
+        return self._index
+
+    def as_tuple(self) -> tuple[Any, ...]:
+        """Return a new tuple of the values, which the column does not keep"""
+        return tuple(self)
+
+    def encode(self, values: Iterable[Any]) -> list[int]:
+        """Return the codes of values, -1 for values not in the categories"""
+        index = self._lookup()
+        return [index.get(value, -1) for value in values]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return CategoricalColumn.from_codes(self.codes[i], self.categories)
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("column index out of range")
+        return self.categories[self._codes[i]]
+
+    def __iter__(self) -> Iterator[Any]:
+        return map(self.categories.__getitem__, islice(self._codes, self._length))
+
+    def __contains__(self, value: Any) -> bool:
+        code = self._lookup().get(value)
+        return code is not None and code in self.codes
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, CategoricalColumn):
+            if self.categories == other.categories:
+                return self.codes == other.codes
+            other = tuple(other)
+        elif not isinstance(other, tuple):
+            return NotImplemented
+        return len(other) == len(self) and array('l', self.encode(other)) == self.codes
+
+    def __hash__(self) -> int:
+        return hash(tuple(self))
+
+    def __add__(self, other: Any) -> "CategoricalColumn":
+        if isinstance(other, CategoricalColumn):
+            if other.categories == self.categories:
+                return self._extended(other.codes, self.categories, self._index)
+            index = dict(self._lookup())
+            recoded = [index.setdefault(value, len(index)) for value in other.categories]
+            return self._extended([recoded[code] for code in other.codes], tuple(index), index)
+        if not isinstance(other, tuple):
+            return NotImplemented
+        index = dict(self._lookup())
+        codes = [index.setdefault(value, len(index)) for value in other]
+        return self._extended(codes, tuple(index), index)
+
+    def __radd__(self, other: Any) -> "CategoricalColumn":
+        if not isinstance(other, tuple):
+            return NotImplemented
+        return CategoricalColumn((*other, *self))
+
+    def __copy__(self) -> "CategoricalColumn":
+        return self
+
+    def __deepcopy__(self, memo: dict) -> "CategoricalColumn":
+        # categories may be mutable, if hashable, objects
+        return CategoricalColumn.from_codes(self.codes, copy.deepcopy(self.categories, memo))
+
+    def __reduce__(self):
+        return CategoricalColumn.from_codes, (self.codes, self.categories)
+
+    def __repr__(self) -> str:
+        return f"CategoricalColumn({tuple(self)!r})"
+
+
+def _validate_categorical(value: Any, handler: ValidatorFunctionWrapHandler) -> CategoricalColumn:
+    if isinstance(value, CategoricalColumn):
+        # validating the distinct values validates the column
+        handler(value.categories)
+        return value
+    return CategoricalColumn(handler(value))
+
+
+def _serialize_column(column: Sequence):
+    return tuple(column)
+
+
+
+class RunLengthColumn(Sequence):
+    """Immutable run-length encoded sequence: run k holds `values[k]` from
+    frame `starts[k]` to the start of the next run. Adjacent runs hold
+    unequal values."""
+
+    __slots__ = ("values", "starts", "_length")
+
+    def __init__(self, values: Iterable[Any] = ()) -> None:
+        runs: list[Any] = []
+        starts = array('Q')
+        length = 0
+        for value in values:
+            if not runs or not (value is runs[-1] or value == runs[-1]):
+                runs.append(value)
+                starts.append(length)
+            length += 1
+        self.values: tuple[Any, ...] = tuple(runs)
+        self.starts: array = starts
+        self._length = length
+
+    @classmethod
+    def from_runs(cls, values: Iterable[Any], lengths: Iterable[int]) -> "RunLengthColumn":
+        """Build a column from the value and length of each run. Empty runs
+        are dropped and adjacent runs of equal values merged."""
+        column = cls.__new__(cls)
+        runs: list[Any] = []
+        column.starts = array('Q')
+        column._length = 0
+        for value, length in zip(values, lengths):
+            if length < 0:
+                raise ValueError("run lengths cannot be negative")
+            if not length:
+                continue
+            if not runs or not (value is runs[-1] or value == runs[-1]):
+                runs.append(value)
+                column.starts.append(column._length)
+            column._length += length
+        column.values = tuple(runs)
+        return column
+
+    def as_tuple(self) -> tuple[Any, ...]:
+        """Return a new tuple of the values, which the column does not keep"""
+        return tuple(self)
+
+    def run_lengths(self) -> list[int]:
+        ends = chain(self.starts[1:], (self._length,))
+        return [end - start for start, end in zip(self.starts, ends)]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self._length)
+            if step != 1:
+                return RunLengthColumn(self[j] for j in range(start, stop, step))
+            if stop <= start:
+                return RunLengthColumn()
+            first = bisect_right(self.starts, start) - 1
+            last = bisect_right(self.starts, stop - 1)
+            ends = chain(self.starts[first + 1:last], (stop,))
+            starts = chain((start,), self.starts[first + 1:last])
+            return RunLengthColumn.from_runs(self.values[first:last],
+                                             [end - begin for begin, end in zip(starts, ends)])
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("column index out of range")
+        return self.values[bisect_right(self.starts, i) - 1]
+
+    def __iter__(self) -> Iterator[Any]:
+        return chain.from_iterable(map(repeat, self.values, self.run_lengths()))
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, RunLengthColumn):
+            return (self._length == other._length
+                    and self.starts == other.starts
+                    and self.values == other.values)
+        if not isinstance(other, tuple):
+            return NotImplemented
+        return len(other) == self._length and tuple(self) == other
+
+    def __hash__(self) -> int:
+        return hash(tuple(self))
+
+    def __add__(self, other: Any) -> "RunLengthColumn":
+        if isinstance(other, RunLengthColumn):
+            if not self._length:
+                return other
+            values, starts = other.values, other.starts
+            if values and (values[0] is self.values[-1] or values[0] == self.values[-1]):
+                # other starts by extending our last run
+                values, starts = values[1:], starts[1:]
+            column = RunLengthColumn.__new__(RunLengthColumn)
+            column.values = self.values + values if values else self.values
+            # the starts array is never modified, so it can be shared
+            column.starts = (self.starts + array('Q', (start + self._length for start in starts))
+                             if values else self.starts)
+            column._length = self._length + other._length
+            return column
+        if not isinstance(other, tuple):
+            return NotImplemented
+        return self + RunLengthColumn(other)
+
+    def __radd__(self, other: Any) -> "RunLengthColumn":
+        if not isinstance(other, tuple):
+            return NotImplemented
+        return RunLengthColumn(other) + self
+
+    def __copy__(self) -> "RunLengthColumn":
+        return self
+
+    def __deepcopy__(self, memo: dict) -> "RunLengthColumn":
+        # run values may be mutable models
+        column = RunLengthColumn.__new__(RunLengthColumn)
+        column.values = copy.deepcopy(self.values, memo)
+        column.starts = self.starts[:]
+        column._length = self._length
+        return column
+
+    def __reduce__(self):
+        return RunLengthColumn.from_runs, (self.values, self.run_lengths())
+
+    def __repr__(self) -> str:
+        return f"RunLengthColumn.from_runs({self.values!r}, {self.run_lengths()!r})"
+
+def _validate_run_length(value: Any, handler: ValidatorFunctionWrapHandler) -> RunLengthColumn:
+    if isinstance(value, RunLengthColumn):
+        # validating the value of each run validates the column
+        values = handler(value.values)
+        if all(map(operator.is_, values, value.values)):
+            return value
+        return RunLengthColumn.from_runs(values, value.run_lengths())
+    return RunLengthColumn(handler(value))
+
+
+def _serialize_run_length(column: Sequence, handler: SerializerFunctionWrapHandler):
+    if not isinstance(column, RunLengthColumn):
+        return handler(column)
+    return tuple(chain.from_iterable(map(repeat, handler(column.values), column.run_lengths())))
+
+
+T = TypeVar("T")
+
+Categorical = Annotated[tuple[T, ...],
+                        WrapValidator(_validate_categorical),
+                        PlainSerializer(_serialize_column)]
+"""Regular parameter stored as a `CategoricalColumn`, e.g.
+`Categorical[NonBlankUTF8String]`"""
+
+RunLength = Annotated[tuple[T, ...],
+                      WrapValidator(_validate_run_length),
+                      WrapSerializer(_serialize_run_length)]
+"""Regular parameter stored as a `RunLengthColumn`, e.g.
+`RunLength[VersionedProtocol]`"""
+
+NonEmptyRunLength = Annotated[Annotated[tuple[T, ...], Field(min_length=1)],
+                              WrapValidator(_validate_run_length),
+                              WrapSerializer(_serialize_run_length)]
+"""`RunLength` of at least one frame"""
@@ -143,6 +143,7 @@ def trapdoor_for_layer_type(layer_type: str) -> tuple[str | None, bool]:
                      'model': ('schema', False),
                      'function-before': ('schema', False),
                      'function-after': ('schema', False),
+                     'function-wrap': ('schema', False),
                      'model-field': ('schema', False),
                      'model-fields': ('fields', False)}
             try:
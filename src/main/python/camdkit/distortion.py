@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""Vectorized evaluation of the OpenLensIO distortion model
+
+Screen coordinates are in millimeters relative to the centre of the active
+area of the sensor, with x to the right and y downwards. The undistortion
+function U maps distorted to undistorted coordinates using the Brown-Conrady
+model of section 4.1 of the OpenLensIO documentation, where radial
+coefficients alternate between the numerator and the denominator of the
+radial term, i.e.
+
+    R = (1 + k1 r^2 + k3 r^4 + k5 r^6 ...) / (1 + k2 r^2 + k4 r^4 + k6 r^6 ...)
+"""
+
+from typing import Final, Optional
+
+import numpy as np
+
+from camdkit.lens_types import Distortion, PlanarOffset
+
+__all__ = ['BROWN_CONRADY_D_U', 'BROWN_CONRADY_U_D',
+           'brown_conrady', 'inverse_brown_conrady',
+           'undistort_points', 'distort_points']
+
+BROWN_CONRADY_D_U: Final[str] = "Brown-Conrady D-U"
+BROWN_CONRADY_U_D: Final[str] = "Brown-Conrady U-D"
+
+# Fixed-point inversion of U converges in a handful of iterations for
+# any physically plausible lens; the cap only guards against divergence.
+INVERSION_ITERATIONS: Final[int] = 20
+INVERSION_TOLERANCE: Final[float] = 1e-9
+
+
+def _radial_term(radial: tuple[float, ...], r2: np.ndarray) -> np.ndarray:
+    numerator = np.ones_like(r2)
+    denominator = np.ones_like(r2)
+    r_power = np.ones_like(r2)
+    for i, k in enumerate(radial):
+        if i % 2 == 0:
+            r_power = r_power * r2
+            numerator += k * r_power
+        else:
+            denominator += k * r_power
+    return numerator / denominator
+
+
+def _tangential(tangential: Optional[tuple[float, ...]]) -> tuple[float, float]:
+    if not tangential:
+        return 0.0, 0.0
+    if len(tangential) == 1:
+        return tangential[0], 0.0
+    return tangential[0], tangential[1]
+
+
+def brown_conrady(x: np.ndarray, y: np.ndarray,
+                  radial: tuple[float, ...],
+                  tangential: Optional[tuple[float, ...]] = None) -> tuple[np.ndarray, np.ndarray]:
+    """Evaluate U(x, y) for arrays of screen coordinates"""
+    p1, p2 = _tangential(tangential)
+    r2 = x * x + y * y
+    r = _radial_term(radial, r2)
+    xy = x * y
+    return (x * r + 2.0 * p1 * xy + p2 * (r2 + 2.0 * x * x),
+            y * r + 2.0 * p2 * xy + p1 * (r2 + 2.0 * y * y))
+
+
+def inverse_brown_conrady(x: np.ndarray, y: np.ndarray,
+                          radial: tuple[float, ...],
+                          tangential: Optional[tuple[float, ...]] = None) -> tuple[np.ndarray, np.ndarray]:
+    """Solve U(x', y') = (x, y) for (x', y') by fixed-point iteration"""
+    p1, p2 = _tangential(tangential)
+    xi, yi = np.array(x, dtype=np.float64), np.array(y, dtype=np.float64)
+    for _ in range(INVERSION_ITERATIONS):
+        r2 = xi * xi + yi * yi
+        r = _radial_term(radial, r2)
+        xy = xi * yi
+        x_next = (x - 2.0 * p1 * xy - p2 * (r2 + 2.0 * xi * xi)) / r
+        y_next = (y - 2.0 * p2 * xy - p1 * (r2 + 2.0 * yi * yi)) / r
+        converged = (np.max(np.abs(x_next - xi), initial=0.0) < INVERSION_TOLERANCE
+                     and np.max(np.abs(y_next - yi), initial=0.0) < INVERSION_TOLERANCE)
+        xi, yi = x_next, y_next
+        if converged:
+            break
+    return xi, yi
+
+
+def _centre(distortion_offset: Optional[PlanarOffset],
+            projection_offset: Optional[PlanarOffset]) -> tuple[float, float]:
+    cx = cy = 0.0
+    for offset in (distortion_offset, projection_offset):
+        if offset is not None:
+            cx += offset.x
+            cy += offset.y
+    return cx, cy
+
+
+def undistort_points(x: np.ndarray, y: np.ndarray,
+                     distortion: Distortion,
+                     distortion_offset: Optional[PlanarOffset] = None,
+                     projection_offset: Optional[PlanarOffset] = None) -> tuple[np.ndarray, np.ndarray]:
+    """Map distorted screen coordinates to undistorted screen coordinates
+    following the projection matrix characterisation, i.e.
+    eps_u = U(eps_d - dC - dP) + dC + dP
+    """
+    cx, cy = _centre(distortion_offset, projection_offset)
+    if distortion.model == BROWN_CONRADY_U_D:
+        ux, uy = inverse_brown_conrady(x - cx, y - cy, distortion.radial, distortion.tangential)
+    else:
+        ux, uy = brown_conrady(x - cx, y - cy, distortion.radial, distortion.tangential)
+    return ux + cx, uy + cy
+
+
+def distort_points(x: np.ndarray, y: np.ndarray,
+                   distortion: Distortion,
+                   distortion_offset: Optional[PlanarOffset] = None,
+                   projection_offset: Optional[PlanarOffset] = None) -> tuple[np.ndarray, np.ndarray]:
+    """Map undistorted screen coordinates to distorted screen coordinates
+    following the projection matrix characterisation, i.e.
+    eps_d = U^-1(eps_u - dC - dP) + dC + dP
+    """
+    cx, cy = _centre(distortion_offset, projection_offset)
+    if distortion.model == BROWN_CONRADY_U_D:
+        dx, dy = brown_conrady(x - cx, y - cy, distortion.radial, distortion.tangential)
+    else:
+        dx, dy = inverse_brown_conrady(x - cx, y - cy, distortion.radial, distortion.tangential)
+    return dx + cx, dy + cy
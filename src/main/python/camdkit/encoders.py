@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""Conversion between raw and normalized FIZ encoder values
+
+Raw encoder values are unsigned 32-bit counts whose range and direction
+depend on the encoder and its mounting. Normalized values run from 0 to 1
+following the direction conventions of `Lens.encoders`:
+
+    Focus:   0=infinite     1=closest
+    Iris:    0=open         1=closed
+    Zoom:    0=wide angle   1=telephoto
+
+An `EncoderRange` records the raw counts found at both ends of the travel of
+an encoder, e.g. by homing, and conversions operate on whole columns.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from camdkit.clip import Clip
+from camdkit.lens_types import FizEncoders, RawFizEncoders
+from camdkit.numeric_types import MAX_UINT_32
+
+__all__ = ['EncoderRange', 'FizCalibration']
+
+FIZ_AXES = ('focus', 'iris', 'zoom')
+
+
+@dataclass(frozen=True)
+class EncoderRange:
+    """Raw counts of an encoder at the normalized 0 and 1 ends of its travel.
+
+    `zero` is the count at infinite focus, open iris or wide angle and `one`
+    the count at closest focus, closed iris or telephoto. `zero` is greater
+    than `one` for encoders counting down in the normalized direction.
+    """
+    zero: int
+    one: int
+
+    def __post_init__(self):
+        for count in (self.zero, self.one):
+            if not 0 <= count <= MAX_UINT_32:
+                raise ValueError("raw encoder counts must be unsigned 32-bit integers")
+        if self.zero == self.one:
+            raise ValueError("the ends of an encoder range must be distinct")
+
+    @classmethod
+    def from_homing(cls, minimum: int, maximum: int, reversed: bool = False) -> "EncoderRange":
+        """Build a range from the extreme counts found by homing. `reversed`
+        is set when the minimum count is at the normalized 1 end."""
+        return cls(maximum, minimum) if reversed else cls(minimum, maximum)
+
+    def normalize(self, raw: np.ndarray) -> np.ndarray:
+        """Map raw counts to normalized float64 values, clipped to [0, 1]"""
+        raw = np.asarray(raw, dtype=np.float64)
+        return np.clip((raw - self.zero) / (self.one - self.zero), 0.0, 1.0)
+
+    def denormalize(self, values: np.ndarray) -> np.ndarray:
+        """Map normalized values to the nearest uint32 raw counts"""
+        values = np.clip(np.asarray(values, dtype=np.float64), 0.0, 1.0)
+        return np.rint(self.zero + values * (self.one - self.zero)).astype(np.uint32)
+
+
+@dataclass(frozen=True)
+class FizCalibration:
+    """Encoder ranges of the focus, iris and zoom encoders of a lens"""
+    focus: Optional[EncoderRange] = None
+    iris: Optional[EncoderRange] = None
+    zoom: Optional[EncoderRange] = None
+
+    def _range(self, axis: str) -> EncoderRange:
+        encoder_range = getattr(self, axis)
+        if encoder_range is None:
+            raise ValueError(f"no {axis} encoder range is calibrated")
+        return encoder_range
+
+    def normalize(self, focus: Optional[np.ndarray] = None,
+                  iris: Optional[np.ndarray] = None,
+                  zoom: Optional[np.ndarray] = None) -> dict[str, np.ndarray]:
+        """Normalize the given raw columns, returned keyed by axis"""
+        raw = dict(focus=focus, iris=iris, zoom=zoom)
+        return {axis: self._range(axis).normalize(column)
+                for axis, column in raw.items() if column is not None}
+
+    def denormalize(self, focus: Optional[np.ndarray] = None,
+                    iris: Optional[np.ndarray] = None,
+                    zoom: Optional[np.ndarray] = None) -> dict[str, np.ndarray]:
+        """Convert the given normalized columns to raw counts, keyed by axis"""
+        normalized = dict(focus=focus, iris=iris, zoom=zoom)
+        return {axis: self._range(axis).denormalize(column)
+                for axis, column in normalized.items() if column is not None}
+
+    def apply(self, clip: Clip,
+              focus: Optional[np.ndarray] = None,
+              iris: Optional[np.ndarray] = None,
+              zoom: Optional[np.ndarray] = None) -> None:
+        """Set both the raw and normalized encoder columns of a clip from
+        raw columns. Without raw columns, the clip's existing raw encoder
+        values are normalized instead."""
+        raw = {axis: np.asarray(column, dtype=np.uint32)
+               for axis, column in dict(focus=focus, iris=iris, zoom=zoom).items()
+               if column is not None}
+        if not raw:
+            if not clip.lens_raw_encoders:
+                raise ValueError("the clip has no raw lens encoder values")
+            raw = _columns(clip.lens_raw_encoders)
+        lengths = {len(column) for column in raw.values()}
+        if len(lengths) != 1:
+            raise ValueError("raw encoder columns must have the same length")
+        normalized = self.normalize(**raw)
+        raw_lists = {axis: column.tolist() for axis, column in raw.items()}
+        normalized_lists = {axis: column.tolist() for axis, column in normalized.items()}
+        n = lengths.pop()
+        # values are in range by construction, so per-frame validation is skipped
+        clip.lens_raw_encoders = tuple(
+            RawFizEncoders.model_construct(**{axis: column[i] for axis, column in raw_lists.items()})
+            for i in range(n))
+        clip.lens_encoders = tuple(
+            FizEncoders.model_construct(**{axis: column[i] for axis, column in normalized_lists.items()})
+            for i in range(n))
+
+
+def _columns(raw_encoders: tuple[RawFizEncoders, ...]) -> dict[str, np.ndarray]:
+    # an axis missing from any frame cannot be converted column-wise
+    columns = {}
+    for axis in FIZ_AXES:
+        values = [getattr(e, axis) for e in raw_encoders]
+        present = [v is not None for v in values]
+        if all(present):
+            columns[axis] = np.array(values, dtype=np.uint32)
+        elif any(present):
+            raise ValueError(f"the {axis} encoder is missing from some frames of the clip")
+    return columns
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""Generation of sample ids
+
+`uuid.uuid4().urn` reads the system random source and formats one UUID at a
+time. At tracking rates it is cheaper to read the random bytes of many
+UUIDs at once and format them all with NumPy. The identifiers are random
+(version 4) UUIDs, as lowercase URNs matching `UUID_URN_PATTERN`.
+"""
+
+import os
+import weakref
+from typing import Callable, Final, Iterator
+
+import numpy as np
+
+from camdkit.clip import Clip
+
+__all__ = ['uuid_urns', 'SampleIdGenerator', 'new_sample_id', 'new_sample_ids',
+           'clip_with_trusted_sample_ids']
+
+DEFAULT_BATCH_SIZE: Final[int] = 1024
+
+_URN_PREFIX: Final[bytes] = b"urn:uuid:"
+# URNs are formatted one per line, then split
+_URN_TEMPLATE: Final[np.ndarray] = np.frombuffer(_URN_PREFIX + b"00000000-0000-0000-0000-000000000000\n",
+                                                 dtype=np.uint8)
+# positions of the 32 hexadecimal digits in the template
+_DIGIT_POSITIONS: Final[np.ndarray] = np.flatnonzero(_URN_TEMPLATE == ord("0"))
+
+
+def uuid_urns(count: int, random_bytes: Callable[[int], bytes] = os.urandom) -> list[str]:
+    """Return `count` random UUID URNs made from `16 * count` bytes of
+    `random_bytes`"""
+    if count < 0:
+        raise ValueError("the number of identifiers cannot be negative")
+    raw = np.frombuffer(random_bytes(16 * count), dtype=np.uint8).reshape(count, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+    digits = np.frombuffer(raw.tobytes().hex().encode("ascii"), dtype=np.uint8).reshape(count, 32)
+    urns = np.tile(_URN_TEMPLATE, (count, 1))
+    urns[:, _DIGIT_POSITIONS] = digits
+    return urns.tobytes().decode("ascii").split("\n")[:count]
+
+
+# generators are emptied in forked children, which would otherwise hand out
+# the same identifiers as their parent
+_generators: "weakref.WeakSet[SampleIdGenerator]" = weakref.WeakSet()
+
+
+class SampleIdGenerator:
+    """Source of random UUID URNs, drawn `batch_size` at a time.
+
+    Calling a generator returns the next identifier. A generator can be
+    shared between threads.
+    """
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE,
+                 random_bytes: Callable[[int], bytes] = os.urandom) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be strictly positive")
+        self.batch_size = batch_size
+        self._random_bytes = random_bytes
+        self._batch: Iterator[str] = iter(())
+        _generators.add(self)
+
+    def __call__(self) -> str:
+        # advancing a list iterator is atomic, so concurrent callers never
+        # receive the same identifier
+        urn = next(self._batch, None)
+        while urn is None:
+            self._batch = iter(uuid_urns(self.batch_size, self._random_bytes))
+            urn = next(self._batch, None)
+        return urn
+
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            yield self()
+
+    def take(self, count: int) -> list[str]:
+        """Return `count` identifiers"""
+        if count <= self.batch_size:
+            return [self() for _ in range(count)]
+        return uuid_urns(count, self._random_bytes)
+
+    def discard(self) -> None:
+        """Forget the identifiers drawn but not yet returned"""
+        self._batch = iter(())
+
+
+def _discard_all() -> None:
+    for generator in list(_generators):
+        generator.discard()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_discard_all)
+
+_default_generator: Final[SampleIdGenerator] = SampleIdGenerator()
+
+
+def new_sample_id() -> str:
+    """Return a new identifier from a generator shared by the whole process"""
+    return _default_generator()
+
+
+def new_sample_ids(count: int) -> list[str]:
+    """Return `count` new identifiers from the shared generator"""
+    return _default_generator.take(count)
+
+
+def clip_with_trusted_sample_ids(sample_ids: tuple[str, ...]) -> Clip:
+    """Return a new clip with the sample ids, without validating them.
+
+    Only for identifiers known to match `UUID_URN_PATTERN`, such as those of
+    a `SampleIdGenerator`: assigning `clip.sample_id` matches every
+    identifier against the pattern again. Other properties of the clip are
+    validated on assignment as usual.
+    """
+    return Clip.model_construct(global_sample_id=sample_ids)
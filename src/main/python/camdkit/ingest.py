@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""Batch conversion of the camera and tracking metadata of a shoot
+
+Walks directory trees, groups recognised metadata files into takes using the
+reader registry, and converts the takes in parallel into one JSON or CBOR
+file each. A manifest in the output directory records the size, modification
+time and SHA-256 hash of the inputs of every converted take so that re-runs
+only convert takes whose inputs changed. Files and takes that cannot be
+converted are recorded in the manifest along with the reason, and the run
+goes on with the others.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Final, Iterable, Iterator, Mapping, Optional, Sequence
+
+import cbor2
+
+from camdkit.readers import FileRole, Take, get_plugin, group_takes
+
+__all__ = ['IngestJob', 'IngestResult', 'Manifest', 'find_files', 'plan', 'ingest', 'main']
+
+MANIFEST_NAME: Final[str] = ".camdkit-ingest-manifest.json"
+MANIFEST_VERSION: Final[int] = 1
+OUTPUT_FORMATS: Final[tuple[str, ...]] = ("json", "cbor")
+
+
+def file_digest(path: str) -> str:
+    """Return the SHA-256 hex digest of a file"""
+    with open(path, "rb") as fp:
+        return hashlib.file_digest(fp, "sha256").hexdigest()
+
+
+class Manifest:
+    """Record of the inputs of converted takes, keyed by output path.
+
+    An input is unchanged if its size and modification time match the
+    record, or, when only the modification time differs, if its hash does.
+    `failures` holds the reason of every failure of the last run, keyed by
+    output path for takes and by input path for files that could not be
+    grouped into takes.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.entries: dict[str, dict[str, dict]] = {}
+        self.failures: dict[str, str] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as fp:
+                content = json.load(fp)
+            if content.get("version") == MANIFEST_VERSION:
+                self.entries = content.get("takes", {})
+                self.failures = content.get("failures", {})
+
+    def is_current(self, output: str, files: Mapping[FileRole, str]) -> bool:
+        entry = self.entries.get(output)
+        if entry is None or not os.path.exists(output):
+            return False
+        if entry.keys() != {str(role) for role in files}:
+            return False
+        for role, path in files.items():
+            record = entry.get(str(role))
+            if record is None or record["path"] != path:
+                return False
+            stat = os.stat(path)
+            if stat.st_size != record["size"]:
+                return False
+            if stat.st_mtime_ns != record["mtime_ns"]:
+                if file_digest(path) != record["sha256"]:
+                    return False
+                record["mtime_ns"] = stat.st_mtime_ns
+        return True
+
+    def record(self, output: str, inputs: Mapping[str, dict]) -> None:
+        self.entries[output] = dict(inputs)
+        self.failures.pop(output, None)
+
+    def record_failure(self, key: str, error: str) -> None:
+        self.failures[key] = error
+
+    def save(self) -> None:
+        temporary = self.path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as fp:
+            json.dump({"version": MANIFEST_VERSION, "takes": self.entries, "failures": self.failures}, fp, indent=1, sort_keys=True)
+        os.replace(temporary, self.path)
+
+
+@dataclass(frozen=True)
+class IngestJob:
+    """Conversion of one take into one output file"""
+    plugin: str
+    files: dict[FileRole, str]
+    output: str
+    output_format: str
+
+
+@dataclass(frozen=True)
+class IngestResult:
+    job: IngestJob
+    inputs: Optional[dict[str, dict]] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _convert(job: IngestJob) -> IngestResult:
+    # runs in a worker process; exceptions are reported rather than raised
+    try:
+        inputs = {}
+        for role, path in job.files.items():
+            stat = os.stat(path)
+            inputs[str(role)] = {"path": path,
+                                 "size": stat.st_size,
+                                 "mtime_ns": stat.st_mtime_ns,
+                                 "sha256": file_digest(path)}
+        clip = get_plugin(job.plugin).read(job.files)
+        os.makedirs(os.path.dirname(job.output) or ".", exist_ok=True)
+        if job.output_format == "cbor":
+            with open(job.output, "wb") as fp:
+                cbor2.dump(clip.to_json(), fp)
+        else:
+            with open(job.output, "w", encoding="utf-8") as fp:
+                json.dump(clip.to_json(), fp, indent=2)
+        return IngestResult(job, inputs=inputs)
+    except Exception as e:
+        return IngestResult(job, error=f"{type(e).__name__}: {e}")
+
+
+def find_files(roots: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """Yield (root, path) for every file below the given directories (or
+    the given files themselves), in a stable order. Hidden entries are
+    skipped."""
+    for root in roots:
+        if os.path.isfile(root):
+            yield os.path.dirname(root), root
+            continue
+        for directory, subdirectories, filenames in os.walk(root):
+            subdirectories[:] = sorted(d for d in subdirectories if not d.startswith("."))
+            for filename in sorted(filenames):
+                if not filename.startswith("."):
+                    yield root, os.path.join(directory, filename)
+
+
+def _output_path(take: Take, root: str, output_dir: str, output_format: str) -> str:
+    return os.path.join(output_dir, os.path.relpath(take.key, root) + "." + output_format)
+
+
+def plan(roots: Sequence[str], output_dir: str, output_format: str = "json"
+         ) -> tuple[list[IngestJob], list[Take], list[str], dict[str, str]]:
+    """Return the conversion jobs of all complete takes below `roots`, along
+    with the incomplete takes, the unrecognised files, and the reason of
+    every file that could not be grouped into a take (e.g. unreadable, or
+    claiming the same role as another file of its take) or whose take would
+    be written to the same output as another take"""
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"unsupported output format {output_format!r}")
+    file_roots = dict((path, root) for root, path in find_files(roots))
+    failed: dict[str, str] = {}
+    takes, unrecognised = group_takes(file_roots, failed)
+    incomplete = []
+    outputs: dict[str, list[Take]] = {}
+    for take in takes:
+        if not take.complete:
+            incomplete.append(take)
+            continue
+        root = file_roots[next(iter(take.files.values()))]
+        outputs.setdefault(_output_path(take, root, output_dir, output_format), []).append(take)
+    jobs = []
+    for output, output_takes in outputs.items():
+        if len(output_takes) > 1:
+            # e.g. the same relative path below two roots: neither take may
+            # overwrite the other
+            for take in output_takes:
+                for path in take.files.values():
+                    failed[path] = f"{len(output_takes)} takes would be written to {output}"
+            continue
+        take, = output_takes
+        jobs.append(IngestJob(take.plugin.name, dict(take.files), output, output_format))
+    return jobs, incomplete, unrecognised, failed
+
+
+def ingest(jobs: Sequence[IngestJob], manifest: Manifest,
+           max_workers: Optional[int] = None, force: bool = False,
+           progress=None) -> tuple[list[IngestResult], int]:
+    """Run the jobs whose inputs changed since the manifest was written,
+    across a process pool. Returns the results of the jobs run and the
+    number of jobs skipped. `progress`, if given, is called with each result,
+    the number of results so far and the number of jobs to run."""
+    pending = [job for job in jobs if force or not manifest.is_current(job.output, job.files)]
+    skipped = len(jobs) - len(pending)
+    results = []
+    if pending:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_convert, job) for job in pending]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                if result.ok:
+                    manifest.record(result.job.output, result.inputs)
+                else:
+                    manifest.record_failure(result.job.output, result.error)
+                if progress is not None:
+                    progress(result, len(results), len(pending))
+    manifest.save()
+    return results, skipped
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert all camera and tracking metadata files found"
+                                                 " in directory trees according to the OSVP Camera"
+                                                 " Metadata Model.")
+    parser.add_argument("inputs", nargs="+", help="Directories (or files) to convert")
+    parser.add_argument("-o", "--output-dir", required=True, help="Directory receiving one file per take")
+    parser.add_argument("-f", "--format", choices=OUTPUT_FORMATS, default="json", help="Output format")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Number of worker processes (default: number of CPUs)")
+    parser.add_argument("--manifest", default=None,
+                        help=f"Manifest path (default: {MANIFEST_NAME} in the output directory)")
+    parser.add_argument("--force", action="store_true", help="Convert takes even if unchanged")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only report failures")
+    args = parser.parse_args(argv)
+
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("the number of jobs must be at least 1")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    manifest = Manifest(args.manifest or os.path.join(args.output_dir, MANIFEST_NAME))
+    jobs, incomplete, unrecognised, ungrouped = plan(args.inputs, args.output_dir, args.format)
+    manifest.failures.clear()
+    for path, error in ungrouped.items():
+        manifest.record_failure(path, error)
+        print(f"FAILED {path}: {error}", file=sys.stderr)
+
+    for take in incomplete:
+        print(f"incomplete {take.plugin.name} take: {', '.join(take.files.values())}", file=sys.stderr)
+
+    def progress(result: IngestResult, done: int, total: int) -> None:
+        if not result.ok:
+            print(f"[{done}/{total}] FAILED {result.job.output}: {result.error}", file=sys.stderr)
+        elif not args.quiet:
+            print(f"[{done}/{total}] {result.job.output}", file=sys.stderr)
+
+    results, skipped = ingest(jobs, manifest, args.jobs, args.force, progress)
+    failures = [r for r in results if not r.ok]
+
+    if not args.quiet or failures or ungrouped:
+        print(f"{len(results) - len(failures)} converted, {skipped} unchanged,"
+              f" {len(failures) + len(ungrouped)} failed,"
+              f" {len(incomplete)} incomplete, {len(unrecognised)} unrecognised", file=sys.stderr)
+    for failure in failures:
+        print(f"  {', '.join(failure.job.files.values())}: {failure.error}", file=sys.stderr)
+
+    return 1 if failures or ungrouped else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
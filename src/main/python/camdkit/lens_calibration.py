@@ -0,0 +1,253 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""Lens calibration tables mapping normalized FIZ encoders to optics
+
+A calibration holds samples of the optical parameters of a lens at a set of
+(focus, zoom) encoder positions. Samples are organised in zoom rows: every
+sample at the same zoom encoder value belongs to one row, and rows may sample
+focus at different positions, which covers both regular grids and the
+per-zoom focus sweeps most calibration procedures produce.
+
+Interpolation first interpolates along focus within the rows bracketing the
+zoom value, then along zoom between those rows. The taps and weights of each
+frame are computed once as an `InterpolationWeights` object and applied to
+every calibrated parameter with a single gather.
+"""
+
+from dataclasses import dataclass
+from enum import StrEnum, unique
+from typing import Final, Optional
+
+import numpy as np
+
+from camdkit.clip import Clip
+from camdkit.distortion import BROWN_CONRADY_D_U
+from camdkit.lens_types import Distortion
+
+__all__ = ['InterpolationMethod', 'InterpolationWeights', 'LensCalibration']
+
+# Optical parameters a calibration may hold: one value per sample for the
+# scalar ones, a table-defined number of coefficients for the distortion ones
+SCALAR_PARAMETERS: Final[tuple[str, ...]] = ('pinhole_focal_length',
+                                             'focus_distance',
+                                             'entrance_pupil_offset')
+DISTORTION_PARAMETERS: Final[tuple[str, ...]] = ('radial', 'tangential')
+
+# Ties within this distance of each other on the zoom axis form one row
+ZOOM_ROW_TOLERANCE: Final[float] = 1e-9
+
+
+@unique
+class InterpolationMethod(StrEnum):
+    LINEAR = "linear"
+    """Piecewise linear along each axis (bilinear on a regular grid)"""
+    CUBIC = "cubic"
+    """Local cubic through the four nearest samples along each axis"""
+
+
+@dataclass(frozen=True)
+class InterpolationWeights:
+    """Sample indices and weights of every frame, each of shape
+    (frames, taps). Interpolated values are the weighted sums of the samples
+    at those indices."""
+    indices: np.ndarray
+    weights: np.ndarray
+
+    def __len__(self) -> int:
+        return self.indices.shape[0]
+
+
+def _axis_weights(nodes: np.ndarray, t: np.ndarray,
+                  method: InterpolationMethod) -> tuple[np.ndarray, np.ndarray]:
+    """Return (indices, weights) of shape (len(t), taps) interpolating along
+    a single axis with sorted nodes. Values outside the nodes are clamped."""
+    n = len(nodes)
+    t = np.clip(t, nodes[0], nodes[-1])
+    if n == 1:
+        return np.zeros((len(t), 1), dtype=np.intp), np.ones((len(t), 1))
+    interval = np.clip(np.searchsorted(nodes, t, side='right') - 1, 0, n - 2)
+    if method == InterpolationMethod.LINEAR or n == 2:
+        x0, x1 = nodes[interval], nodes[interval + 1]
+        b = (t - x0) / (x1 - x0)
+        return (np.stack((interval, interval + 1), axis=1),
+                np.stack((1.0 - b, b), axis=1))
+    taps = min(4, n)
+    first = np.clip(interval - 1, 0, n - taps)
+    indices = first[:, None] + np.arange(taps)
+    x = nodes[indices]
+    # Lagrange basis through the tap nodes
+    weights = np.ones(indices.shape)
+    for j in range(taps):
+        for m in range(taps):
+            if m != j:
+                weights[:, j] *= (t - x[:, m]) / (x[:, j] - x[:, m])
+    return indices, weights
+
+
+class LensCalibration:
+    """Optical parameters sampled over normalized focus and zoom encoders.
+
+    Each parameter is given per sample: `pinhole_focal_length` in
+    millimeters, `focus_distance` in meters, `entrance_pupil_offset` in
+    meters, and `radial` and `tangential` as (samples, coefficients) arrays
+    of coefficients of `distortion_model`. Focus distance is interpolated in
+    diopters, which is closer to linear in the focus encoder than distance.
+    """
+
+    def __init__(self, focus: np.ndarray, zoom: np.ndarray,
+                 pinhole_focal_length: Optional[np.ndarray] = None,
+                 focus_distance: Optional[np.ndarray] = None,
+                 entrance_pupil_offset: Optional[np.ndarray] = None,
+                 radial: Optional[np.ndarray] = None,
+                 tangential: Optional[np.ndarray] = None,
+                 distortion_model: str = BROWN_CONRADY_D_U) -> None:
+        focus = np.asarray(focus, dtype=np.float64).reshape(-1)
+        zoom = np.asarray(zoom, dtype=np.float64).reshape(-1)
+        if len(focus) == 0 or len(focus) != len(zoom):
+            raise ValueError("focus and zoom must have the same, non-zero number of samples")
+        if np.any(np.isnan(focus)) or np.any(np.isnan(zoom)):
+            raise ValueError("encoder positions of calibration samples must not be NaN")
+        self.distortion_model = distortion_model
+        self._tables: dict[str, np.ndarray] = {}
+        given = dict(pinhole_focal_length=pinhole_focal_length,
+                     focus_distance=focus_distance,
+                     entrance_pupil_offset=entrance_pupil_offset,
+                     radial=radial,
+                     tangential=tangential)
+        for name, values in given.items():
+            if values is None:
+                continue
+            values = np.asarray(values, dtype=np.float64)
+            values = values.reshape(len(focus), -1 if name in DISTORTION_PARAMETERS else 1)
+            if name == 'focus_distance':
+                if np.any(values <= 0.0):
+                    raise ValueError("calibrated focus distances must be strictly positive")
+                values = 1.0 / values
+            if name == 'pinhole_focal_length' and np.any(values <= 0.0):
+                raise ValueError("calibrated focal lengths must be strictly positive")
+            self._tables[name] = values
+        if not self._tables:
+            raise ValueError("a lens calibration requires at least one optical parameter")
+        if 'tangential' in self._tables and 'radial' not in self._tables:
+            raise ValueError("tangential distortion requires radial distortion")
+
+        # group samples into zoom rows, each sorted by focus
+        order = np.lexsort((focus, zoom))
+        row_starts = np.flatnonzero(np.diff(zoom[order], prepend=-np.inf) > ZOOM_ROW_TOLERANCE)
+        self._zoom_nodes = zoom[order][row_starts]
+        self._rows: list[tuple[np.ndarray, np.ndarray]] = []
+        for start, stop in zip(row_starts, np.append(row_starts[1:], len(order))):
+            samples = order[start:stop]
+            if np.any(np.diff(focus[samples]) <= 0.0):
+                raise ValueError("a zoom row of a calibration samples the same focus position twice")
+            self._rows.append((focus[samples], samples))
+
+    @classmethod
+    def from_grid(cls, focus: np.ndarray, zoom: np.ndarray,
+                  distortion_model: str = BROWN_CONRADY_D_U,
+                  **tables: np.ndarray) -> "LensCalibration":
+        """Build a calibration from a regular grid. `focus` and `zoom` are
+        the grid positions along each axis and every table has shape
+        (len(focus), len(zoom)), or (len(focus), len(zoom), coefficients) for
+        the distortion coefficients."""
+        focus = np.asarray(focus, dtype=np.float64)
+        zoom = np.asarray(zoom, dtype=np.float64)
+        grid_focus, grid_zoom = np.meshgrid(focus, zoom, indexing='ij')
+        flattened = {}
+        for name, table in tables.items():
+            table = np.asarray(table, dtype=np.float64)
+            if table.shape[:2] != (len(focus), len(zoom)):
+                raise ValueError(f"the {name} table does not match the calibration grid")
+            flattened[name] = table.reshape(len(focus) * len(zoom), *table.shape[2:])
+        return cls(grid_focus.reshape(-1), grid_zoom.reshape(-1),
+                   distortion_model=distortion_model, **flattened)
+
+    @property
+    def parameters(self) -> tuple[str, ...]:
+        """Names of the optical parameters held by the calibration"""
+        return tuple(self._tables)
+
+    def weights(self, focus: np.ndarray, zoom: np.ndarray,
+                method: InterpolationMethod = InterpolationMethod.LINEAR) -> InterpolationWeights:
+        """Precompute the interpolation weights of a sequence of normalized
+        focus and zoom encoder values"""
+        method = InterpolationMethod(method)
+        focus = np.asarray(focus, dtype=np.float64).reshape(-1)
+        zoom = np.asarray(zoom, dtype=np.float64).reshape(-1)
+        if len(focus) != len(zoom):
+            raise ValueError("focus and zoom encoder sequences must have the same length")
+        n = len(focus)
+        # focus weights of every frame within every row, padded to common taps
+        row_taps = max(min(2 if method == InterpolationMethod.LINEAR else 4, len(nodes))
+                       for nodes, _ in self._rows)
+        focus_indices = np.zeros((len(self._rows), n, row_taps), dtype=np.intp)
+        focus_weights = np.zeros((len(self._rows), n, row_taps))
+        for r, (nodes, samples) in enumerate(self._rows):
+            indices, weights = _axis_weights(nodes, focus, method)
+            focus_indices[r, :, :indices.shape[1]] = samples[indices]
+            focus_weights[r, :, :weights.shape[1]] = weights
+        rows, row_weights = _axis_weights(self._zoom_nodes, zoom, method)
+        frames = np.arange(n)
+        indices = focus_indices[rows, frames[:, None]]
+        weights = focus_weights[rows, frames[:, None]] * row_weights[:, :, None]
+        return InterpolationWeights(indices.reshape(n, -1), weights.reshape(n, -1))
+
+    def interpolate(self, weights: InterpolationWeights) -> dict[str, np.ndarray]:
+        """Return each calibrated parameter at the frames of `weights`, as
+        (frames,) arrays for the scalar parameters and (frames, coefficients)
+        arrays for the distortion coefficients"""
+        result = {}
+        for name, table in self._tables.items():
+            values = np.einsum('nt,ntc->nc', weights.weights, table[weights.indices])
+            if name == 'focus_distance':
+                values = 1.0 / values
+            result[name] = values[:, 0] if name in SCALAR_PARAMETERS else values
+        return result
+
+    def evaluate(self, focus: np.ndarray, zoom: np.ndarray,
+                 method: InterpolationMethod = InterpolationMethod.LINEAR) -> dict[str, np.ndarray]:
+        """Interpolate every calibrated parameter at the given encoder values"""
+        return self.interpolate(self.weights(focus, zoom, method))
+
+    def apply(self, clip: Clip,
+              method: InterpolationMethod = InterpolationMethod.LINEAR) -> InterpolationWeights:
+        """Populate the optical parameters of a clip from its normalized
+        lens encoders, replacing existing values. A clip lacking the focus
+        (or zoom) encoder is only accepted if the calibration has a single
+        focus (or zoom) position. Returns the weights used."""
+        encoders = clip.lens_encoders
+        if not encoders:
+            raise ValueError("the clip has no normalized lens encoder values")
+        single_focus = all(len(nodes) == 1 for nodes, _ in self._rows)
+        single_zoom = len(self._rows) == 1
+        focus = np.array([np.nan if e.focus is None else e.focus for e in encoders])
+        zoom = np.array([np.nan if e.zoom is None else e.zoom for e in encoders])
+        if np.any(np.isnan(focus)):
+            if not single_focus:
+                raise ValueError("the focus encoder is missing from some frames of the clip")
+            focus = np.zeros_like(focus)
+        if np.any(np.isnan(zoom)):
+            if not single_zoom:
+                raise ValueError("the zoom encoder is missing from some frames of the clip")
+            zoom = np.full_like(zoom, self._zoom_nodes[0])
+        weights = self.weights(focus, zoom, method)
+        values = self.interpolate(weights)
+        if 'pinhole_focal_length' in values:
+            clip.lens_pinhole_focal_length = tuple(values['pinhole_focal_length'].tolist())
+        if 'focus_distance' in values:
+            clip.lens_focus_distance = tuple(values['focus_distance'].tolist())
+        if 'entrance_pupil_offset' in values:
+            clip.lens_entrance_pupil_offset = tuple(values['entrance_pupil_offset'].tolist())
+        if 'radial' in values:
+            radial = values['radial'].tolist()
+            tangential = values['tangential'].tolist() if 'tangential' in values else None
+            clip.lens_distortions = tuple(
+                (Distortion(model=self.distortion_model,
+                            radial=tuple(radial[i]),
+                            tangential=tuple(tangential[i]) if tangential else None),)
+                for i in range(len(radial)))
+        return weights
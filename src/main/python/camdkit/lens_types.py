@@ -18,6 +18,7 @@
                                    REAL,
                                    REAL_AT_LEAST_UNITY,
                                    ARRAY)
+from camdkit.columns import NonEmptyRunLength
 from camdkit.numeric_types import (StrictlyPositiveFloat, NormalizedFloat,
                                    NonNegativeInt, UnityOrGreaterFloat, NonNegativeFloat)
 from camdkit.string_types import NonBlankUTF8String
@@ -174,9 +175,8 @@ class Lens(CompatibleBaseModel):
     particular producer and consumer.
     """
 
-    distortion: Annotated[tuple[Distortions, ...] | None,
-      Field(min_length=1,
-            json_schema_extra={"clip_property": "lens_distortions",
+    distortion: Annotated[NonEmptyRunLength[Distortions] | None,
+      Field(json_schema_extra={"clip_property": "lens_distortions",
                                "constraints": """The list shall contain at least one Distortion object, and in each
 object the radial and tangential coefficients shall each be real numbers.
 """})] = None
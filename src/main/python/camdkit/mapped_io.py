@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""Memory-mapped access to metadata files
+
+Mapping a file lets readers work over its bytes without first copying them
+into the process: pages are loaded on demand by the operating system and
+can be dropped again under memory pressure, so even multi-gigabyte
+recordings do not grow resident memory by their size.
+"""
+
+import mmap
+from contextlib import contextmanager
+from typing import Final, Iterator
+
+__all__ = ['map_file', 'iter_lines', 'open_lines']
+
+# Bytes decoded at a time when splitting a mapped text file into lines
+DEFAULT_CHUNK_BYTES: Final[int] = 1 << 20
+
+
+@contextmanager
+def map_file(path: str) -> Iterator[memoryview]:
+    """Map a file read-only and provide a memoryview of its contents.
+
+    Slices of the view do not copy the data. Views derived from it must not
+    be retained after the context exits.
+    """
+    with open(path, "rb") as fp:
+        try:
+            mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            yield memoryview(b"")
+            return
+        view = memoryview(mapped)
+        try:
+            yield view
+        finally:
+            view.release()
+            mapped.close()
+
+
+def iter_lines(buffer: bytes | memoryview, encoding: str = "utf-8",
+               chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Iterator[str]:
+    """Yield the lines of a text buffer, decoded a chunk at a time.
+
+    Lines keep their terminating newline and "\\r\\n" and "\\r" are
+    translated to "\\n", as when iterating over a file opened in text mode.
+    A leading byte order mark is dropped for UTF-8 buffers. Chunks always end
+    after a "\\n" so multi-byte characters and "\\r\\n" are never split; a
+    buffer whose lines all end in "\\r" is decoded as a single chunk.
+    """
+    if chunk_bytes < 1:
+        raise ValueError("chunk_bytes must be strictly positive")
+    view = memoryview(buffer)
+    start, end = 0, len(view)
+    if encoding.lower().replace("-", "").replace("_", "") == "utf8" and view[:3] == b"\xef\xbb\xbf":
+        start = 3
+    while start < end:
+        stop = min(start + chunk_bytes, end)
+        if stop < end:
+            # extend the chunk to the end of its last line
+            newline = bytes(view[stop:min(stop + chunk_bytes, end)]).find(b"\n")
+            while newline < 0 and stop < end:
+                stop = min(stop + chunk_bytes, end)
+                newline = bytes(view[stop:min(stop + chunk_bytes, end)]).find(b"\n")
+            stop = end if newline < 0 else stop + newline + 1
+        text = str(view[start:stop], encoding).replace("\r\n", "\n").replace("\r", "\n")
+        lines = text.split("\n")
+        for line in lines[:-1]:
+            yield line + "\n"
+        if lines[-1]:
+            yield lines[-1]
+        start = stop
+
+
+@contextmanager
+def open_lines(path: str, encoding: str = "utf-8",
+               chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Iterator[Iterator[str]]:
+    """Map a text file and provide an iterator over its lines, which can be
+    used wherever the readers iterate over a text file, e.g. by csv.reader"""
+    with map_file(path) as view:
+        lines = iter_lines(view, encoding, chunk_bytes)
+        try:
+            yield lines
+        finally:
+            lines.close()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+'''Mo-Sys F4 to OpenTrackIO bridge
+
+Receives F4 packets over UDP, converts every packet into an OpenTrackIO
+sample with `F4PacketParser.get_tracking_frame` and sends the samples,
+segmented as by the reference sender, to the multicast group of a source
+number. The time spent in each stage is recorded in latency histograms:
+
+  receive  from the kernel receive timestamp to the datagram being read
+           (Linux only)
+  decode   F4 packet to Clip frame
+  encode   Clip frame to segmented JSON or CBOR payload
+  send     handing the segments to the kernel'''
+
+import argparse
+import socket
+import struct
+import sys
+import time
+import typing
+
+from camdkit.mosys.f4 import F4PacketParser, F4StreamDecoder
+from camdkit.transport import (MULTICAST_PORT, MAX_PAYLOAD_SIZE, PayloadFormat, Segmenter,
+                               encode_payload, multicast_group)
+from camdkit.utils import unwrap_clip_to_pseudo_frame
+
+STAGES = ("receive", "decode", "encode", "send")
+# Largest datagram received; F4 packets are at most 1280 bytes
+RECEIVE_BUFFER_BYTES = 65536
+
+_TIMESPEC = struct.Struct("@ll")
+# not exported by the socket module; SCM_TIMESTAMPNS has the same value
+_SO_TIMESTAMPNS = getattr(socket, "SO_TIMESTAMPNS", 35 if sys.platform.startswith("linux") else None)
+
+class LatencyHistogram:
+  '''Histogram of durations in nanoseconds, in `bins` bins of `bin_width`
+  nanoseconds and an overflow bin'''
+
+  def __init__(self, bin_width: int = 10_000, bins: int = 1000):
+    if bin_width < 1 or bins < 1:
+      raise ValueError("bin_width and bins must be strictly positive")
+    self.bin_width = bin_width
+    self.counts = [0] * (bins + 1)
+    self.count = 0
+    self.total = 0
+    self.maximum = 0
+
+  def record(self, duration: int) -> None:
+    duration = max(duration, 0)
+    self.counts[min(duration // self.bin_width, len(self.counts) - 1)] += 1
+    self.count += 1
+    self.total += duration
+    if duration > self.maximum:
+      self.maximum = duration
+
+  def mean(self) -> float:
+    return self.total / self.count if self.count else 0.0
+
+  def percentile(self, q: float) -> int:
+    '''Return an upper bound of the q-th percentile (0 < q <= 100): the end
+    of the bin it falls in, or the maximum for the overflow bin'''
+    if not 0 < q <= 100:
+      raise ValueError("percentiles must be in (0, 100]")
+    if not self.count:
+      return 0
+    rank = q / 100 * self.count
+    cumulative = 0
+    for i, count in enumerate(self.counts[:-1]):
+      cumulative += count
+      if cumulative >= rank:
+        return min((i + 1) * self.bin_width, self.maximum)
+    return self.maximum
+
+  def reset(self) -> None:
+    self.counts = [0] * len(self.counts)
+    self.count = self.total = self.maximum = 0
+
+  def summary(self) -> str:
+    return (f"n={self.count} mean={self.mean() / 1000:.1f}us p50={self.percentile(50) / 1000:.0f}us"
+            f" p99={self.percentile(99) / 1000:.0f}us max={self.maximum / 1000:.1f}us")
+
+class F4Bridge:
+  '''Conversion of received F4 datagrams into OpenTrackIO datagrams sent to
+  `destination`. One parser is used throughout, so all samples share its
+  source id.'''
+
+  def __init__(self, receiver: socket.socket, sender: socket.socket,
+               destination: tuple[str, int],
+               payload_format: PayloadFormat = PayloadFormat.CBOR,
+               source_number: int = 1,
+               parser: F4PacketParser | None = None,
+               max_payload_size: int = MAX_PAYLOAD_SIZE):
+    self.receiver = receiver
+    self.sender = sender
+    self.destination = destination
+    self.payload_format = payload_format
+    self.source_number = source_number
+    self.parser = F4PacketParser() if parser is None else parser
+    self.segmenter = Segmenter(max_payload_size)
+    self.histograms = {stage: LatencyHistogram() for stage in STAGES}
+    self.samples_sent = 0
+    self.decode_errors = 0
+    self._decoder = F4StreamDecoder()
+    self._buffer = bytearray(RECEIVE_BUFFER_BYTES)
+    self._kernel_timestamps = _SO_TIMESTAMPNS is not None
+    if self._kernel_timestamps:
+      receiver.setsockopt(socket.SOL_SOCKET, _SO_TIMESTAMPNS, 1)
+
+  def handle(self, datagram: bytes | memoryview) -> int:
+    '''Convert and send the F4 packets of a datagram. Returns the number of
+    samples sent.'''
+    histograms = self.histograms
+    decoder = self._decoder
+    decoder.initialise(datagram)
+    sent = 0
+    try:
+      while True:
+        start = time.perf_counter_ns()
+        packet = next(decoder, None)
+        if packet is None:
+          break
+        self.parser.initialise_from_packet(packet)
+        try:
+          frame = self.parser.get_tracking_frame()
+        except Exception:
+          # one bad tracker packet must not stop the bridge
+          self.decode_errors += 1
+          continue
+        decoded = time.perf_counter_ns()
+        sample = unwrap_clip_to_pseudo_frame(frame.to_json())
+        sample["sourceNumber"] = self.source_number
+        segments = self.segmenter.segments(encode_payload(sample, self.payload_format),
+                                           self.payload_format)
+        encoded = time.perf_counter_ns()
+        for segment in segments:
+          self.sender.sendto(segment, self.destination)
+        histograms["decode"].record(decoded - start)
+        histograms["encode"].record(encoded - decoded)
+        histograms["send"].record(time.perf_counter_ns() - encoded)
+        sent += 1
+    finally:
+      decoder.release()
+    self.samples_sent += sent
+    return sent
+
+  def serve_once(self) -> int:
+    '''Receive one datagram and convert it. Returns the number of samples
+    sent.'''
+    if self._kernel_timestamps:
+      size, ancillary, _, _ = self.receiver.recvmsg_into([self._buffer], socket.CMSG_SPACE(_TIMESPEC.size))
+      read = time.time_ns()
+      for level, kind, data in ancillary:
+        if level == socket.SOL_SOCKET and kind == _SO_TIMESTAMPNS:
+          seconds, nanoseconds = _TIMESPEC.unpack_from(data)
+          self.histograms["receive"].record(read - (seconds * 1_000_000_000 + nanoseconds))
+    else:
+      size = self.receiver.recv_into(self._buffer)
+    with memoryview(self._buffer) as view, view[:size] as datagram:
+      return self.handle(datagram)
+
+  def serve_forever(self, report_interval: float = 0.0,
+                    report: typing.Callable[["F4Bridge"], None] | None = None) -> None:
+    '''Convert datagrams until interrupted, calling `report` every
+    `report_interval` seconds if both are given'''
+    next_report = time.monotonic() + report_interval
+    while True:
+      self.serve_once()
+      if report is not None and report_interval > 0 and time.monotonic() >= next_report:
+        report(self)
+        next_report = time.monotonic() + report_interval
+
+def open_receiver(host: str, port: int) -> socket.socket:
+  receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+  receiver.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+  receiver.bind((host, port))
+  return receiver
+
+def open_sender(ttl: int = 2, interface: str | None = None) -> socket.socket:
+  sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+  sender.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
+  if interface is not None:
+    sender.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(interface))
+  return sender
+
+def _print_report(bridge: F4Bridge) -> None:
+  lines = [f"{bridge.samples_sent} samples sent, {bridge.decode_errors} decode errors"]
+  for stage, histogram in bridge.histograms.items():
+    if histogram.count:
+      lines.append(f"  {stage:8} {histogram.summary()}")
+    histogram.reset()
+  print("\n".join(lines), file=sys.stderr)
+
+def main(argv: typing.Sequence[str] | None = None) -> int:
+  parser = argparse.ArgumentParser(description="Convert Mo-Sys F4 tracking data received over UDP into"
+                                               " OpenTrackIO samples sent over multicast.")
+  parser.add_argument("listen_port", type=int, help="UDP port receiving F4 packets")
+  parser.add_argument("--listen-host", default="0.0.0.0", help="Address receiving F4 packets")
+  parser.add_argument("-s", "--source", type=int, default=1, help="OpenTrackIO source number (1-200)")
+  parser.add_argument("-p", "--port", type=int, default=MULTICAST_PORT, help="OpenTrackIO destination port")
+  parser.add_argument("-f", "--format", choices=("json", "cbor"), default="cbor", help="Payload format")
+  parser.add_argument("--destination", default=None,
+                      help="Destination address, instead of the multicast group of the source number")
+  parser.add_argument("--ttl", type=int, default=2, help="Multicast time to live")
+  parser.add_argument("--interface", default=None, help="Address of the multicast sending interface")
+  parser.add_argument("--report", type=float, default=10.0,
+                      help="Seconds between latency reports on stderr (0 disables them)")
+  args = parser.parse_args(argv)
+
+  try:
+    group = multicast_group(args.source)
+  except ValueError as e:
+    parser.error(str(e))
+  payload_format = PayloadFormat.CBOR if args.format == "cbor" else PayloadFormat.JSON
+  bridge = F4Bridge(open_receiver(args.listen_host, args.listen_port),
+                    open_sender(args.ttl, args.interface),
+                    (args.destination or group, args.port),
+                    payload_format, args.source)
+  try:
+    bridge.serve_forever(args.report, _print_report)
+  except KeyboardInterrupt:
+    _print_report(bridge)
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
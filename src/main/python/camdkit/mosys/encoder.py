@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+'''Mo-Sys F4 encoder
+
+The inverse of `F4PacketParser`: columns of tracking data, or a Clip, are
+encoded into F4 packets, one row of an (N, size) uint8 array per frame, for
+writing test recordings or sending synthetic tracking data over UDP.
+
+Columns are named as follows and decode to the matching Clip parameters:
+
+  pan tilt roll              degrees, in steps of 1/1000
+  x y z                      transform translation, in steps of 1/1000
+  focus iris zoom            normalized encoders, in steps of 1/65536
+  entrance_pupil_offset k1 k2 cx cy f_number
+                             lens parameters, as float32
+  pinhole_focal_length       sent as the horizontal field of view of a 36 mm
+                             wide sensor
+  focus_distance             sent as its inverse
+  timecode                   (N, 4) hours, minutes, seconds and frames, at
+                             `frame_rate` 24, 25 or 30
+  tracker_status             index in F4.TRACKING_STATUS_STRINGS'''
+
+import math
+import socket
+import time
+import typing
+
+import numpy as np
+
+from camdkit.model import Clip
+from camdkit.mosys.f4 import F4
+
+_ANGLE, _LINEAR, _ENCODER, _PARAM = range(4)
+
+# axes in the order of the Mo-Sys sample recordings
+_AXES = (("entrance_pupil_offset", F4.FIELD_ID_ENTRANCE_PUPIL, _PARAM),
+         ("k1", F4.FIELD_ID_LENS_DISTORTION_K1, _PARAM),
+         ("k2", F4.FIELD_ID_LENS_DISTORTION_K2, _PARAM),
+         ("pinhole_focal_length", F4.FIELD_ID_FOCAL_LENGTH_FX, _PARAM),
+         ("cx", F4.FIELD_ID_CX, _PARAM),
+         ("cy", F4.FIELD_ID_CY, _PARAM),
+         ("focus_distance", F4.FIELD_ID_FOCAL_DISTANCE, _PARAM),
+         ("f_number", F4.FIELD_ID_APERTURE, _PARAM),
+         ("focus", F4.FIELD_ID_FOCUS, _ENCODER),
+         ("zoom", F4.FIELD_ID_ZOOM, _ENCODER),
+         ("iris", F4.FIELD_ID_IRIS, _ENCODER),
+         ("x", F4.FIELD_ID_X, _LINEAR),
+         ("y", F4.FIELD_ID_Y, _LINEAR),
+         ("z", F4.FIELD_ID_HEIGHT, _LINEAR),
+         ("pan", F4.FIELD_ID_PAN, _ANGLE),
+         ("tilt", F4.FIELD_ID_TILT, _ANGLE),
+         ("roll", F4.FIELD_ID_ROLL, _ANGLE))
+COLUMNS = tuple(name for name, _, _ in _AXES) + ("timecode", "tracker_status")
+
+_FRAME_RATE_CODES = {24: 0b00, 25: 0b01, 30: 0b10}
+_MAX_24_BIT = (1 << 23) - 1
+
+def _column(values, n: int, name: str) -> np.ndarray:
+  column = np.asarray(values, dtype=np.float64)
+  if column.shape != (n,):
+    raise ValueError(f"the {name} column must hold {n} values")
+  return column
+
+def _fixed_point(values: np.ndarray, factor: int, name: str) -> np.ndarray:
+  raw = np.rint(values * factor).astype(np.int64)
+  if (np.abs(raw) > _MAX_24_BIT).any():
+    raise ValueError(f"{name} values exceed the 24-bit range of F4")
+  return raw & 0xFFFFFF
+
+def _lens_param(name: str, values: np.ndarray) -> np.ndarray:
+  # inverse of the conversions of F4PacketParser.get_tracking_frame
+  if name == "entrance_pupil_offset":
+    return values / 1000.0
+  if name == "pinhole_focal_length":
+    if (values <= 0).any():
+      raise ValueError("pinhole focal lengths must be strictly positive")
+    return np.degrees(2.0 * np.arctan(18.0 / values))
+  if name == "focus_distance":
+    if (values == 0).any():
+      raise ValueError("focus distances must not be 0")
+    return 1.0 / values
+  return values
+
+def encode_packets(columns: typing.Mapping[str, typing.Any], count: int | None = None,
+                   camera_id: int | typing.Sequence[int] = 1,
+                   sequence_number: typing.Sequence[int] | None = None,
+                   recording: bool | typing.Sequence[bool] = False,
+                   synchronized: bool | typing.Sequence[bool] = False,
+                   frame_rate: int = 25) -> np.ndarray:
+  '''Encode columns of tracking data into an (N, size) uint8 array of F4
+  packets. `camera_id`, `recording` and `synchronized` are given once or per
+  packet; `sequence_number` defaults to the packet index. Packets carry the
+  axes of the given columns only.'''
+  unknown = set(columns) - set(COLUMNS)
+  if unknown:
+    raise ValueError(f"unknown F4 columns: {', '.join(sorted(unknown))}")
+  if not columns:
+    raise ValueError("packets need at least one column")
+  if count is None:
+    count = len(next(iter(columns.values())))
+  n = count
+  axes = [axis for axis in _AXES if axis[0] in columns]
+  axis_count = len(axes) + ("timecode" in columns) + ("tracker_status" in columns)
+  size = 5 + 5 * axis_count
+  packets = np.zeros((n, size), dtype=np.uint8)
+
+  camera_ids = np.broadcast_to(np.asarray(camera_id, dtype=np.int64), (n,))
+  if ((camera_ids < 0) | (camera_ids > 0xFF)).any():
+    raise ValueError("camera ids must fit a byte")
+  sequence = (np.arange(n) if sequence_number is None
+              else np.broadcast_to(np.asarray(sequence_number, dtype=np.int64), (n,)))
+  packets[:, 0] = F4.COMMAND_BYTE
+  packets[:, 1] = camera_ids
+  packets[:, 2] = axis_count
+  packets[:, 3] = ((sequence % 16)
+                   | (np.broadcast_to(np.asarray(recording, dtype=bool), (n,)) << 4)
+                   | (np.broadcast_to(np.asarray(synchronized, dtype=bool), (n,)) << 5))
+
+  block = 4
+  for name, axis_id, kind in axes:
+    values = _column(columns[name], n, name)
+    packets[:, block] = axis_id
+    if kind == _ANGLE or kind == _LINEAR:
+      raw = _fixed_point(values, F4.ANGLE_FACTOR if kind == _ANGLE else F4.LINEAR_FACTOR, name)
+      packets[:, block + 2] = raw >> 16
+      packets[:, block + 3] = (raw >> 8) & 0xFF
+      packets[:, block + 4] = raw & 0xFF
+    elif kind == _ENCODER:
+      if ((values < 0) | (values > 1)).any():
+        raise ValueError(f"{name} encoder values must be between 0 and 1")
+      raw = np.minimum(np.rint(values * 65536.0), 0xFFFF).astype(np.uint16)
+      packets[:, block + 3] = raw >> 8
+      packets[:, block + 4] = raw & 0xFF
+    else:
+      packets[:, block + 1:block + 5] = (_lens_param(name, values).astype(">f4")
+                                         .view(np.uint8).reshape(n, 4))
+    block += 5
+
+  if "timecode" in columns:
+    timecode = np.asarray(columns["timecode"], dtype=np.int64)
+    if timecode.shape != (n, 4):
+      raise ValueError(f"the timecode column must hold {n} rows of hours, minutes, seconds and frames")
+    if frame_rate not in _FRAME_RATE_CODES:
+      raise ValueError("F4 timecode frame rates are 24, 25 or 30")
+    hours, minutes, seconds, frames = timecode.T
+    if ((hours < 0) | (hours > 23) | (minutes < 0) | (minutes > 59) | (seconds < 0) | (seconds > 59)
+        | (frames < 0) | (frames >= frame_rate)).any():
+      raise ValueError("invalid timecode")
+    packets[:, block] = F4.FIELD_ID_TIMECODE
+    packets[:, block + 1] = _FRAME_RATE_CODES[frame_rate] << 5
+    packets[:, block + 2] = (hours << 2) | (minutes >> 4)
+    packets[:, block + 3] = ((minutes & 0xF) << 4) | (seconds >> 2)
+    packets[:, block + 4] = ((seconds & 0b11) << 6) | frames
+    block += 5
+
+  if "tracker_status" in columns:
+    status = np.broadcast_to(np.asarray(columns["tracker_status"], dtype=np.int64), (n,))
+    if ((status < 0) | (status >= len(F4.TRACKING_STATUS_STRINGS))).any():
+      raise ValueError("tracker status indices must be below 16")
+    packets[:, block] = F4.TRACKING_STATUS
+    packets[:, block + 3] = status << 4
+
+  packets[:, -1] = (0x40 - packets[:, :-1].sum(axis=1, dtype=np.int64)) % 256
+  return packets
+
+def timecodes(start: tuple[int, int, int, int], count: int, frame_rate: int = 25) -> np.ndarray:
+  '''Return `count` consecutive (hours, minutes, seconds, frames) rows from
+  `start`, wrapping at 24 hours'''
+  hours, minutes, seconds, frames = start
+  index = (((hours * 60 + minutes) * 60 + seconds) * frame_rate + frames + np.arange(count, dtype=np.int64))
+  index %= 24 * 3600 * frame_rate
+  seconds_index, frames = np.divmod(index, frame_rate)
+  minutes_index, seconds = np.divmod(seconds_index, 60)
+  hours, minutes = np.divmod(minutes_index, 60)
+  return np.stack((hours, minutes, seconds, frames), axis=1)
+
+def synthetic_columns(count: int, frame_rate: int = 25, seed: int | None = None,
+                      start_timecode: tuple[int, int, int, int] = (0, 0, 0, 0)) -> dict[str, np.ndarray]:
+  '''Return columns of smooth random camera motion and lens changes, for load
+  testing'''
+  rng = np.random.default_rng(seed)
+  t = np.arange(count) / frame_rate
+
+  def wander(amplitude: float, offset: float = 0.0) -> np.ndarray:
+    frequencies = rng.uniform(0.02, 0.5, 3)
+    phases = rng.uniform(0, 2 * math.pi, 3)
+    waves = np.sin(2 * math.pi * frequencies[:, None] * t + phases[:, None]).sum(axis=0) / 3
+    return offset + amplitude * waves
+
+  return {"pan": wander(170.0),
+          "tilt": wander(60.0),
+          "roll": wander(10.0),
+          "x": wander(5.0),
+          "y": wander(5.0),
+          "z": wander(0.5, 1.5),
+          "focus": wander(0.45, 0.5),
+          "iris": wander(0.45, 0.5),
+          "zoom": wander(0.45, 0.5),
+          "pinhole_focal_length": wander(30.0, 50.0),
+          "focus_distance": wander(4.0, 5.0),
+          "f_number": wander(3.0, 5.6),
+          "entrance_pupil_offset": wander(0.05, 0.1),
+          "k1": wander(0.05),
+          "k2": wander(0.01),
+          "cx": wander(0.1),
+          "cy": wander(0.1),
+          "timecode": timecodes(start_timecode, count, frame_rate),
+          "tracker_status": np.full(count, F4.TRACKING_STATUS_STRINGS.index("Optical Good"))}
+
+def clip_columns(clip: Clip) -> tuple[dict[str, typing.Any], dict[str, typing.Any]]:
+  '''Return the F4 columns of the parameters of a clip, with the keyword
+  arguments of `encode_packets` describing the clip'''
+  n = len(clip.sample_id) if clip.sample_id else len(clip.transforms or ())
+  columns: dict[str, typing.Any] = {}
+  arguments: dict[str, typing.Any] = {}
+  if clip.transforms:
+    cameras = [frame[0] for frame in clip.transforms]
+    n = len(cameras)
+    for axis in ("x", "y", "z"):
+      columns[axis] = [getattr(t.translation, axis) or 0.0 for t in cameras]
+    for axis in ("pan", "tilt", "roll"):
+      columns[axis] = [getattr(t.rotation, axis) or 0.0 for t in cameras]
+    ids = [t.id.rsplit(" ", 1)[-1] if t.id else "" for t in cameras]
+    if all(i.isdigit() for i in ids):
+      arguments["camera_id"] = [int(i) for i in ids]
+  if clip.lens_encoders:
+    for axis in ("focus", "iris", "zoom"):
+      values = [getattr(e, axis) for e in clip.lens_encoders]
+      if all(v is not None for v in values):
+        columns[axis] = values
+  if clip.lens_distortions:
+    radial = [frame[0].radial if frame else () for frame in clip.lens_distortions]
+    columns["k1"] = [r[0] if len(r) > 0 else 0.0 for r in radial]
+    columns["k2"] = [r[1] if len(r) > 1 else 0.0 for r in radial]
+  if clip.lens_projection_offset:
+    columns["cx"] = [o.x for o in clip.lens_projection_offset]
+    columns["cy"] = [o.y for o in clip.lens_projection_offset]
+  for name, parameter in (("pinhole_focal_length", "lens_pinhole_focal_length"),
+                          ("focus_distance", "lens_focus_distance"),
+                          ("f_number", "lens_f_number"),
+                          ("entrance_pupil_offset", "lens_entrance_pupil_offset")):
+    values = getattr(clip, parameter)
+    if values:
+      columns[name] = [float(v) for v in values]
+  if clip.timing_timecode:
+    rates = {tc.frame_rate.num / tc.frame_rate.denom for tc in clip.timing_timecode}
+    if len(rates) != 1:
+      raise ValueError("the timecode frame rate must be constant")
+    arguments["frame_rate"] = int(rates.pop())
+    columns["timecode"] = [(tc.hours, tc.minutes, tc.seconds, tc.frames) for tc in clip.timing_timecode]
+  if clip.tracker_status:
+    columns["tracker_status"] = [F4.TRACKING_STATUS_STRINGS.index(s) for s in clip.tracker_status]
+  if clip.tracker_recording:
+    arguments["recording"] = list(clip.tracker_recording)
+  if clip.timing_sequence_number:
+    arguments["sequence_number"] = list(clip.timing_sequence_number)
+  if clip.timing_synchronization:
+    arguments["synchronized"] = [bool(s.locked) for s in clip.timing_synchronization]
+  arguments["count"] = n
+  return columns, arguments
+
+def encode_clip(clip: Clip) -> np.ndarray:
+  '''Encode the frames of a clip into an (N, size) uint8 array of F4
+  packets'''
+  columns, arguments = clip_columns(clip)
+  return encode_packets(columns, **arguments)
+
+def write_packets(fp: typing.BinaryIO, packets: np.ndarray | typing.Iterable[np.ndarray]) -> int:
+  '''Write packet arrays, e.g. successive chunks of a long recording, to a
+  binary file. Returns the number of packets written.'''
+  if isinstance(packets, np.ndarray):
+    packets = (packets,)
+  written = 0
+  for chunk in packets:
+    fp.write(np.ascontiguousarray(chunk, dtype=np.uint8).data)
+    written += len(chunk)
+  return written
+
+def send_paced(sock: socket.socket, address, packets: np.ndarray, rate: float,
+               packets_per_datagram: int = 1,
+               clock: typing.Callable[[], float] = time.perf_counter,
+               sleep: typing.Callable[[float], None] = time.sleep) -> float:
+  '''Send packets to `address`, `packets_per_datagram` at a time, at `rate`
+  datagrams per second. Datagrams are scheduled from the start time so that
+  delays do not accumulate. Returns the largest delay, in seconds, of a
+  datagram behind its schedule.'''
+  if rate <= 0 or packets_per_datagram < 1:
+    raise ValueError("rate and packets_per_datagram must be strictly positive")
+  data = np.ascontiguousarray(packets, dtype=np.uint8)
+  size = data.shape[1]
+  step = size * packets_per_datagram
+  interval = 1.0 / rate
+  lateness = 0.0
+  with memoryview(data).cast("B") as view:
+    start = clock()
+    for i, offset in enumerate(range(0, len(view), step)):
+      due = start + i * interval
+      now = clock()
+      if due > now:
+        sleep(due - now)
+      else:
+        lateness = max(lateness, now - due)
+      sock.sendto(view[offset:offset + step], address)
+  return lateness
@@ -10,9 +10,15 @@
 import struct
 import uuid
 
+from camdkit.columns import RunLengthColumn
 from camdkit.framework import *
+from camdkit.identifiers import new_sample_id, clip_with_trusted_sample_ids
 from camdkit.model import Clip, Synchronization, OPENTRACKIO_PROTOCOL_NAME, OPENTRACKIO_PROTOCOL_VERSION
 
+# columns of immutable values shared by all frames, validated once
+_SOURCE_NUMBER_COLUMN = RunLengthColumn((1,))
+_TIMING_MODE_COLUMN = RunLengthColumn(("internal",))
+
 class F4:
   
   FIELD_ID_PAN                = 0x01
@@ -59,12 +65,19 @@ class F4:
     "Internal Error"
   ]
 
+_HEADER = struct.Struct(">BBBB")
+_AXIS_BLOCK = struct.Struct(">BBBBB")
+
 class F4AxisBlock:
-  axis_id: int = 0
-  axis_status: int = 0
-  data_bits1: int = 0
-  data_bits2: int = 0
-  data_bits3: int = 0
+  __slots__ = ("axis_id", "axis_status", "data_bits1", "data_bits2", "data_bits3")
+
+  def __init__(self, axis_id: int = 0, axis_status: int = 0,
+               data_bits1: int = 0, data_bits2: int = 0, data_bits3: int = 0):
+    self.axis_id = axis_id
+    self.axis_status = axis_status
+    self.data_bits1 = data_bits1
+    self.data_bits2 = data_bits2
+    self.data_bits3 = data_bits3
 
   def to_timecode(self) -> Timecode:
      match ((self.axis_status >> 5) & 0b11):
@@ -87,51 +100,151 @@ def to_timecode(self) -> Timecode:
                      frame_rate=frame_rate,sub_frame=sub_frame,dropFrame=dropFrame)
 
 class F4Packet:
-  command_byte: int = 0
-  camera_id: int = 0
-  axis_count: int = 0
-  status: int = 0
-  checksum: int = 0
-  size: int = 0
-  axis_block_list: list[F4AxisBlock] = []
-
-  def initialise(self, buffer: bytes) -> bool:
-    if len(buffer) == 0:
+
+  def __init__(self):
+    self.command_byte: int = 0
+    self.camera_id: int = 0
+    self.axis_count: int = 0
+    self.status: int = 0
+    self.checksum: int = 0
+    self.size: int = 0
+    self.axis_block_list: list[F4AxisBlock] = []
+
+  def initialise(self, buffer: bytes | memoryview, offset: int = 0) -> bool:
+    """Read the header of the packet starting at `offset` in `buffer`"""
+    if len(buffer) < offset + 4:
       return False
-    self.command_byte = buffer[0]
+    self.command_byte, self.camera_id, self.axis_count, self.status = _HEADER.unpack_from(buffer, offset)
     if self.command_byte != F4.COMMAND_BYTE:
         return False
-    self.camera_id = buffer[1]
-    self.axis_count = buffer[2]
     if self.axis_count == 0:
         return False
-    self.size = self.axis_count * 5 + 5;    
-    if self.size > len(buffer):
+    self.size = self.axis_count * 5 + 5;
+    if offset + self.size > len(buffer):
         return False
-    self.status = buffer[3]
-    self.checksum = buffer[self.size - 1]
+    self.checksum = buffer[offset + self.size - 1]
     return True
 
-  def allocate_axis_blocks(self, buffer: bytes):
-    if len(self.axis_block_list) != 0:
-      self.axis_block_list.clear()
-
-    for i in range(0, self.axis_count):
-      axis_block = F4AxisBlock()
-      offset = i * 5
-      axis_block.axis_id = buffer[offset]
-      axis_block.axis_status = buffer[offset + 1]
-      axis_block.data_bits1 = buffer[offset + 2]
-      axis_block.data_bits2 = buffer[offset + 3]
-      axis_block.data_bits3 = buffer[offset + 4]
-      self.axis_block_list.append(axis_block)
-    
+  def allocate_axis_blocks(self, buffer: bytes | memoryview, offset: int = 0):
+    """Read the axis blocks starting at `offset` in `buffer`. The blocks of
+    the previous packet are reused."""
+    axis_block_list = self.axis_block_list
+    if len(axis_block_list) > self.axis_count:
+      del axis_block_list[self.axis_count:]
+    while len(axis_block_list) < self.axis_count:
+      axis_block_list.append(F4AxisBlock())
+    for axis_block in axis_block_list:
+      (axis_block.axis_id, axis_block.axis_status,
+       axis_block.data_bits1, axis_block.data_bits2, axis_block.data_bits3) = _AXIS_BLOCK.unpack_from(buffer, offset)
+      offset += 5
+
+class F4StreamDecoder:
+  """Iterator over the F4 packets of a buffer, e.g. a memory-mapped
+  recording. The buffer is walked in place with offsets, and after a packet
+  fails its checksum or has no axes, decoding resumes at the next 0xF4
+  command byte. A packet running past the end of the buffer ends iteration,
+  unless a valid packet follows it, and is left at `offset` so decoding can
+  resume once more data arrives. Each packet is a new `F4Packet`, so
+  packets can be kept while iterating."""
+
+  _SCAN_WINDOW = 4096
+
+  def __init__(self, buffer: bytes | memoryview = b"", offset: int = 0):
+    self.initialise(buffer, offset)
+
+  def initialise(self, buffer: bytes | memoryview, offset: int = 0) -> None:
+    self._view = memoryview(buffer)
+    self.offset = offset
+    self.packets_decoded = 0
+    self.checksum_errors = 0
+    self.bytes_skipped = 0
+
+  def release(self) -> None:
+    """Release the view of the buffer, e.g. before unmapping it"""
+    self._view.release()
+
+  def _resync(self, start: int) -> int:
+    # offset of the next command byte at or after start, or the end
+    view = self._view
+    while start < len(view):
+      found = bytes(view[start:start + self._SCAN_WINDOW]).find(F4.COMMAND_BYTE)
+      if found >= 0:
+        return start + found
+      start += self._SCAN_WINDOW
+    return len(view)
+
+  def _checksum_ok(self, offset: int, size: int) -> bool:
+    view = self._view
+    return (0x40 - sum(view[offset:offset + size - 1])) % 256 == view[offset + size - 1]
+
+  def _next_valid(self, start: int) -> int | None:
+    # offset of the next whole packet with a valid checksum, if any
+    view = self._view
+    offset = self._resync(start)
+    while offset + 4 <= len(view):
+      size = view[offset + 2] * 5 + 5
+      if size > 5 and offset + size <= len(view) and self._checksum_ok(offset, size):
+        return offset
+      offset = self._resync(offset + 1)
+    return None
+
+  def __iter__(self):
+    return self
+
+  def __next__(self) -> F4Packet:
+    view = self._view
+    end = len(view)
+    while self.offset + 4 <= end:
+      offset = self.offset
+      if view[offset] != F4.COMMAND_BYTE:
+        self.offset = self._resync(offset)
+        self.bytes_skipped += self.offset - offset
+        continue
+      axis_count = view[offset + 2]
+      size = axis_count * 5 + 5
+      if axis_count == 0:
+        self.offset = self._resync(offset + 1)
+        self.bytes_skipped += self.offset - offset
+        continue
+      if offset + size > end:
+        # a corrupted axis count also looks like a truncated packet
+        following = self._next_valid(offset + 1)
+        if following is None:
+          break
+        self.offset = following
+        self.bytes_skipped += following - offset
+        continue
+      if not self._checksum_ok(offset, size):
+        self.checksum_errors += 1
+        self.offset = self._resync(offset + 1)
+        self.bytes_skipped += self.offset - offset
+        continue
+      packet = F4Packet()
+      packet.initialise(view, offset)
+      packet.allocate_axis_blocks(view, offset + 4)
+      self.offset = offset + size
+      self.packets_decoded += 1
+      return packet
+    raise StopIteration
 
 class F4PacketParser:
-  _packet: F4Packet = F4Packet()
-  _frame_number: int = 0
-  _initialised: bool = False
-  _source_id = uuid.uuid4().urn
+  """Parser of F4 packets into single frame Clips. All state is held by the
+  instance, and the storage of the axis blocks is reused from one packet to
+  the next, so a parser should be used by one thread at a time; parsers
+  can be run in parallel. Frames carry the parser's `source_id`, so one
+  parser should be used per tracker."""
+
+  def __init__(self, source_id: str | None = None):
+    self._own_packet = F4Packet()
+    self._packet = self._own_packet
+    self._frame_number = 0
+    self._initialised = False
+    self._source_id = uuid.uuid4().urn if source_id is None else source_id
+    self._source_id_column = RunLengthColumn((self._source_id,))
+
+  @property
+  def source_id(self) -> str:
+    return self._source_id
 
   def _twos_comp(self, val, bits):
     if (val & (1 << (bits - 1))) != 0:
@@ -171,38 +284,43 @@ def _axis_block_to_status_string(self, axis_block: F4AxisBlock) -> str:
     detail = ((axis_block.data_bits2 >> 4) & 0xF)
     return F4.TRACKING_STATUS_STRINGS[detail]
 
-  def _compute_f4_checksum(self, buffer: bytes) -> int:
-      total: int = 0x40
-      for i in range(0, self._packet.size - 1):
-        total -= buffer[i]
-      return total % 256
+  def _compute_f4_checksum(self, buffer: bytes | memoryview, offset: int = 0) -> int:
+      return (0x40 - sum(memoryview(buffer)[offset:offset + self._packet.size - 1])) % 256
 
-  def initialise(self, buffer: bytes) -> bool:
-    if not self._packet.initialise(buffer):
+  def initialise(self, buffer: bytes | memoryview, offset: int = 0) -> bool:
+    self._initialised = False
+    self._packet = self._own_packet
+    if not self._packet.initialise(buffer, offset):
         return False
     self._frame_number = self._packet.status % 16
 
-    checksum = self._compute_f4_checksum(buffer)
+    checksum = self._compute_f4_checksum(buffer, offset)
     if checksum != self._packet.checksum:
         return False
 
-    self._packet.allocate_axis_blocks(buffer[4:])
+    self._packet.allocate_axis_blocks(buffer, offset + 4)
 
     self._initialised = True
     return True
+
+  def initialise_from_packet(self, packet: F4Packet) -> None:
+    """Use a packet already decoded and verified, e.g. by `F4StreamDecoder`"""
+    self._packet = packet
+    self._frame_number = packet.status % 16
+    self._initialised = True
        
   def get_tracking_frame(self) -> Clip:
     # Populates a Clip with a single frame of data of each parameter
     frame = Clip()
     if self._initialised:
+      frame = clip_with_trusted_sample_ids((new_sample_id(),))
       translation = Vector3(0,0,0)
       rotation = Rotator3(0,0,0)
       focus = iris = zoom = frequency = None
       k1 = k2 = cx = cy = fov_h = fov_v = 0.0
-      frame.protocol = (VersionedProtocol(OPENTRACKIO_PROTOCOL_NAME,OPENTRACKIO_PROTOCOL_VERSION),)
-      frame.sample_id = (uuid.uuid4().urn,)
-      frame.source_id = (self._source_id,)
-      frame.source_number = (1,)
+      frame.protocol = RunLengthColumn((VersionedProtocol(OPENTRACKIO_PROTOCOL_NAME, OPENTRACKIO_PROTOCOL_VERSION),))
+      frame.source_id = self._source_id_column
+      frame.source_number = _SOURCE_NUMBER_COLUMN
       frame.tracker_recording = ((self._packet.status & (1 << 4)) != 0,)
       for i in range(0, self._packet.axis_count):
         axis_block = self._packet.axis_block_list[i]
@@ -242,6 +360,8 @@ def get_tracking_frame(self) -> Clip:
             pass
           case F4.FIELD_ID_FOCAL_DISTANCE:
             inv_focal_d = self._axis_block_to_lens_param(axis_block)
+            if inv_focal_d == 0.0:
+              raise ValueError("the inverse focus distance is 0")
             # In mm
             frame.lens_focus_distance = ((1.0 / inv_focal_d),)
             pass
@@ -268,7 +388,7 @@ def get_tracking_frame(self) -> Clip:
             frame.tracker_status = (self._axis_block_to_status_string(axis_block),)
             pass
       
-      frame.timing_mode = ("internal",)
+      frame.timing_mode = _TIMING_MODE_COLUMN
       frame.timing_sequence_number = (self._frame_number,)
       syncEnabled = (self._packet.status & (1 << 5)) != 0
       sync = Synchronization(
@@ -287,7 +407,8 @@ def get_tracking_frame(self) -> Clip:
       if fov_h != 0.0:
         fov_radians = fov_h * math.pi / 180.0
         frame.lens_pinhole_focal_length = (36.0 / (2.0 * math.tan(fov_radians/2.0)),)
-      frame.lens_encoders = (FizEncoders(focus, iris, zoom),)
+      if focus is not None or iris is not None or zoom is not None:
+        frame.lens_encoders = (FizEncoders(focus, iris, zoom),)
       frame.lens_distortions = ((Distortion(radial=(k1, k2),),),)
       frame.lens_projection_offset = (ProjectionOffset(cx, cy),)
     return frame
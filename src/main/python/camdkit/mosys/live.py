@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+'''Live Mo-Sys F4 tracking data
+
+Trackers send one F4 packet per frame, over UDP or a serial line. An
+`F4LiveSource` is fed the received bytes, decodes them with one persistent
+parser, keeps the most recent frames in a ring buffer and hands them to
+asyncio consumers. Corrupted packets are skipped by resynchronising on the
+next command byte.
+
+Serial lines are read through any `asyncio.StreamReader`, e.g. the one
+returned by `serial_asyncio.open_serial_connection` from pyserial-asyncio.'''
+
+import asyncio
+import collections
+import dataclasses
+import time
+import typing
+
+from camdkit.model import Clip
+from camdkit.mosys.f4 import F4PacketParser, F4StreamDecoder
+
+DEFAULT_RING_SIZE = 256
+# Bytes kept while waiting for the rest of a packet on a byte stream; a
+# packet has at most 255 axes
+MAX_PENDING_BYTES = 5 + 5 * 255
+STREAM_READ_BYTES = 4096
+
+@dataclasses.dataclass(frozen=True)
+class LiveFrame:
+  '''A decoded frame. `index` counts the frames of the source from 0 and
+  `received` is the `time.time()` at which its bytes arrived.'''
+  index: int
+  received: float
+  clip: Clip
+
+@dataclasses.dataclass(frozen=True)
+class LiveStatistics:
+  '''Counters of a source since it was created, and the rates measured
+  over the last complete reporting interval'''
+  datagrams: int = 0
+  bytes: int = 0
+  packets: int = 0
+  checksum_errors: int = 0
+  bytes_skipped: int = 0
+  decode_errors: int = 0
+  frames_dropped: int = 0
+  packets_per_second: float = 0.0
+  bytes_per_second: float = 0.0
+  errors_per_second: float = 0.0
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+
+  def __init__(self, source: "F4LiveSource"):
+    self._source = source
+
+  def datagram_received(self, data: bytes, addr) -> None:
+    self._source.feed_datagram(data)
+
+  def error_received(self, exc: Exception) -> None:
+    self._source.receive_errors += 1
+
+class F4LiveSource:
+  '''Decoder of live F4 data into a ring buffer of `LiveFrame`s.
+
+  `feed` accepts arbitrary pieces of a byte stream and `feed_datagram`
+  whole datagrams. Both are called from the event loop thread. Each call to
+  `frames` iterates over the frames decoded from then on; a consumer falling
+  more than `ring_size` frames behind skips to the oldest frame still
+  buffered, and the skipped frames are counted as dropped.'''
+
+  def __init__(self, parser: F4PacketParser | None = None,
+               ring_size: int = DEFAULT_RING_SIZE,
+               clock: typing.Callable[[], float] = time.time):
+    if ring_size < 1:
+      raise ValueError("ring_size must be strictly positive")
+    self.parser = F4PacketParser() if parser is None else parser
+    self.ring: collections.deque[LiveFrame] = collections.deque(maxlen=ring_size)
+    self.receive_errors = 0
+    self._clock = clock
+    self._pending = bytearray()
+    self._decoder = F4StreamDecoder()
+    self._frame_count = 0
+    self._closed = False
+    self._new_frames = asyncio.Event()
+    self._counters = collections.Counter()
+    self._last_report = (clock(), collections.Counter())
+    self._rates = (0.0, 0.0, 0.0)
+
+  @property
+  def closed(self) -> bool:
+    return self._closed
+
+  def _decode(self, buffer: bytes | memoryview, received: float) -> int:
+    # decode the whole packets of buffer; returns the offset of the rest
+    decoder = self._decoder
+    decoder.initialise(buffer)
+    try:
+      for packet in decoder:
+        self.parser.initialise_from_packet(packet)
+        try:
+          clip = self.parser.get_tracking_frame()
+        except Exception:
+          # e.g. values out of the range of the model; one bad packet must
+          # not stop the source
+          self._counters["decode_errors"] += 1
+          continue
+        self.ring.append(LiveFrame(self._frame_count, received, clip))
+        self._frame_count += 1
+    finally:
+      self._counters["packets"] += decoder.packets_decoded
+      self._counters["checksum_errors"] += decoder.checksum_errors
+      self._counters["bytes_skipped"] += decoder.bytes_skipped
+      decoder.release()
+    if decoder.packets_decoded:
+      self._new_frames.set()
+    return decoder.offset
+
+  def feed(self, data: bytes) -> None:
+    '''Decode a piece of a byte stream. Bytes of an incomplete packet are
+    kept until the next call.'''
+    received = self._clock()
+    self._counters["bytes"] += len(data)
+    pending = self._pending
+    pending += data
+    try:
+      self._decode(pending, received)
+    finally:
+      # the packets decoded, or failing to decode, are not fed again
+      del pending[:self._decoder.offset]
+    if len(pending) > MAX_PENDING_BYTES:
+      self._counters["bytes_skipped"] += len(pending)
+      pending.clear()
+
+  def feed_datagram(self, data: bytes) -> None:
+    '''Decode a datagram. Packets do not span datagrams, so a truncated
+    packet at its end is skipped.'''
+    received = self._clock()
+    self._counters["datagrams"] += 1
+    self._counters["bytes"] += len(data)
+    rest = self._decode(data, received)
+    self._counters["bytes_skipped"] += len(data) - rest
+
+  def close(self) -> None:
+    '''End the iteration of all consumers once they reach the last frame'''
+    self._closed = True
+    self._new_frames.set()
+
+  def latest(self) -> LiveFrame | None:
+    return self.ring[-1] if self.ring else None
+
+  async def frames(self) -> typing.AsyncIterator[LiveFrame]:
+    '''Yield the frames decoded from now on, until the source is closed'''
+    next_index = self._frame_count
+    while True:
+      if next_index < self._frame_count:
+        oldest = self.ring[0].index
+        if next_index < oldest:
+          self._counters["frames_dropped"] += oldest - next_index
+          next_index = oldest
+        frame = self.ring[next_index - oldest]
+        next_index += 1
+        yield frame
+      elif self._closed:
+        return
+      else:
+        self._new_frames.clear()
+        await self._new_frames.wait()
+
+  def statistics(self) -> LiveStatistics:
+    '''Return the counters and the rates of the last reporting interval'''
+    packets_per_second, bytes_per_second, errors_per_second = self._rates
+    return LiveStatistics(**{field: self._counters[field] for field in
+                             ("datagrams", "bytes", "packets", "checksum_errors",
+                              "bytes_skipped", "decode_errors", "frames_dropped")},
+                          packets_per_second=packets_per_second,
+                          bytes_per_second=bytes_per_second,
+                          errors_per_second=errors_per_second)
+
+  def report(self) -> LiveStatistics:
+    '''End the current reporting interval and return the statistics'''
+    now = self._clock()
+    start, counters = self._last_report
+    elapsed = now - start
+    if elapsed > 0:
+      delta = self._counters - counters
+      errors = delta["checksum_errors"] + delta["decode_errors"]
+      self._rates = (delta["packets"] / elapsed, delta["bytes"] / elapsed, errors / elapsed)
+    self._last_report = (now, self._counters.copy())
+    return self.statistics()
+
+  async def report_every(self, interval: float,
+                         callback: typing.Callable[[LiveStatistics], None]) -> None:
+    '''Call `callback` with the statistics every `interval` seconds until
+    the source is closed'''
+    while not self._closed:
+      await asyncio.sleep(interval)
+      callback(self.report())
+
+  async def open_udp(self, host: str, port: int, **kwargs) -> asyncio.DatagramTransport:
+    '''Receive datagrams on a local address. Keyword arguments are passed to
+    `loop.create_datagram_endpoint`. Closing the returned transport stops
+    reception.'''
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(lambda: _DatagramProtocol(self),
+                                                       local_addr=(host, port), **kwargs)
+    return transport
+
+  async def read_stream(self, reader: asyncio.StreamReader) -> None:
+    '''Decode a byte stream, e.g. a serial line, until its end, then close
+    the source'''
+    try:
+      while data := await reader.read(STREAM_READ_BYTES):
+        self.feed(data)
+    finally:
+      self.close()
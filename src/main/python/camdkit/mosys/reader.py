@@ -6,13 +6,25 @@
 
 '''Mo-Sys F4 data reader'''
 
+import uuid
+
+from camdkit.mapped_io import map_file
 from camdkit.model import Clip
-from camdkit.mosys.f4 import F4PacketParser
+from camdkit.mosys.f4 import F4PacketParser, F4StreamDecoder
+
+# source id of the frames of to_frame() when no parser is given
+_DEFAULT_SOURCE_ID = uuid.uuid4().urn
 
-def to_frame(data: bytes) -> Clip:
+def to_frame(data: bytes | memoryview,
+             parser: F4PacketParser | None = None) -> tuple[bool, Clip | None, int]:
   """Parse a frame of Mo-Sys F4 data into a Clip.
+  `parser`: Parser to reuse, e.g. one per tracker. By default a new parser
+  is used, with a source id shared by all such calls.
+  Returns whether the packet is valid, the frame and the packet size.
   """
-  parser = F4PacketParser()
+  if parser is None:
+    parser = F4PacketParser(_DEFAULT_SOURCE_ID)
+  frame = None
   success = parser.initialise(data)
   if success:
     frame = parser.get_tracking_frame()
@@ -21,22 +33,25 @@ def to_frame(data: bytes) -> Clip:
 def to_clip(filename: str, frames: int = -1) -> Clip:
   """Read Mo-Sys F4 data into a Clip.
   `filename`: Filename of the f4 file.
+  The file is memory-mapped and packets are parsed in place. Packets failing
+  their checksum are skipped.
   """
   clip = Clip()
-  with open(filename, "rb") as f4_file:
-    data = f4_file.read()
-    offset = 0
-    success = True
-    count = 0
-    while success and (frames == -1 or (count < frames)):
-      success, frame, packet_size = to_frame(data[offset:])
-      if success:
-        if offset == 0:
+  parser = F4PacketParser()
+  with map_file(filename) as data:
+    decoder = F4StreamDecoder(data)
+    try:
+      for count, packet in enumerate(decoder):
+        if frames != -1 and count >= frames:
+          break
+        parser.initialise_from_packet(packet)
+        frame = parser.get_tracking_frame()
+        if count == 0:
           clip = frame
         else:
           clip.append(frame)
-        offset += packet_size
-        count += 1
+    finally:
+      decoder.release()
   return clip
 
 def to_frames(filename: str, frame_count: int) -> list[dict]:
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""Computation of overscan factors from lens distortion
+
+Implements the informative section A.1 of the OpenLensIO documentation:
+the boundary of the screen rectangle is mapped through the distortion model
+and the overscan factor is the ratio of the width of the smallest centred
+rectangle (of the same aspect ratio) containing the mapped boundary to the
+width of the screen. Distortions are evaluated for all frames of a clip at
+once, and lens states shared by several frames are evaluated only once.
+"""
+
+from typing import Final, Optional, Sequence
+
+import numpy as np
+
+from camdkit.clip import Clip
+from camdkit.camera_types import PhysicalDimensions
+from camdkit.distortion import (BROWN_CONRADY_U_D,
+                                brown_conrady, inverse_brown_conrady)
+from camdkit.lens_types import Distortion, PlanarOffset
+
+__all__ = ['boundary_points', 'overscan_factors', 'fill_overscan']
+
+DEFAULT_SAMPLES_PER_EDGE: Final[int] = 64
+
+
+def boundary_points(sensor_dimensions: PhysicalDimensions,
+                    samples_per_edge: int = DEFAULT_SAMPLES_PER_EDGE) -> tuple[np.ndarray, np.ndarray]:
+    """Return screen coordinates sampling the edges of the screen rectangle"""
+    half_w, half_h = sensor_dimensions.width / 2.0, sensor_dimensions.height / 2.0
+    t = np.linspace(-1.0, 1.0, samples_per_edge)
+    ones = np.ones_like(t)
+    x = np.concatenate((t * half_w, t * half_w, -half_w * ones, half_w * ones))
+    y = np.concatenate((-half_h * ones, half_h * ones, t * half_h, t * half_h))
+    return x, y
+
+
+def _pack(distortions: Sequence[Distortion],
+          distortion_offsets: Optional[Sequence[Optional[PlanarOffset]]],
+          projection_offsets: Optional[Sequence[Optional[PlanarOffset]]]) -> np.ndarray:
+    # one row per lens state: [cx, cy, p1, p2, k1, k2, ...], zero-padded
+    n_radial = max(len(d.radial) for d in distortions)
+    packed = np.zeros((len(distortions), 4 + n_radial), dtype=np.float64)
+    for i, d in enumerate(distortions):
+        for offsets in (distortion_offsets, projection_offsets):
+            if offsets is not None and offsets[i] is not None:
+                packed[i, 0] += offsets[i].x
+                packed[i, 1] += offsets[i].y
+        if d.tangential:
+            packed[i, 2:2 + min(2, len(d.tangential))] = d.tangential[:2]
+        packed[i, 4:4 + len(d.radial)] = d.radial
+    return packed
+
+
+def overscan_factors(distortions: Sequence[Distortion],
+                     sensor_dimensions: PhysicalDimensions,
+                     distortion_offsets: Optional[Sequence[Optional[PlanarOffset]]] = None,
+                     projection_offsets: Optional[Sequence[Optional[PlanarOffset]]] = None,
+                     undistortion: bool = False,
+                     samples_per_edge: int = DEFAULT_SAMPLES_PER_EDGE) -> np.ndarray:
+    """Return the overscan factor required by each lens state.
+
+    By default this is the distortion overscan, i.e. how much larger than
+    the screen an undistorted (e.g. rendered) image must be so that
+    distorting it fills the screen. With `undistortion` set it is instead how
+    much larger than the screen a distorted image must be so that
+    undistorting it fills the screen. Factors are never less than 1.
+    """
+    n = len(distortions)
+    result = np.ones(n, dtype=np.float64)
+    if n == 0:
+        return result
+    w, h = sensor_dimensions.width, sensor_dimensions.height
+    bx, by = boundary_points(sensor_dimensions, samples_per_edge)
+    models = np.array([d.model == BROWN_CONRADY_U_D for d in distortions])
+    packed = _pack(distortions, distortion_offsets, projection_offsets)
+    for inverse_model in (False, True):
+        selected = np.flatnonzero(models == inverse_model)
+        if len(selected) == 0:
+            continue
+        states, inverse = np.unique(packed[selected], axis=0, return_inverse=True)
+        cx, cy = states[:, 0:1], states[:, 1:2]
+        tangential = (states[:, 2:3], states[:, 3:4])
+        radial = tuple(states[:, i:i + 1] for i in range(4, states.shape[1]))
+        # D-U coefficients describe U directly; U-D coefficients describe its inverse
+        if undistortion != inverse_model:
+            mx, my = inverse_brown_conrady(bx - cx, by - cy, radial, tangential)
+        else:
+            mx, my = brown_conrady(bx - cx, by - cy, radial, tangential)
+        mx, my = mx + cx, my + cy
+        overscanned_width = 2.0 * np.maximum(np.max(np.abs(mx), axis=1),
+                                             (w / h) * np.max(np.abs(my), axis=1))
+        result[selected] = np.maximum(overscanned_width / w, 1.0)[inverse.reshape(-1)]
+    return result
+
+
+def fill_overscan(clip: Clip,
+                  overwrite: bool = False,
+                  samples_per_edge: int = DEFAULT_SAMPLES_PER_EDGE) -> None:
+    """Compute missing overscan parameters of a clip from its distortion.
+
+    The per-frame `overscan` of every Distortion object is set to its
+    distortion overscan, and the static `lens_distortion_overscan_max` and
+    `lens_undistortion_overscan_max` to the maxima over the clip. Values
+    already present are kept unless `overwrite` is set.
+    """
+    frames = clip.lens_distortions
+    if not frames:
+        return
+    sensor_dimensions = clip.active_sensor_physical_dimensions
+    if sensor_dimensions is None:
+        raise ValueError("overscan computation requires the active sensor physical dimensions")
+    distortion_offsets = clip.lens_distortion_offset
+    projection_offsets = clip.lens_projection_offset
+    flat: list[Distortion] = []
+    flat_distortion_offsets: list[Optional[PlanarOffset]] = []
+    flat_projection_offsets: list[Optional[PlanarOffset]] = []
+    for i, frame in enumerate(frames):
+        for distortion in frame:
+            flat.append(distortion)
+            flat_distortion_offsets.append(distortion_offsets[i] if distortion_offsets else None)
+            flat_projection_offsets.append(projection_offsets[i] if projection_offsets else None)
+    distortion_overscan = overscan_factors(flat, sensor_dimensions,
+                                           flat_distortion_offsets, flat_projection_offsets,
+                                           undistortion=False, samples_per_edge=samples_per_edge)
+    overscans = [computed if overwrite or d.overscan is None else d.overscan
+                 for d, computed in zip(flat, distortion_overscan.tolist())]
+    if overwrite or any(d.overscan is None for d in flat):
+        values = iter(overscans)
+        clip.lens_distortions = tuple(tuple(d.model_copy(update={"overscan": next(values)})
+                                            for d in frame)
+                                      for frame in frames)
+    if overwrite or clip.lens_distortion_overscan_max is None:
+        clip.lens_distortion_overscan_max = max(overscans)
+    if overwrite or clip.lens_undistortion_overscan_max is None:
+        undistortion_overscan = overscan_factors(flat, sensor_dimensions,
+                                                 flat_distortion_offsets, flat_projection_offsets,
+                                                 undistortion=True, samples_per_edge=samples_per_edge)
+        clip.lens_undistortion_overscan_max = float(np.max(undistortion_overscan))
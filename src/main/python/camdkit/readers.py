@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""Registry of camera and tracking metadata readers
+
+Every vendor reader is wrapped in a `ReaderPlugin` that recognises its files
+from their extension and their first bytes, and reads a take, i.e. the set of
+files making up one clip (e.g. a static and a per-frame file), into a Clip.
+`open_clip` then reads any supported take without vendor-specific glue, and
+`group_takes` sorts the files of a whole shoot into takes.
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+from enum import StrEnum, unique
+from typing import Callable, Final, Iterable, Mapping, Optional, Sequence
+
+from camdkit.clip import Clip
+from camdkit.mapped_io import open_lines
+
+__all__ = ['FileRole', 'ReaderPlugin', 'Take',
+           'register', 'unregister', 'plugins', 'get_plugin',
+           'read_header', 'sniff', 'group_takes', 'open_clip']
+
+# Number of bytes read from the start of a file to recognise it
+SNIFF_BYTES: Final[int] = 4096
+
+
+@unique
+class FileRole(StrEnum):
+    COMPLETE = "complete"
+    """The file holds all metadata of the take"""
+    STATIC = "static"
+    """The file holds the per-clip metadata of the take"""
+    FRAMES = "frames"
+    """The file holds the per-frame metadata of the take"""
+
+
+@dataclass(frozen=True)
+class ReaderPlugin:
+    """A reader of one vendor format.
+
+    `sniff` is given the path of a file and its first `SNIFF_BYTES` bytes and
+    returns the role of the file in a take, or None if the file is not of
+    this format. `take_key` returns a key shared by all files of a take, and
+    `read` reads a take given as a mapping from roles to paths. `roles` lists
+    the roles required to read a take.
+    """
+    name: str
+    extensions: tuple[str, ...]
+    sniff: Callable[[str, bytes], Optional[FileRole]]
+    read: Callable[[Mapping[FileRole, str]], Clip]
+    roles: frozenset[FileRole] = frozenset((FileRole.COMPLETE,))
+    take_key: Callable[[str, FileRole], str] = field(default=lambda path, role: path)
+
+    def matches_extension(self, path: str) -> bool:
+        return path.lower().endswith(self.extensions)
+
+
+@dataclass
+class Take:
+    """The files of one clip, keyed by role"""
+    plugin: ReaderPlugin
+    key: str
+    files: dict[FileRole, str] = field(default_factory=dict)
+
+    @property
+    def complete(self) -> bool:
+        return self.plugin.roles <= self.files.keys()
+
+    def read(self) -> Clip:
+        missing = self.plugin.roles - self.files.keys()
+        if missing:
+            raise ValueError(f"{self.plugin.name} take {self.key!r} lacks its"
+                             f" {', '.join(sorted(missing))} file")
+        return self.plugin.read(self.files)
+
+
+_plugins: dict[str, ReaderPlugin] = {}
+
+
+def register(plugin: ReaderPlugin, replace: bool = False) -> None:
+    """Add a reader to the registry"""
+    if plugin.name in _plugins and not replace:
+        raise ValueError(f"a reader named {plugin.name!r} is already registered")
+    _plugins[plugin.name] = plugin
+
+
+def unregister(name: str) -> None:
+    """Remove a reader from the registry"""
+    if _plugins.pop(name, None) is None:
+        raise ValueError(f"no reader named {name!r} is registered")
+
+
+def plugins() -> tuple[ReaderPlugin, ...]:
+    """Return the registered readers in registration order"""
+    return tuple(_plugins.values())
+
+
+def get_plugin(name: str) -> ReaderPlugin:
+    try:
+        return _plugins[name]
+    except KeyError:
+        raise ValueError(f"no reader named {name!r} is registered") from None
+
+
+def read_header(path: str, size: int = SNIFF_BYTES) -> bytes:
+    """Return the first `size` bytes of a file"""
+    with open(path, "rb") as fp:
+        return fp.read(size)
+
+
+def sniff(path: str, header: Optional[bytes] = None) -> Optional[tuple[ReaderPlugin, FileRole]]:
+    """Return the reader of a file and the role of the file in its take, or
+    None if no registered reader recognises it. Readers claiming the file's
+    extension are tried first."""
+    if header is None:
+        header = read_header(path)
+    by_extension = [p for p in _plugins.values() if p.matches_extension(path)]
+    others = [p for p in _plugins.values() if not p.matches_extension(path)]
+    for plugin in by_extension + others:
+        role = plugin.sniff(path, header)
+        if role is not None:
+            return plugin, role
+    return None
+
+
+def group_takes(paths: Iterable[str], errors: Optional[dict[str, str]] = None
+                ) -> tuple[list[Take], list[str]]:
+    """Sort files into takes. Returns the takes, in order of first
+    appearance, and the paths no reader recognised.
+
+    By default, a file that cannot be sniffed, or two files claiming the same
+    role in one take, raise an exception. When an `errors` dict is given,
+    the reason is recorded there by path instead, and the files, or the
+    take, are left out.
+    """
+    takes: dict[tuple[str, str], Take] = {}
+    conflicts: dict[tuple[str, str], str] = {}
+    unrecognised: list[str] = []
+    for path in paths:
+        try:
+            sniffed = sniff(path)
+        except Exception as e:
+            if errors is None:
+                raise
+            errors[path] = f"{type(e).__name__}: {e}"
+            continue
+        if sniffed is None:
+            unrecognised.append(path)
+            continue
+        plugin, role = sniffed
+        key = plugin.take_key(path, role)
+        take = takes.setdefault((plugin.name, key), Take(plugin, key))
+        if role in take.files:
+            message = (f"{path!r} and {take.files[role]!r} both claim to be"
+                       f" the {role} file of {plugin.name} take {key!r}")
+            if errors is None:
+                raise ValueError(message)
+            errors[path] = message
+            conflicts.setdefault((plugin.name, key), message)
+            continue
+        take.files[role] = path
+    for take_id, message in conflicts.items():
+        for path in takes.pop(take_id).files.values():
+            errors[path] = message
+    return list(takes.values()), unrecognised
+
+
+def open_clip(paths: str | Sequence[str]) -> Clip:
+    """Read the clip made of the given file or files, whatever their format"""
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    takes, unrecognised = group_takes(os.fspath(p) for p in paths)
+    if unrecognised:
+        raise ValueError(f"unrecognised metadata files: {', '.join(unrecognised)}")
+    if len(takes) != 1:
+        raise ValueError(f"expected the files of a single take, found {len(takes)} takes")
+    return takes[0].read()
+
+
+# Built-in readers. Vendor modules are only imported when a take is read, and
+# text files are memory-mapped and fed to the readers line by line.
+
+def _text(header: bytes) -> str:
+    return header.decode("utf-8", errors="replace")
+
+
+def _first_line(header: bytes) -> str:
+    return _text(header).lstrip("\ufeff").split("\n", 1)[0]
+
+
+def _strip_suffix(pattern: str) -> Callable[[str, FileRole], str]:
+    # take key: the path without its extension and a role-specific suffix
+    compiled = re.compile(pattern, re.IGNORECASE)
+
+    def take_key(path: str, role: FileRole) -> str:
+        stem = os.path.splitext(path)[0]
+        return compiled.sub("", stem)
+
+    return take_key
+
+
+def _sniff_arri(path: str, header: bytes) -> Optional[FileRole]:
+    line = _first_line(header).split("\t")
+    return FileRole.COMPLETE if "Camera Family" in line and "Lens Distance Unit" in line else None
+
+
+def _read_arri(files: Mapping[FileRole, str]) -> Clip:
+    import camdkit.arri.reader
+    return camdkit.arri.reader.to_clip(files[FileRole.COMPLETE])
+
+
+def _sniff_bmd(path: str, header: bytes) -> Optional[FileRole]:
+    text = _text(header).lstrip()
+    return FileRole.COMPLETE if text.startswith(("Clip Metadata", "Frame 0 Metadata")) else None
+
+
+def _read_bmd(files: Mapping[FileRole, str]) -> Clip:
+    import camdkit.bmd.reader
+    with open_lines(files[FileRole.COMPLETE]) as lines:
+        return camdkit.bmd.reader.to_clip(lines)
+
+
+def _sniff_canon(path: str, header: bytes) -> Optional[FileRole]:
+    line = _first_line(header).split(",")
+    if "LensSqueezeFactor" in line and "Timescale" in line:
+        return FileRole.STATIC
+    if "FocusPosition" in line and "ApertureMode" in line:
+        return FileRole.FRAMES
+    return None
+
+
+def _read_canon(files: Mapping[FileRole, str]) -> Clip:
+    import camdkit.canon.reader
+    with open_lines(files[FileRole.STATIC]) as static_csv, \
+            open_lines(files[FileRole.FRAMES]) as frames_csv:
+        return camdkit.canon.reader.to_clip(static_csv, frames_csv)
+
+
+def _sniff_red(path: str, header: bytes) -> Optional[FileRole]:
+    line = _first_line(header).split(",")
+    if "Camera PIN" in line and "Total Frames" in line:
+        return FileRole.STATIC
+    if "FrameNo" in line and "Cooke Metadata" in line:
+        return FileRole.FRAMES
+    return None
+
+
+def _read_red(files: Mapping[FileRole, str]) -> Clip:
+    import camdkit.red.reader
+    with open_lines(files[FileRole.STATIC]) as meta_3_file, \
+            open_lines(files[FileRole.FRAMES]) as meta_5_file:
+        return camdkit.red.reader.to_clip(meta_3_file, meta_5_file)
+
+
+def _sniff_venice(path: str, header: bytes) -> Optional[FileRole]:
+    if "urn:schemas-professionalDisc:nonRealTimeMeta" in _text(header):
+        return FileRole.STATIC
+    if '"Focus Distance (ft)"' in _first_line(header):
+        return FileRole.FRAMES
+    return None
+
+
+def _read_venice(files: Mapping[FileRole, str]) -> Clip:
+    import camdkit.venice.reader
+    with open(files[FileRole.STATIC], "r", encoding="utf-8") as static_file, \
+            open_lines(files[FileRole.FRAMES]) as dynamic_file:
+        return camdkit.venice.reader.to_clip(static_file, dynamic_file)
+
+
+def _sniff_mosys(path: str, header: bytes) -> Optional[FileRole]:
+    # the file must start with a whole F4 packet with a valid checksum
+    if len(header) < 4 or header[0] != 0xF4:
+        return None
+    size = 5 + 5 * header[2]
+    if len(header) < size or (0x40 - sum(header[:size - 1])) % 256 != header[size - 1]:
+        return None
+    return FileRole.COMPLETE
+
+
+def _read_mosys(files: Mapping[FileRole, str]) -> Clip:
+    import camdkit.mosys.bulk
+    return camdkit.mosys.bulk.to_clip(files[FileRole.COMPLETE])
+
+
+_BOTH_ROLES: Final[frozenset[FileRole]] = frozenset((FileRole.STATIC, FileRole.FRAMES))
+
+register(ReaderPlugin("arri", (".csv",), _sniff_arri, _read_arri))
+register(ReaderPlugin("bmd", (".txt",), _sniff_bmd, _read_bmd))
+register(ReaderPlugin("canon", (".csv",), _sniff_canon, _read_canon, _BOTH_ROLES,
+                      _strip_suffix(r"_(static|frames)$")))
+register(ReaderPlugin("red", (".csv",), _sniff_red, _read_red, _BOTH_ROLES,
+                      _strip_suffix(r"\.(static|frames)$")))
+register(ReaderPlugin("venice", (".xml", ".csv"), _sniff_venice, _read_venice, _BOTH_ROLES,
+                      _strip_suffix(r"M\d\d$")))
+register(ReaderPlugin("mosys", (".f4",), _sniff_mosys, _read_mosys))
@@ -7,6 +7,9 @@
 '''Cook data parser'''
 
 import dataclasses
+import typing
+
+import numpy as np
 
 @dataclasses.dataclass
 class CookeLensData:
@@ -19,9 +22,88 @@ def lens_data_from_binary_string(cooked_packed_bin_data: bytes) -> CookeLensData
   aperture_value = (((cooked_packed_bin_data[5] & 0b00111111) << 6) + (cooked_packed_bin_data[6] & 0b00111111))
   return CookeLensData(entrance_pupil_position=entrance_pupil_position, aperture_value=aperture_value)
 
+@dataclasses.dataclass
+class CookeLensDataColumns:
+  '''Lens data fields of a sequence of frames, one array element per frame.
+  Distances are in the lens' units (millimeters for metric lenses) and the
+  horizontal field of view is in tenths of a degree.'''
+  focus_distance: np.ndarray
+  aperture_value: np.ndarray
+  hyperfocal_distance: np.ndarray
+  near_depth_of_field: np.ndarray
+  far_depth_of_field: np.ndarray
+  horizontal_field_of_view: np.ndarray
+  entrance_pupil_position: np.ndarray
+  # whether each packet could be decoded; the fields of the others are 0
+  decoded: np.ndarray
+
+def lens_data_array(hex_packets: typing.Sequence[str], separator: str = "/") -> np.ndarray:
+  '''Parse lens data packets given as hex bytes joined by `separator`, e.g.
+  "64/40/40/46/...", into an (N, K) uint8 array with one row per packet'''
+  lengths = set(map(len, hex_packets))
+  if len(lengths) > 1:
+    raise ValueError("Cooke lens data packets of different lengths")
+  if not hex_packets:
+    return np.zeros((0, 0), dtype=np.uint8)
+  data = np.frombuffer(bytes.fromhex("".join(hex_packets).replace(separator, "")), dtype=np.uint8)
+  return data.reshape(len(hex_packets), -1)
+
+def _field(data: np.ndarray, first: int, count: int) -> np.ndarray:
+  '''Assemble the 6-bit payloads of `count` bytes into an int64 column'''
+  value = np.zeros(data.shape[0], dtype=np.int64)
+  for i in range(first, first + count):
+    value = (value << 6) | (data[:, i] & 0b00111111)
+  return value
+
+def lens_data_from_array(data: np.ndarray) -> CookeLensDataColumns:
+  '''Decode an (N, K) array of lens data packets as returned by
+  `lens_data_array`'''
+  if data.ndim != 2 or data.shape[1] < 27:
+    raise ValueError("Cooke lens data packets are too short")
+  sign = np.where(data[:, 25] & 0b00100000, -1, 1)
+  entrance_pupil_position = sign * (((data[:, 25] & 0b00001111).astype(np.int64) << 6) + (data[:, 26] & 0b00111111))
+  return CookeLensDataColumns(
+    focus_distance=_field(data, 1, 4),
+    aperture_value=_field(data, 5, 2),
+    hyperfocal_distance=_field(data, 12, 3),
+    near_depth_of_field=_field(data, 15, 4),
+    far_depth_of_field=_field(data, 19, 4),
+    horizontal_field_of_view=_field(data, 23, 2),
+    entrance_pupil_position=entrance_pupil_position,
+    decoded=np.ones(data.shape[0], dtype=bool)
+  )
+
+def lens_data_columns(hex_packets: typing.Sequence[str], separator: str = "/") -> CookeLensDataColumns:
+  '''Decode lens data packets as given to `lens_data_array`, of any lengths.
+  Packets of each length are decoded at once. Packets that cannot be
+  decoded, e.g. empty or truncated ones, are marked in `decoded`.'''
+  columns = {field.name: np.zeros(len(hex_packets), dtype=np.int64)
+             for field in dataclasses.fields(CookeLensDataColumns)}
+  columns["decoded"] = np.zeros(len(hex_packets), dtype=bool)
+  rows_by_length: dict[int, list[int]] = {}
+  for i, packet in enumerate(hex_packets):
+    rows_by_length.setdefault(len(packet), []).append(i)
+  for rows in rows_by_length.values():
+    try:
+      decoded = lens_data_from_array(lens_data_array([hex_packets[i] for i in rows], separator))
+    except ValueError:
+      continue
+    for name, column in columns.items():
+      column[rows] = getattr(decoded, name)
+  return CookeLensDataColumns(**columns)
+
 @dataclasses.dataclass
 class CookeFixedData:
   firmware_version_number: str
+  minimum_focal_length: int
+  maximum_focal_length: int
 
 def fixed_data_from_string(cooked_fixed_data: str) -> CookeFixedData:
-  return CookeFixedData(firmware_version_number=cooked_fixed_data[61:65])
+  '''Decode the fixed lens data. The focal lengths are in millimeters and are
+  equal for prime lenses; the lens data packets carry no focal length for
+  them.'''
+  return CookeFixedData(
+    firmware_version_number=cooked_fixed_data[61:65],
+    minimum_focal_length=int(cooked_fixed_data[46:49]),
+    maximum_focal_length=int(cooked_fixed_data[50:53])
+  )
@@ -84,10 +84,12 @@ def to_clip(meta_3_file: typing.IO, meta_5_file: typing.IO) -> camdkit.model.Cli
 
   clip.lens_focus_distance = tuple(int(m["Focus Distance"]) for m in csv_data)
 
-  cooke_metadata = tuple(cooke.lens_data_from_binary_string(bytes(int(i, 16) for i in m["Cooke Metadata"].split("/"))) for m in csv_data)
+  cooke_metadata = cooke.lens_data_columns([m["Cooke Metadata"] for m in csv_data])
 
-  clip.lens_entrance_pupil_offset = tuple(float(m.entrance_pupil_position) / 1000.0 for m in cooke_metadata)
+  # frames without lens data leave the lens data of the clip unset
+  if cooke_metadata.decoded.all():
+    clip.lens_entrance_pupil_offset = tuple((cooke_metadata.entrance_pupil_position / 1000.0).tolist())
 
-  clip.lens_t_number = tuple(m.aperture_value / 100.0 for m in cooke_metadata)
+    clip.lens_t_number = tuple((cooke_metadata.aperture_value / 100.0).tolist())
 
   return clip
@@ -0,0 +1,253 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""Sessions of many clips
+
+A `Session` holds the clips of all sources on a stage, told apart by their
+source id, source number and camera label. Members are indexed by source
+and by time range, so the frames of all sources at a given time are found
+without looking at the clips themselves.
+
+A member only needs its index entry: the clip is read from its file when
+first used. A session saved with `Session.save` is reopened with
+`Session.open` without reading any clip.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Final, Iterator, Literal, Optional
+
+import cbor2
+import numpy as np
+
+from camdkit.align import frame_times
+from camdkit.clip import Clip
+from camdkit.readers import open_clip
+from camdkit.timing_types import Timecode, Timestamp
+
+__all__ = ['SessionMember', 'Session', 'load_clip']
+
+SESSION_VERSION: Final[int] = 1
+
+# Frame times within this many seconds of evenly spaced times are saved as a
+# start and a rate
+_REGULAR_TOLERANCE: Final[float] = 1e-6
+
+
+def load_clip(path: str) -> Clip:
+    """Read a clip converted to JSON or CBOR (see `camdkit.ingest`), or the
+    metadata file of any supported reader"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        with open(path, "r", encoding="utf-8") as fp:
+            return Clip.model_validate(json.load(fp))
+    if extension == ".cbor":
+        with open(path, "rb") as fp:
+            return Clip.model_validate(cbor2.load(fp))
+    return open_clip(path)
+
+
+@dataclass(eq=False)
+class SessionMember:
+    """Index entry of a clip of a session. `times` holds the time of every
+    frame in seconds, in the time base of the session."""
+    path: Optional[str]
+    times: np.ndarray
+    source_id: Optional[str] = None
+    source_number: Optional[int] = None
+    camera_label: Optional[str] = None
+    loader: Callable[[str], Clip] = field(default=load_clip, repr=False)
+    _clip: Optional[Clip] = field(default=None, repr=False)
+
+    @property
+    def start(self) -> float:
+        return float(self.times[0]) if len(self.times) else float("nan")
+
+    @property
+    def end(self) -> float:
+        return float(self.times[-1]) if len(self.times) else float("nan")
+
+    @property
+    def loaded(self) -> bool:
+        return self._clip is not None
+
+    @property
+    def clip(self) -> Clip:
+        """The clip, read from `path` on first use"""
+        if self._clip is None:
+            if self.path is None:
+                raise ValueError("the member has neither a clip nor a path to read it from")
+            self._clip = self.loader(self.path)
+        return self._clip
+
+    def unload(self) -> None:
+        """Release the clip if it can be read again"""
+        if self.path is not None:
+            self._clip = None
+
+    def frame_at(self, t: float) -> int:
+        """Return the index of the frame nearest to time `t`"""
+        times = self.times
+        i = int(np.searchsorted(times, t))
+        if i == len(times) or (i > 0 and t - times[i - 1] <= times[i] - t):
+            i -= 1
+        return i
+
+    def _entry(self, directory: str) -> dict:
+        entry: dict = {"path": os.path.relpath(self.path, directory)}
+        for name in ("source_id", "source_number", "camera_label"):
+            if (value := getattr(self, name)) is not None:
+                entry[name] = value
+        times = self.times
+        count = len(times)
+        rate = (count - 1) / (times[-1] - times[0]) if count > 1 and times[-1] > times[0] else None
+        regular = rate is not None and np.allclose(times, times[0] + np.arange(count) / rate,
+                                                   rtol=0, atol=_REGULAR_TOLERANCE)
+        if regular:
+            entry.update(start=float(times[0]), rate=float(rate), count=count)
+        else:
+            entry["times"] = times.tolist()
+        return entry
+
+    @classmethod
+    def _from_entry(cls, entry: dict, directory: str, loader: Callable[[str], Clip]) -> "SessionMember":
+        if "times" in entry:
+            times = np.asarray(entry["times"], dtype=np.float64)
+        else:
+            times = entry["start"] + np.arange(entry["count"], dtype=np.float64) / entry["rate"]
+        return cls(path=os.path.join(directory, entry["path"]), times=times,
+                   source_id=entry.get("source_id"),
+                   source_number=entry.get("source_number"),
+                   camera_label=entry.get("camera_label"),
+                   loader=loader)
+
+
+def _first(values) -> Any:
+    return values[0] if values else None
+
+
+class Session:
+    """Clips of many sources, indexed by source and time.
+
+    `key` is the time base of the session, "timecode" or "timestamp" (see
+    `camdkit.align.frame_times`).
+    """
+
+    def __init__(self, key: Literal["timecode", "timestamp"] = "timecode") -> None:
+        self.key = key
+        self.members: list[SessionMember] = []
+        self._by_source_id: dict[str, list[SessionMember]] = {}
+        self._by_source_number: dict[int, list[SessionMember]] = {}
+        self._by_camera_label: dict[str, list[SessionMember]] = {}
+        # members sorted by start time, with their start and end times
+        self._time_index: Optional[tuple[list[SessionMember], np.ndarray, np.ndarray]] = None
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def __iter__(self) -> Iterator[SessionMember]:
+        return iter(self.members)
+
+    def _index(self, member: SessionMember) -> SessionMember:
+        if not len(member.times):
+            raise ValueError("session members must have at least one frame")
+        if np.any(np.diff(member.times) < 0):
+            raise ValueError("the frame times of session members must not decrease")
+        self.members.append(member)
+        for index, value in ((self._by_source_id, member.source_id),
+                             (self._by_source_number, member.source_number),
+                             (self._by_camera_label, member.camera_label)):
+            if value is not None:
+                index.setdefault(value, []).append(member)
+        self._time_index = None
+        return member
+
+    def add(self, clip: Clip, path: Optional[str] = None,
+            start: Timecode | Timestamp | float | None = None,
+            loader: Callable[[str], Clip] = load_clip) -> SessionMember:
+        """Add a clip. With a `path`, the clip can be unloaded and read again
+        by `loader`. `start` is the time of the first frame of clips without
+        timecodes or timestamps."""
+        return self._index(SessionMember(path=path,
+                                         times=frame_times(clip, self.key, start),
+                                         source_id=_first(clip.source_id),
+                                         source_number=_first(clip.source_number),
+                                         camera_label=clip.camera_label,
+                                         loader=loader,
+                                         _clip=clip))
+
+    def add_file(self, path: str,
+                 start: Timecode | Timestamp | float | None = None,
+                 loader: Callable[[str], Clip] = load_clip) -> SessionMember:
+        """Read a clip to index it, without keeping it loaded"""
+        member = self.add(loader(path), path, start, loader)
+        member.unload()
+        return member
+
+    def by_source_id(self, source_id: str) -> list[SessionMember]:
+        return list(self._by_source_id.get(source_id, ()))
+
+    def by_source_number(self, source_number: int) -> list[SessionMember]:
+        return list(self._by_source_number.get(source_number, ()))
+
+    def by_camera_label(self, camera_label: str) -> list[SessionMember]:
+        return list(self._by_camera_label.get(camera_label, ()))
+
+    def _times(self) -> tuple[list[SessionMember], np.ndarray, np.ndarray]:
+        if self._time_index is None:
+            members = sorted(self.members, key=lambda m: m.start)
+            self._time_index = (members,
+                                np.array([m.start for m in members], dtype=np.float64),
+                                np.array([m.end for m in members], dtype=np.float64))
+        return self._time_index
+
+    def overlapping(self, start: float, end: float) -> list[SessionMember]:
+        """Return the members with frames between `start` and `end`, in order
+        of their first frame"""
+        members, starts, ends = self._times()
+        candidates = int(np.searchsorted(starts, end, side="right"))
+        return [members[i] for i in np.flatnonzero(ends[:candidates] >= start)]
+
+    def at(self, t: float, tolerance: Optional[float] = None) -> list[tuple[SessionMember, int]]:
+        """Return every member recording at time `t` with the index of its
+        frame nearest to `t`. By default a member is recording from its first
+        to its last frame; `tolerance` also accepts frames up to that many
+        seconds away from `t`."""
+        margin = tolerance or 0.0
+        result = []
+        for member in self.overlapping(t - margin, t + margin):
+            frame = member.frame_at(t)
+            if tolerance is None or abs(member.times[frame] - t) <= tolerance:
+                result.append((member, frame))
+        return result
+
+    def save(self, path: str) -> None:
+        """Write the index of the session. All members must have a path;
+        paths are written relative to the directory of the index."""
+        if any(member.path is None for member in self.members):
+            raise ValueError("only sessions whose members all have a path can be saved")
+        directory = os.path.dirname(os.path.abspath(path))
+        temporary = path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as fp:
+            json.dump({"version": SESSION_VERSION,
+                       "key": self.key,
+                       "members": [member._entry(directory) for member in self.members]}, fp, indent=1)
+        os.replace(temporary, path)
+
+    @classmethod
+    def open(cls, path: str, loader: Callable[[str], Clip] = load_clip) -> "Session":
+        """Read the index of a session saved by `save`; clips are read when
+        first used"""
+        with open(path, "r", encoding="utf-8") as fp:
+            content = json.load(fp)
+        if content.get("version") != SESSION_VERSION:
+            raise ValueError(f"unsupported session version {content.get('version')!r}")
+        session = cls(content["key"])
+        directory = os.path.dirname(os.path.abspath(path))
+        for entry in content["members"]:
+            session._index(SessionMember._from_entry(entry, directory, loader))
+        return session
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""ST map generation for compositing applications
+
+An ST map stores, for every pixel of the output image, the normalized
+coordinates (s, t) of the source image location to sample. s runs from 0 at
+the left edge to 1 at the right edge, and t from 0 at the bottom edge to 1 at
+the top edge, as expected by e.g. Nuke's STMap node.
+"""
+
+from collections import OrderedDict
+from enum import StrEnum, unique
+from typing import BinaryIO, Final, Iterator, Optional
+
+import numpy as np
+
+from camdkit.clip import Clip
+from camdkit.camera_types import PhysicalDimensions, SenselDimensions
+from camdkit.distortion import distort_points, undistort_points
+from camdkit.lens_types import Distortion, PlanarOffset
+
+__all__ = ['STMapDirection', 'STMapCache', 'st_map', 'st_maps', 'write_st_map']
+
+# 1 GiB holds about thirty UHD maps
+DEFAULT_CACHE_BYTES: Final[int] = 1 << 30
+
+# Lens states are compared after rounding every real-valued parameter to
+# this many significant digits, well beyond what calibrations resolve.
+DEFAULT_SIGNIFICANT_DIGITS: Final[int] = 9
+
+
+@unique
+class STMapDirection(StrEnum):
+    UNDISTORT = "undistort"
+    """For each pixel of the undistorted output image, the location to
+    sample in the distorted (camera) image"""
+    DISTORT = "distort"
+    """For each pixel of the distorted output image, the location to
+    sample in the undistorted (rendered) image"""
+
+
+def st_map(resolution: SenselDimensions,
+           sensor_dimensions: PhysicalDimensions,
+           distortion: Distortion,
+           distortion_offset: Optional[PlanarOffset] = None,
+           projection_offset: Optional[PlanarOffset] = None,
+           direction: STMapDirection = STMapDirection.UNDISTORT,
+           overscan: float = 1.0) -> np.ndarray:
+    """Return a (height, width, 2) float32 ST map for a single lens state.
+
+    `overscan` is the ratio of the size of the undistorted image to that
+    of the distorted image, e.g. the overscan a CG render was made with.
+    """
+    width, height = resolution.width, resolution.height
+    w, h = sensor_dimensions.width, sensor_dimensions.height
+    # pixel centres in screen coordinates (mm, origin at centre, y down)
+    x = (np.arange(width, dtype=np.float64) + 0.5) * (w / width) - w / 2.0
+    y = (np.arange(height, dtype=np.float64) + 0.5) * (h / height) - h / 2.0
+    x, y = np.meshgrid(x, y)
+    if direction == STMapDirection.UNDISTORT:
+        sx, sy = distort_points(x * overscan, y * overscan,
+                                distortion, distortion_offset, projection_offset)
+    else:
+        sx, sy = undistort_points(x, y, distortion, distortion_offset, projection_offset)
+        sx, sy = sx / overscan, sy / overscan
+    result = np.empty((height, width, 2), dtype=np.float32)
+    result[..., 0] = sx / w + 0.5
+    result[..., 1] = 0.5 - sy / h
+    return result
+
+
+def write_st_map(fp: BinaryIO, st: np.ndarray) -> None:
+    """Write an ST map as a raw buffer of interleaved little-endian float32
+    (s, t) pairs, in row order from the top of the image"""
+    fp.write(np.ascontiguousarray(st, dtype="<f4").tobytes())
+
+
+class STMapCache:
+    """LRU cache of ST maps keyed by quantized lens state.
+
+    The key holds the distortion model and coefficients, the distortion and
+    projection offsets, the sensor dimensions and the output resolution.
+    Focal length is deliberately not part of the key: the OpenLensIO
+    distortion model operates in sensor millimeters and does not depend on
+    it. Maps are returned read-only since they are shared between frames.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES,
+                 significant_digits: int = DEFAULT_SIGNIFICANT_DIGITS) -> None:
+        self.max_bytes = max_bytes
+        self.significant_digits = significant_digits
+        self.hits = 0
+        self.misses = 0
+        self._nbytes = 0
+        self._maps: OrderedDict[tuple, np.ndarray] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._maps)
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def clear(self) -> None:
+        self._maps.clear()
+        self._nbytes = 0
+
+    def _quantize(self, value: Optional[float]) -> Optional[float]:
+        if value is None:
+            return None
+        return float(f"{value:.{self.significant_digits}g}")
+
+    def key(self, resolution: SenselDimensions,
+            sensor_dimensions: PhysicalDimensions,
+            distortion: Distortion,
+            distortion_offset: Optional[PlanarOffset] = None,
+            projection_offset: Optional[PlanarOffset] = None,
+            direction: STMapDirection = STMapDirection.UNDISTORT,
+            overscan: float = 1.0) -> tuple:
+        q = self._quantize
+        return (resolution.width, resolution.height,
+                q(sensor_dimensions.width), q(sensor_dimensions.height),
+                distortion.model,
+                tuple(q(k) for k in distortion.radial),
+                tuple(q(p) for p in distortion.tangential) if distortion.tangential else None,
+                (q(distortion_offset.x), q(distortion_offset.y)) if distortion_offset else None,
+                (q(projection_offset.x), q(projection_offset.y)) if projection_offset else None,
+                STMapDirection(direction).value,
+                q(overscan))
+
+    def get(self, resolution: SenselDimensions,
+            sensor_dimensions: PhysicalDimensions,
+            distortion: Distortion,
+            distortion_offset: Optional[PlanarOffset] = None,
+            projection_offset: Optional[PlanarOffset] = None,
+            direction: STMapDirection = STMapDirection.UNDISTORT,
+            overscan: float = 1.0) -> np.ndarray:
+        """Return the ST map for the lens state, generating it on a miss"""
+        key = self.key(resolution, sensor_dimensions, distortion,
+                       distortion_offset, projection_offset, direction, overscan)
+        cached = self._maps.get(key)
+        if cached is not None:
+            self._maps.move_to_end(key)
+            self.hits += 1
+            return cached
+        self.misses += 1
+        generated = st_map(resolution, sensor_dimensions, distortion,
+                           distortion_offset, projection_offset, direction, overscan)
+        generated.flags.writeable = False
+        if generated.nbytes <= self.max_bytes:
+            self._maps[key] = generated
+            self._nbytes += generated.nbytes
+            while self._nbytes > self.max_bytes:
+                _, evicted = self._maps.popitem(last=False)
+                self._nbytes -= evicted.nbytes
+        return generated
+
+
+def st_maps(clip: Clip,
+            resolution: Optional[SenselDimensions] = None,
+            direction: STMapDirection = STMapDirection.UNDISTORT,
+            overscan: float = 1.0,
+            cache: Optional[STMapCache] = None,
+            distortion_index: int = 0) -> Iterator[np.ndarray]:
+    """Yield the ST map of each frame of a clip.
+
+    `resolution` defaults to the active sensor resolution of the clip, and
+    `distortion_index` selects which of the frame's distortion objects is
+    used. Frames sharing a lens state share a single map through `cache`.
+    """
+    resolution = resolution or clip.active_sensor_resolution
+    if resolution is None:
+        raise ValueError("an output resolution is required when the clip"
+                         " has no active sensor resolution")
+    sensor_dimensions = clip.active_sensor_physical_dimensions
+    if sensor_dimensions is None:
+        raise ValueError("ST maps require the active sensor physical dimensions")
+    distortions = clip.lens_distortions
+    if not distortions:
+        raise ValueError("ST maps require lens distortion")
+    cache = cache if cache is not None else STMapCache()
+    distortion_offsets = clip.lens_distortion_offset
+    projection_offsets = clip.lens_projection_offset
+    for i, frame_distortions in enumerate(distortions):
+        yield cache.get(resolution, sensor_dimensions,
+                        frame_distortions[distortion_index],
+                        distortion_offsets[i] if distortion_offsets else None,
+                        projection_offsets[i] if projection_offsets else None,
+                        direction, overscan)
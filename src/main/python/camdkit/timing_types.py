@@ -15,6 +15,7 @@
 from camdkit.compatibility import (CompatibleBaseModel,
                                    NON_NEGATIVE_INTEGER,
                                    STRICTLY_POSITIVE_RATIONAL)
+from camdkit.columns import RunLength
 from camdkit.numeric_types import (rationalize_strictly_and_positively,
                                    StrictlyPositiveRational,
                                    NonNegative8BitInt,
@@ -178,7 +179,7 @@ def coerce_frequency_to_strictly_positive_rational(cls, v):
 
 
 class Timing(CompatibleBaseModel):
-    mode: Annotated[tuple[TimingMode, ...] | None,
+    mode: Annotated[RunLength[TimingMode] | None,
       Field(json_schema_extra={"clip_property": "timing_mode",
                                "constraints": "The parameter shall be one of the allowed values."})] = None
     """Enumerated value indicating whether the sample transport mechanism
@@ -226,7 +227,7 @@ class Timing(CompatibleBaseModel):
                                "constraints": NON_NEGATIVE_INTEGER})] = None
     """Integer incrementing with each sample."""
 
-    synchronization: Annotated[tuple[Synchronization, ...] | None,
+    synchronization: Annotated[RunLength[Synchronization] | None,
       Field(json_schema_extra={"clip_property": "timing_synchronization",
                                "constraints": "The parameter shall contain the required valid fields."})] = None
     """Object describing how the tracking device is synchronized for this
@@ -10,6 +10,7 @@
 
 from pydantic import Field
 
+from camdkit.columns import Categorical
 from camdkit.string_types import NonBlankUTF8String
 from camdkit.compatibility import (CompatibleBaseModel,
                                    BOOLEAN,
@@ -41,7 +42,7 @@ class StaticTracker(CompatibleBaseModel):
 
 
 class Tracker(CompatibleBaseModel):
-    notes: Annotated[tuple[NonBlankUTF8String, ...] | None,
+    notes: Annotated[Categorical[NonBlankUTF8String] | None,
       Field(json_schema_extra={"clip_property": "tracker_notes",
                                "constraints": NONBLANK_UTF8_MAX_1023_CHARS})] = None
     """Non-blank string containing notes about tracking system"""
@@ -51,12 +52,12 @@ class Tracker(CompatibleBaseModel):
                                "constraints": BOOLEAN})] = None
     """Boolean indicating whether tracking system is recording data"""
 
-    slate: Annotated[tuple[NonBlankUTF8String, ...] | None,
+    slate: Annotated[Categorical[NonBlankUTF8String] | None,
       Field(json_schema_extra={"clip_property": "tracker_slate",
                                "constraints": NONBLANK_UTF8_MAX_1023_CHARS})] = None
     """Non-blank string describing the recording slate"""
 
-    status: Annotated[tuple[NonBlankUTF8String, ...] | None,
+    status: Annotated[Categorical[NonBlankUTF8String] | None,
       Field(json_schema_extra={"clip_property": "tracker_status",
                                "constraints": NONBLANK_UTF8_MAX_1023_CHARS})] = None
     """Non-blank string describing status of tracking system"""
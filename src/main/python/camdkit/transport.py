@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""OpenTrackIO samples over UDP
+
+Samples are sent as JSON or CBOR payloads split into segments, each
+prefixed by the 16-byte header of the reference sender
+(src/test/python/parser/opentrackio_sender.py):
+
+    identifier      4 bytes  "OTrk"
+    reserved        1 byte
+    encoding        1 byte   JSON=0x01, CBOR=0x02
+    sequence number 2 bytes  incremented for every segment
+    segment offset  4 bytes  offset of the segment in the payload
+    last, length    2 bytes  last segment flag (MSB) and segment length
+    checksum        2 bytes  Fletcher-16 (mod 256) of the above and the segment
+
+All fields are big-endian.
+"""
+
+import json
+import struct
+from enum import IntEnum, unique
+from typing import Final, Optional
+
+import cbor2
+import numpy as np
+
+__all__ = ['PayloadFormat', 'fletcher16', 'multicast_group',
+           'encode_payload', 'decode_payload', 'Segmenter', 'Reassembler']
+
+IDENTIFIER: Final[bytes] = b"OTrk"
+HEADER_LENGTH: Final[int] = 16
+MTU: Final[int] = 1500
+MAX_PAYLOAD_SIZE: Final[int] = MTU - HEADER_LENGTH
+MULTICAST_PREFIX: Final[str] = "239.135.1."
+MULTICAST_PORT: Final[int] = 55555
+
+_HEADER = struct.Struct("!4sBBHIH")
+_CHECKSUM = struct.Struct("!H")
+_LAST_SEGMENT: Final[int] = 0x8000
+_MAX_SEGMENT_LENGTH: Final[int] = 0x7FFF
+
+
+@unique
+class PayloadFormat(IntEnum):
+    JSON = 0x01
+    CBOR = 0x02
+
+
+def fletcher16(data: bytes | memoryview) -> int:
+    """Return the Fletcher-16 checksum of data, with both sums mod 256.
+
+    The running second sum is computed in closed form: byte i of n
+    contributes (n - i) times its value.
+    """
+    values = np.frombuffer(data, dtype=np.uint8).astype(np.uint64)
+    sum1 = int(values.sum()) % 256
+    sum2 = int(np.dot(np.arange(len(values), 0, -1, dtype=np.uint64), values)) % 256
+    return (sum2 << 8) | sum1
+
+
+def multicast_group(source_number: int) -> str:
+    """Return the multicast group of an OpenTrackIO source number"""
+    if not 1 <= source_number <= 200:
+        raise ValueError("source numbers must be between 1 and 200")
+    return f"{MULTICAST_PREFIX}{source_number}"
+
+
+def encode_payload(sample: dict, payload_format: PayloadFormat) -> bytes:
+    """Serialize a sample, e.g. from `Clip.to_pseudo_frame_json`"""
+    if payload_format == PayloadFormat.CBOR:
+        return cbor2.dumps(sample)
+    return json.dumps(sample, separators=(",", ":")).encode("utf-8")
+
+
+def decode_payload(payload: bytes, payload_format: PayloadFormat) -> dict:
+    if payload_format == PayloadFormat.CBOR:
+        return cbor2.loads(payload)
+    return json.loads(payload)
+
+
+class Segmenter:
+    """Split payloads into segments carrying consecutive sequence numbers"""
+
+    def __init__(self, max_payload_size: int = MAX_PAYLOAD_SIZE,
+                 sequence_number: int = 0) -> None:
+        if not 1 <= max_payload_size <= _MAX_SEGMENT_LENGTH:
+            raise ValueError(f"segment payloads must hold between 1 and {_MAX_SEGMENT_LENGTH} bytes")
+        self.max_payload_size = max_payload_size
+        self.sequence_number = sequence_number & 0xFFFF
+
+    def segments(self, payload: bytes, payload_format: PayloadFormat) -> list[bytes]:
+        """Return the datagrams carrying a payload"""
+        result = []
+        total = len(payload)
+        for offset in range(0, max(total, 1), self.max_payload_size):
+            chunk = payload[offset:offset + self.max_payload_size]
+            last = _LAST_SEGMENT if offset + self.max_payload_size >= total else 0
+            header = _HEADER.pack(IDENTIFIER, 0, payload_format, self.sequence_number,
+                                  offset, last | len(chunk))
+            result.append(header + _CHECKSUM.pack(fletcher16(header + chunk)) + chunk)
+            self.sequence_number = (self.sequence_number + 1) & 0xFFFF
+        return result
+
+
+class Reassembler:
+    """Rebuild payloads from received segments.
+
+    Invalid segments are counted in `errors` and discard the payload being
+    reassembled, as do segments whose offset does not follow the previous
+    segment.
+    """
+
+    def __init__(self) -> None:
+        self.errors = 0
+        self._buffer = bytearray()
+        self._format: Optional[PayloadFormat] = None
+
+    def _reject(self) -> None:
+        self.errors += 1
+        self._buffer.clear()
+
+    def feed(self, datagram: bytes) -> Optional[tuple[PayloadFormat, bytes]]:
+        """Return the format and the payload once its last segment is fed"""
+        if len(datagram) < HEADER_LENGTH:
+            self._reject()
+            return None
+        identifier, _, encoding, _, offset, last_and_length = _HEADER.unpack_from(datagram)
+        length = last_and_length & _MAX_SEGMENT_LENGTH
+        if (identifier != IDENTIFIER
+                or encoding not in PayloadFormat._value2member_map_
+                or len(datagram) != HEADER_LENGTH + length):
+            self._reject()
+            return None
+        chunk = datagram[HEADER_LENGTH:]
+        (checksum,) = _CHECKSUM.unpack_from(datagram, _HEADER.size)
+        if checksum != fletcher16(datagram[:_HEADER.size] + chunk):
+            self._reject()
+            return None
+        if offset != len(self._buffer) or (offset and encoding != self._format):
+            self._reject()
+            if offset:
+                return None
+        self._format = PayloadFormat(encoding)
+        self._buffer += chunk
+        if last_and_length & _LAST_SEGMENT:
+            payload = bytes(self._buffer)
+            self._buffer.clear()
+            return self._format, payload
+        return None
@@ -6,7 +6,6 @@
 
 """Utility functions"""
 
-import copy
 import numbers
 from fractions import Fraction
 
@@ -77,7 +76,9 @@ def unwrap_clip_to_pseudo_frame(wrapped_clip: JsonSchemaValue) -> JsonSchemaValu
     ("tracker", "status"),
     ("transforms",)
   )
-  clip = copy.deepcopy(wrapped_clip)
+  # only the containers being modified are copied; the input is unchanged
+  clip = dict(wrapped_clip)
+  copied = set()
   for path in paths_to_unwrap:
     # REALLY brute-force
     if len(path) == 1:
@@ -89,6 +90,9 @@ def unwrap_clip_to_pseudo_frame(wrapped_clip: JsonSchemaValue) -> JsonSchemaValu
       if k0 in clip:
         k1 = path[1]
         if k1 in clip[k0]:
+          if k0 not in copied:
+            clip[k0] = dict(clip[k0])
+            copied.add(k0)
           clip[k0][k1] = clip[k0][k1][0]
     else:
       raise RuntimeError("That's too deep for me I'm afraid")
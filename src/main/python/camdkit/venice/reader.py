@@ -32,7 +32,7 @@ def find_value(doc: ET.ElementTree, item_name: str) -> typing.Optional[str]:
 
   return attr
 
-def get_attribute_value(element: ET.Element, attr_name: str) -> typing.Optional[str]:
+def get_attribute_value(element: typing.Optional[typing.Union[ET.Element, typing.Mapping[str, str]]], attr_name: str) -> typing.Optional[str]:
   if element is None or attr_name is None:
     return None
   v = element.get(attr_name)
@@ -71,8 +71,9 @@ def find_fps(doc: ET.ElementTree)  -> typing.Optional[Fraction]:
   if elem is None:
     return None
 
-  attr = elem.get("captureFps")
+  return fps_from_attribute(elem.get("captureFps"))
 
+def fps_from_attribute(attr: typing.Optional[str]) -> typing.Optional[Fraction]:
   if attr is None:
     return None
 
@@ -107,15 +108,61 @@ def find_px_dims(doc: ET.ElementTree) -> typing.Optional[camdkit.model.Dimension
     if elem is None:
       return None
 
-    h_pixels = int(elem.get("numOfVerticalLine"))
-
-    v_pixels = int(elem.get("pixel"))
-
-    return camdkit.model.Dimensions(height=h_pixels, width=v_pixels)
+    return px_dims_from_attributes(elem.attrib)
 
   except TypeError:
     return None
 
+def px_dims_from_attributes(attrs: typing.Mapping[str, str]) -> camdkit.model.Dimensions:
+  h_pixels = int(attrs.get("numOfVerticalLine"))
+
+  v_pixels = int(attrs.get("pixel"))
+
+  return camdkit.model.Dimensions(height=h_pixels, width=v_pixels)
+
+_NRT_NS = "{" + NS_PREFIXES["nrt"] + "}"
+
+_ITEM_TAG = _NRT_NS + "Item"
+_CAMERA_TAG = _NRT_NS + "Camera"
+_ELEMENT_TAG = _NRT_NS + "Element"
+
+# elements whose attributes are collected, first occurrence only
+_STATIC_TAGS = {_NRT_NS + name: name for name in ("Camera", "Lens", "VideoFrame", "Duration", "VideoLayout")}
+
+def read_static_metadata(static_file: typing.IO) -> typing.Dict[str, typing.Dict[str, str]]:
+  """Collect, in a single streaming pass over the static XML file, the
+  attributes of the first Camera, Lens, VideoFrame, Duration and VideoLayout
+  elements, of the first Main-Board element of the camera (as "Main-Board"),
+  and the values of all Items (as "Item", keyed by item name)."""
+
+  collected = {"Item": {}}
+  camera_depth = 0
+  camera_done = False
+
+  for event, elem in ET.iterparse(static_file, events=("start", "end")):
+    tag = elem.tag
+
+    if event == "end":
+      if tag == _CAMERA_TAG and camera_depth:
+        camera_depth -= 1
+        camera_done = camera_depth == 0
+      elem.clear()
+      continue
+
+    if tag == _ITEM_TAG:
+      name = elem.get("name")
+      value = elem.get("value")
+      if name is not None and value is not None:
+        collected["Item"].setdefault(name, value)
+    elif tag in _STATIC_TAGS:
+      collected.setdefault(_STATIC_TAGS[tag], dict(elem.attrib))
+      if tag == _CAMERA_TAG and not camera_done:
+        camera_depth += 1
+    elif tag == _ELEMENT_TAG and camera_depth and not camera_done and elem.get("hardware") == "Main-Board":
+      collected.setdefault("Main-Board", dict(elem.attrib))
+
+  return collected
+
 def t_number_from_frac_stop(frac_stop_str: str) -> typing.Optional[float]:
 
   m = re.fullmatch("T ([0-9]+)(?: ([0-9]/10))?", frac_stop_str)
@@ -142,63 +189,92 @@ def to_clip(static_file: typing.IO, dynamic_file: typing.IO) -> camdkit.model.Cl
   # read clip metadata
   clip = camdkit.model.Clip()
 
-  clip_metadata = ET.parse(static_file)
+  clip_metadata = read_static_metadata(static_file)
+
+  items = clip_metadata["Item"]
+
+  clip.iso = int_or_none(items.get("ISOSensitivity"))
+
+  camera = clip_metadata.get("Camera")
+
+  if camera is not None:
+    clip.camera_make = get_attribute_value(camera, "manufacturer")
+    clip.camera_model = get_attribute_value(camera, "modelName")
+    clip.camera_serial_number = get_attribute_value(camera, "serialNo")
+    clip.camera_firmware = get_attribute_value(clip_metadata.get("Main-Board"), "software")
 
-  clip.iso = int_or_none(find_value(clip_metadata, "ISOSensitivity"))
+  lens = clip_metadata.get("Lens")
 
-  clip.lens_serial_number = find_value(clip_metadata, "LensAttributes")
+  clip.lens_make = get_attribute_value(lens, "software")
 
-  clip.camera_make, clip.camera_model, clip.camera_serial_number, clip.camera_firmware = find_camera_info(clip_metadata)
+  clip.lens_model = get_attribute_value(lens, "modelName")
 
-  clip.lens_make, clip.lens_model, clip.lens_serial_number = find_lens_info(clip_metadata)
+  clip.lens_serial_number = items.get("LensAttributes")
 
   # lens_firmware not supported
 
-  shutter_angle = find_value(clip_metadata, "ShutterSpeedAngle")
+  shutter_angle = items.get("ShutterSpeedAngle")
   clip.shutter_angle = float(shutter_angle) / 100.0
 
-  pixel_aspect_ratio = find_value(clip_metadata, "PixelAspectRatio")
+  pixel_aspect_ratio = items.get("PixelAspectRatio")
   if pixel_aspect_ratio is not None:
     m = re.fullmatch("([0-9]+):([0-9]+)", pixel_aspect_ratio)
     if m is not None:
       clip.anamorphic_squeeze = Fraction(int(m.group(1)), int(m.group(2)))
 
-  clip_fps = find_fps(clip_metadata)
+  clip_fps = fps_from_attribute(clip_metadata.get("VideoFrame", {}).get("captureFps"))
 
   if clip_fps is None:
     raise ValueError("No valid capture fps found")
 
   clip.capture_frame_rate = utils.guess_fps(clip_fps)
 
-  n_frames = find_duration(clip_metadata)
+  n_frames = int_or_none(clip_metadata.get("Duration", {}).get("value"))
 
   if n_frames is None:
     raise ValueError("No valid duration found")
 
   pixel_pitch = 22800 / 3840 # page 5 of "VENICE v6 Ops.pdf"
-  pix_dims = find_px_dims(clip_metadata)
+  pix_dims = px_dims_from_attributes(clip_metadata.get("VideoLayout", {}))
   clip.active_sensor_physical_dimensions = camdkit.model.Dimensions(
         width=pix_dims.width * pixel_pitch  / 1000.0,
         height=pix_dims.height * pixel_pitch / 1000.0
       )
 
-  # read frame metadata
-  csv_data = list(csv.DictReader(dynamic_file))
+  # read frame metadata, parsing only the needed columns
+  reader = csv.reader(dynamic_file)
+
+  header = next(reader, [])
+
+  columns = {name: i for i, name in enumerate(header)}
+
+  focal_length_index = columns["Focal Length (mm)"]
+  focus_distance_index = columns["Focus Distance (ft)"]
+  aperture_index = columns["Aperture"]
+
+  focal_lengths = set()
+  focus_distances = []
+  t_numbers = []
+
+  # blank lines are skipped, as by csv.DictReader
+  for row in filter(None, reader):
+    focal_lengths.add(float(row[focal_length_index]))
+    focus_distances.append(float(row[focus_distance_index]) * 12.0 * 25.4 / 1000.0)
+    t_numbers.append(t_number_from_frac_stop(row[aperture_index]))
 
-  if len(csv_data) != n_frames:
-    raise ValueError(f"Inconsistent frame count between header {n_frames} and frame {len(csv_data)} files")
+  if len(focus_distances) != n_frames:
+    raise ValueError(f"Inconsistent frame count between header {n_frames} and frame {len(focus_distances)} files")
 
-  clip.duration = len(csv_data)/clip_fps
+  clip.duration = len(focus_distances)/clip_fps
 
-  focal_lengths = set([float(m["Focal Length (mm)"]) for m in csv_data])
   if len(focal_lengths) == 1:
     focal_length = float(focal_lengths.pop())
     clip.lens_nominal_focal_length = focal_length
 
-  clip.lens_focus_distance = tuple(float(m["Focus Distance (ft)"]) * 12.0 * 25.4 / 1000.0 for m in csv_data)
+  clip.lens_focus_distance = tuple(focus_distances)
 
   # TODO: clip.entrance_pupil_offset
 
-  clip.lens_t_number = tuple(t_number_from_frac_stop(m["Aperture"]) for m in csv_data)
+  clip.lens_t_number = tuple(t_numbers)
 
   return clip
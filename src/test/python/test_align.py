@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+import unittest
+from fractions import Fraction
+
+import numpy as np
+
+from camdkit.align import frame_count, frame_times, match, merge
+from camdkit.arri.reader import to_clip as arri_to_clip
+from camdkit.clip import Clip
+from camdkit.identifiers import new_sample_ids
+from camdkit.mosys.bulk import to_clip as mosys_to_clip
+from camdkit.timing_types import Timecode, Timestamp
+from camdkit.transform_types import Rotator3, Transform, Vector3
+
+
+def tracking_clip(count: int, rate: int = 48, start_seconds: int = 10) -> Clip:
+    clip = Clip()
+    clip.timing_timecode = tuple(Timecode(hours=1, minutes=0, seconds=start_seconds + i // rate,
+                                          frames=i % rate, frame_rate=rate)
+                                 for i in range(count))
+    clip.transforms = tuple((Transform(translation=Vector3(x=float(i), y=0.0, z=0.0),
+                                       rotation=Rotator3(pan=0.0, tilt=0.0, roll=0.0)),)
+                            for i in range(count))
+    clip.tracker_make = "Tracker Co"
+    return clip
+
+
+def camera_clip(count: int, rate: int = 24) -> Clip:
+    clip = Clip()
+    clip.capture_frame_rate = rate
+    clip.camera_make = "Camera Co"
+    clip.lens_focus_distance = tuple(1.0 + i for i in range(count))
+    return clip
+
+
+class AlignTestCases(unittest.TestCase):
+
+    def test_match_nearest(self):
+        right = np.array([0.0, 1.0, 2.0, 3.0])
+        self.assertEqual(match([-0.2, 0.4, 0.5, 0.6, 3.4], right).tolist(), [0, 0, 0, 1, 3])
+        self.assertEqual(match([-0.2, 0.6, 3.4], right, tolerance=0.3).tolist(), [0, -1, -1])
+
+    def test_match_asof(self):
+        right = np.array([0.0, 1.0, 2.0, 3.0])
+        self.assertEqual(match([-0.2, 0.9, 1.0, 5.0], right, "asof").tolist(), [-1, 0, 1, 3])
+        self.assertEqual(match([1.5, 5.0], right, "asof", tolerance=1.0).tolist(), [1, -1])
+
+    def test_match_unsorted(self):
+        right = np.array([2.0, 0.0, 1.0])
+        self.assertEqual(match([0.1, 1.9, 1.1], right).tolist(), [1, 0, 2])
+        self.assertEqual(match([0.1], []).tolist(), [-1])
+        with self.assertRaises(ValueError):
+            match([0.1], right, "linear")
+
+    def test_frame_times(self):
+        clip = tracking_clip(3)
+        self.assertTrue(np.allclose(frame_times(clip, "timecode"), 3610 + np.arange(3) / 48))
+        clip = camera_clip(4)
+        start = Timecode(hours=1, minutes=0, seconds=10, frames=12, frame_rate=24)
+        self.assertTrue(np.allclose(frame_times(clip, "timecode", start), 3610.5 + np.arange(4) / 24))
+        self.assertTrue(np.allclose(frame_times(clip, "timestamp", Timestamp(100, 500_000_000)),
+                                    100.5 + np.arange(4) / 24))
+        with self.assertRaises(ValueError):
+            frame_times(clip, "timecode")
+        with self.assertRaises(ValueError):
+            frame_times(clip, "frame")
+
+    def test_frame_times_across_midnight(self):
+        clip = Clip()
+        clip.timing_timecode = (Timecode(hours=23, minutes=59, seconds=59, frames=24, frame_rate=25),
+                                Timecode(hours=0, minutes=0, seconds=0, frames=0, frame_rate=25))
+        times = frame_times(clip, "timecode")
+        self.assertAlmostEqual(times[1] - times[0], 0.04)
+
+    def test_frame_count(self):
+        self.assertEqual(frame_count(camera_clip(7)), 7)
+        clip = Clip()
+        self.assertEqual(frame_count(clip), 0)
+        clip.capture_frame_rate = 24
+        clip.duration = Fraction(5, 2)
+        self.assertEqual(frame_count(clip), 60)
+
+    def test_merge(self):
+        camera = camera_clip(10)
+        tracking = tracking_clip(30)
+        result = merge(camera, tracking,
+                       camera_start=Timecode(hours=1, minutes=0, seconds=10, frames=2, frame_rate=24))
+        # camera frame i is at 1:00:10 + (2 + i) / 24, tracking sample 2 * (2 + i)
+        self.assertEqual(result.camera_frames.tolist(), list(range(10)))
+        self.assertEqual(result.tracking_frames.tolist(), [4 + 2 * i for i in range(10)])
+        self.assertEqual(len(result.unmatched_camera_frames), 0)
+        self.assertEqual(len(result.unmatched_tracking_frames), 20)
+        clip = result.clip
+        self.assertEqual(clip.camera_make, "Camera Co")
+        self.assertEqual(clip.tracker_make, "Tracker Co")
+        self.assertEqual(clip.lens_focus_distance, camera.lens_focus_distance)
+        self.assertEqual([t[0].translation.x for t in clip.transforms], [4.0 + 2 * i for i in range(10)])
+        self.assertEqual(clip.timing_sample_rate, (Fraction(24),) * 10)
+        self.assertEqual(clip.duration, Fraction(10, 24))
+
+    def test_merge_sample_ids(self):
+        camera = camera_clip(8, rate=48)
+        tracking = tracking_clip(10, rate=24)
+        tracking.sample_id = tuple(new_sample_ids(10))
+        result = merge(camera, tracking, "timecode", "asof", tolerance=0.03,
+                       camera_start=Timecode(hours=1, minutes=0, seconds=10, frames=0, frame_rate=48))
+        self.assertEqual(len(result.camera_frames), 8)
+        self.assertEqual(len(set(result.tracking_frames.tolist())), 4)
+        sample_ids = result.clip.sample_id
+        self.assertEqual(len(set(sample_ids)), 8)
+        self.assertFalse(set(sample_ids) & set(tracking.sample_id))
+        camera.sample_id = tuple(new_sample_ids(8))
+        result = merge(camera, tracking, "timecode", "asof", tolerance=0.03,
+                       camera_start=Timecode(hours=1, minutes=0, seconds=10, frames=0, frame_rate=48))
+        self.assertEqual(result.clip.sample_id, camera.sample_id)
+
+    def test_merge_unmatched(self):
+        camera = camera_clip(24)
+        tracking = tracking_clip(24)
+        result = merge(camera, tracking, camera_start=3610.0)
+        # the tracking clip covers the first half second
+        self.assertEqual(result.camera_frames.tolist(), list(range(12)))
+        self.assertEqual(result.unmatched_camera_frames.tolist(), list(range(12, 24)))
+        self.assertEqual(result.unmatched_tracking_frames.tolist(), list(range(1, 24, 2)))
+        self.assertEqual(len(result.clip.lens_focus_distance), 12)
+        self.assertEqual(len(result.clip.transforms), 12)
+
+    def test_merge_readers(self):
+        camera = arri_to_clip("src/test/resources/arri/B001C001_180327_R1ZA.mov.csv")
+        tracking = mosys_to_clip("src/test/resources/mosys/A003_C001_01 15-03-47-01.f4", frames=700)
+        result = merge(camera, tracking, camera_start=tracking.timing_timecode[10])
+        self.assertEqual(len(result.camera_frames), 500)
+        self.assertEqual(result.clip.camera_make, "ARRI")
+        self.assertEqual(len(result.clip.transforms), 500)
+        self.assertEqual(result.clip.timing_timecode[0], tracking.timing_timecode[10])
+
+
+if __name__ == '__main__':
+    unittest.main()
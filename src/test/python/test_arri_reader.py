@@ -50,6 +50,29 @@ def test_reader(self):
 
     self.assertEqual(clip.shutter_angle, 172.8)
 
+  def test_iter_chunks(self):
+    path = "src/test/resources/arri/B001C001_180327_R1ZA.mov.csv"
+    chunks = list(camdkit.arri.reader.iter_chunks(path, chunk_frames=128))
+
+    self.assertEqual([len(c.lens_focus_distance) for c in chunks], [128, 128, 128, 116])
+
+    self.assertEqual(chunks[3].duration, Fraction(116, 24))
+
+    self.assertEqual(chunks[3].lens_nominal_focal_length, 40)
+
+    self.assertEqual(chunks[3].camera_serial_number, "2566")
+
+    clip = camdkit.arri.reader.to_clip(path)
+
+    self.assertEqual(clip.duration, Fraction(500, 24))
+
+    self.assertEqual(sum((c.lens_focus_distance for c in chunks), ()), clip.lens_focus_distance)
+
+    self.assertEqual(sum((c.lens_t_number for c in chunks), ()), clip.lens_t_number)
+
+    with self.assertRaises(ValueError):
+      next(camdkit.arri.reader.iter_chunks(path, chunk_frames=0))
+
   def test_non_meter_distance_unit_raises_value_error(self):
     with tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False, encoding="utf-8") as f:
       f.write("Lens Distance Unit\tExposure Index ASA\tProject FPS\n")
@@ -61,5 +84,19 @@ def test_non_meter_distance_unit_raises_value_error(self):
     finally:
       os.unlink(path)
 
+  def test_blank_lines_skipped(self):
+    path = "src/test/resources/arri/B001C001_180327_R1ZA.mov.csv"
+    with open(path, "r", encoding="utf-8", newline="") as fp:
+      lines = fp.readlines()
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False, encoding="utf-8", newline="") as f:
+      f.writelines(lines[:2] + ["\r\n"] + lines[2:10] + ["\n"] + lines[10:] + ["\n"])
+      blank_path = f.name
+    try:
+      clip = camdkit.arri.reader.to_clip(blank_path)
+    finally:
+      os.unlink(blank_path)
+    self.assertEqual(clip.duration, Fraction(500, 24))
+    self.assertEqual(clip.lens_focus_distance, camdkit.arri.reader.to_clip(path).lens_focus_distance)
+
   def test_linear_iris_value(self):
     self.assertEqual(round(camdkit.arri.reader.t_number_from_linear_iris_value(6000) * 1000), 5657)
@@ -7,6 +7,7 @@
 '''Blackmagic camera RAW reader tests'''
 
 import io
+from fractions import Fraction
 import unittest
 
 import camdkit.bmd.reader
@@ -40,6 +41,8 @@ def test_reader(self):
 
     self.assertEqual(clip.capture_frame_rate, 48)
 
+    self.assertEqual(clip.duration, Fraction(1, 48))
+
     self.assertEqual(clip.lens_nominal_focal_length, 50)
 
     self.assertEqual(clip.lens_focus_distance[0], 991)
@@ -56,3 +59,29 @@ def test_no_frames_raises_value_error(self):
     clip_only = io.StringIO("Clip Metadata\nmanufacturer: Blackmagic Design\n")
     with self.assertRaises(ValueError):
       camdkit.bmd.reader.to_clip(clip_only)
+
+  def test_streamed_frames(self):
+    frames = "".join(
+      f"Frame {i} Metadata\nsensor_rate: 24,1,\nfocal_length: {50 if i < 2 else 85}mm\n"
+      f"distance: {1000 + i}mm\naperture: T2.{i}\nnote: a: b\n"
+      for i in range(3)
+    )
+    clip = camdkit.bmd.reader.to_clip(io.StringIO("Clip Metadata\nmanufacturer: Blackmagic Design\n\n" + frames))
+
+    self.assertEqual(clip.lens_focus_distance, (1000.0, 1001.0, 1002.0))
+
+    self.assertEqual(clip.lens_t_number, (2.0, 2.1, 2.2))
+
+    self.assertIsNone(clip.lens_nominal_focal_length)
+
+    self.assertEqual(clip.duration, Fraction(3, 24))
+
+    with self.assertRaises(ValueError):
+      camdkit.bmd.reader.to_clip(io.StringIO("Frame 0 Metadata\naperture: T2.8\n"))
+
+  def test_f_stop_aperture(self):
+    frames = "".join(f"Frame {i} Metadata\nsensor_rate: 24,1,\ndistance: 1000mm\naperture: {aperture}\n"
+                     for i, aperture in enumerate(("f2.8", "F4", "T5.6")))
+    clip = camdkit.bmd.reader.to_clip(io.StringIO("Clip Metadata\nmanufacturer: Blackmagic Design\n\n" + frames))
+
+    self.assertEqual(clip.lens_t_number, (2.8, 4.0, 5.6))
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""Tests for batch projection and view matrices"""
+
+import unittest
+from fractions import Fraction
+
+import numpy as np
+
+from camdkit.camera_model import projection_matrices, transform_matrices
+from camdkit.camera_types import PhysicalDimensions
+from camdkit.clip import Clip
+from camdkit.lens_types import ProjectionOffset
+from camdkit.transform_types import Rotator3, Transform, Vector3
+
+
+def project(matrices, i, point):
+    clip_space = matrices.projection[i] @ matrices.view[i] @ np.append(point, 1.0)
+    return clip_space[:3] / clip_space[3]
+
+
+class CameraModelTestCases(unittest.TestCase):
+
+    def setUp(self):
+        self.clip = Clip()
+        self.clip.active_sensor_physical_dimensions = PhysicalDimensions(width=36.0, height=24.0)
+        self.clip.lens_pinhole_focal_length = (18.0, 12.0)
+        self.clip.transforms = (
+            (Transform(translation=Vector3(1.0, 2.0, 1.5), rotation=Rotator3(0.0, 0.0, 0.0)),),
+            (Transform(translation=Vector3(0.0, 0.0, 0.0), rotation=Rotator3(0.0, 0.0, 0.0)),
+             Transform(translation=Vector3(0.0, 0.0, 2.0), rotation=Rotator3(90.0, 0.0, 0.0))),
+        )
+
+    def test_fields_of_view(self):
+        matrices = projection_matrices(self.clip, 0.1, 100.0)
+        self.assertEqual(matrices.projection.shape, (2, 4, 4))
+        self.assertAlmostEqual(matrices.horizontal_fov[0], 90.0)
+        self.assertAlmostEqual(matrices.vertical_fov[1], 90.0)
+        self.clip.anamorphic_squeeze = Fraction(2)
+        matrices = projection_matrices(self.clip, 0.1, 100.0)
+        self.assertAlmostEqual(matrices.horizontal_fov[1], 2.0 * np.degrees(np.arctan(3.0)))
+        self.assertAlmostEqual(matrices.right[0], 0.2)
+        with self.assertRaises(ValueError):
+            projection_matrices(self.clip, 1.0, 0.5)
+
+    def test_view_matrices(self):
+        matrices = projection_matrices(self.clip, 0.1, 100.0)
+        self.assertEqual(matrices.view.shape, (2, 4, 4))
+        # straight ahead of the camera along stage +Y
+        np.testing.assert_allclose(project(matrices, 0, (1.0, 12.0, 1.5))[:2], (0.0, 0.0), atol=1e-12)
+        # up and to the right of the camera
+        ndc = project(matrices, 0, (2.0, 3.0, 2.5))
+        self.assertAlmostEqual(ndc[0], 1.0)
+        self.assertAlmostEqual(ndc[1], 1.5)
+        self.assertTrue(-1.0 < ndc[2] < 1.0)
+        # panned 90 degrees, the camera looks along stage -X
+        np.testing.assert_allclose(project(matrices, 1, (-5.0, 0.0, 2.0))[:2], (0.0, 0.0), atol=1e-12)
+        self.assertAlmostEqual(transform_matrices(self.clip)[1, 2, 3], 2.0)
+
+    def test_projection_offset_and_entrance_pupil(self):
+        self.clip.lens_projection_offset = (ProjectionOffset(1.8, 1.2), ProjectionOffset(0.0, 0.0))
+        self.clip.lens_entrance_pupil_offset = (0.5, 0.0)
+        matrices = projection_matrices(self.clip, 0.1, 100.0)
+        # the principal point moves right and down on the image
+        ndc = project(matrices, 0, (1.0, 12.0, 1.5))
+        self.assertAlmostEqual(ndc[0], 0.1)
+        self.assertAlmostEqual(ndc[1], -0.1)
+        # the view is centred on the entrance pupil, half a meter forward
+        self.assertAlmostEqual(matrices.view[0, 2, 3], 2.5)
+        matrices = projection_matrices(self.clip, 0.1, 100.0, use_entrance_pupil=False)
+        self.assertAlmostEqual(matrices.view[0, 2, 3], 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,7 @@
 
 '''Canon camera reader tests'''
 
+import io
 import unittest
 
 import camdkit.canon.reader
@@ -38,3 +39,26 @@ def test_reader(self):
     self.assertEqual(clip.anamorphic_squeeze, 1)  # anamorphic_squeeze: 1
 
     self.assertIsNone(clip.active_sensor_physical_dimensions)
+
+  def test_blank_lines_skipped(self):
+    static_path = "src/test/resources/canon/20221007_TNumber_CanonCameraMetadata_Static.csv"
+    frames_path = "src/test/resources/canon/20221007_TNumber_CanonCameraMetadata_Frames.csv"
+    with open(frames_path, "r", encoding="utf-8") as frame_csv:
+      lines = frame_csv.readlines()
+    with open(static_path, "r", encoding="utf-8") as static_csv:
+      clip = camdkit.canon.reader.to_clip(static_csv, io.StringIO("".join(lines[:1] + ["\n"] + lines[1:] + ["\n"])))
+    with open(static_path, "r", encoding="utf-8") as static_csv, \
+      open(frames_path, "r", encoding="utf-8") as frame_csv:
+      expected = camdkit.canon.reader.to_clip(static_csv, frame_csv)
+    self.assertEqual(clip.lens_focus_distance, expected.lens_focus_distance)
+    self.assertEqual(clip.lens_t_number, expected.lens_t_number)
+
+  def test_float32_hex_column(self):
+    values = camdkit.canon.reader._read_float32_column_as_hex(["3F000000", "BF800000", "41200000"])
+
+    self.assertEqual(values.tolist(), [0.5, -1.0, 10.0])
+
+    self.assertEqual(values[0], camdkit.canon.reader._read_float32_as_hex("3F000000"))
+
+    with self.assertRaises(ValueError):
+      camdkit.canon.reader._read_float32_column_as_hex(["3F0000", "0000BF800000"])
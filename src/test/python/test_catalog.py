@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import cbor2
+
+from camdkit.arri.reader import to_clip as arri_to_clip
+from camdkit.catalog import Catalog
+from camdkit.clip import Clip
+from camdkit.lens_types import FizEncoders
+from camdkit.session import load_clip
+from camdkit.timing_types import Timecode, Timestamp
+
+
+def lens_clip(lens_model: str, focal_lengths: list[float], start_seconds: int, rate: int = 25) -> Clip:
+    clip = Clip()
+    clip.lens_model = lens_model
+    clip.lens_nominal_focal_length = focal_lengths[0]
+    clip.capture_frame_rate = rate
+    clip.lens_pinhole_focal_length = tuple(focal_lengths)
+    clip.lens_encoders = tuple(FizEncoders(focus=0.5, zoom=i / len(focal_lengths))
+                               for i in range(len(focal_lengths)))
+    clip.source_number = (1,) * len(focal_lengths)
+    clip.timing_timecode = tuple(Timecode(hours=12, minutes=0, seconds=start_seconds + i // rate,
+                                          frames=i % rate, frame_rate=rate)
+                                 for i in range(len(focal_lengths)))
+    return clip
+
+
+def write_clip(clip: Clip, path: str) -> None:
+    if path.endswith(".cbor"):
+        with open(path, "wb") as fp:
+            cbor2.dump(clip.to_json(), fp)
+    else:
+        with open(path, "w", encoding="utf-8") as fp:
+            json.dump(clip.to_json(), fp)
+
+
+class CatalogTestCases(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+        write_clip(lens_clip("Prime", [35.0] * 50, 0), os.path.join(self.root, "a.json"))
+        write_clip(lens_clip("Zoom", [24.0 + i for i in range(50)], 10), os.path.join(self.root, "b.cbor"))
+        os.makedirs(os.path.join(self.root, "day2"))
+        write_clip(lens_clip("Prime", [50.0] * 25, 20), os.path.join(self.root, "day2", "c.json"))
+        self.catalog = Catalog(os.path.join(self.root, "catalog.sqlite"))
+
+    def tearDown(self):
+        self.catalog.close()
+        self.directory.cleanup()
+
+    def names(self, entries) -> list[str]:
+        return [os.path.relpath(entry.path, self.root) for entry in entries]
+
+    def test_index(self):
+        update = self.catalog.update([self.root])
+        self.assertEqual(len(update.indexed), 3)
+        self.assertEqual(update.failed, {})
+        self.assertEqual(len(self.catalog), 3)
+        entry, = self.catalog.query({"lens_model": "Zoom"})
+        self.assertEqual(entry.frame_count, 50)
+        self.assertEqual(entry.source_number, 1)
+        self.assertEqual(entry.static["capture_frame_rate"], 25.0)
+        self.assertEqual(entry.static["lens_nominal_focal_length"], 24.0)
+        self.assertAlmostEqual(entry.timecode_start, 12 * 3600 + 10)
+        self.assertAlmostEqual(entry.timecode_end, 12 * 3600 + 11 + 24 / 25)
+        statistics = entry.statistics["lens_pinhole_focal_length"]
+        self.assertEqual((statistics.minimum, statistics.maximum, statistics.count), (24.0, 73.0, 50))
+        self.assertAlmostEqual(statistics.mean, 48.5)
+        self.assertEqual(entry.statistics["lens_encoders.focus"].maximum, 0.5)
+        self.assertNotIn("timing_timecode", entry.statistics)
+
+    def test_query(self):
+        self.catalog.update([self.root])
+        self.assertEqual(self.names(self.catalog.query()), ["a.json", "b.cbor", os.path.join("day2", "c.json")])
+        self.assertEqual(self.names(self.catalog.query({"lens_model": "Prime"})),
+                         ["a.json", os.path.join("day2", "c.json")])
+        self.assertEqual(self.names(self.catalog.query({"lens_pinhole_focal_length": (34, 36)})),
+                         ["a.json", "b.cbor"])
+        self.assertEqual(self.names(self.catalog.query({"lens_model": "Prime",
+                                                        "lens_pinhole_focal_length": (34, 36)})),
+                         ["a.json"])
+        self.assertEqual(self.names(self.catalog.query({"lens_nominal_focal_length": (40, None)})),
+                         [os.path.join("day2", "c.json")])
+        self.assertEqual(self.names(self.catalog.query({"lens_encoders.zoom": (None, 0.01)})),
+                         ["a.json", "b.cbor", os.path.join("day2", "c.json")])
+        self.assertEqual(self.catalog.query({"lens_model": "Anamorphic"}), [])
+
+    def test_time_query(self):
+        self.catalog.update([self.root])
+        start = Timecode(hours=12, minutes=0, seconds=5, frames=0, frame_rate=25)
+        end = Timecode(hours=12, minutes=0, seconds=15, frames=0, frame_rate=25)
+        self.assertEqual(self.names(self.catalog.query(timecode=(start, end))), ["b.cbor"])
+        self.assertEqual(self.names(self.catalog.query({"lens_model": "Prime"}, timecode=(12 * 3600 + 1.5, None))),
+                         ["a.json", os.path.join("day2", "c.json")])
+        self.assertEqual(self.catalog.query(timestamp=(Timestamp(0, 0), None)), [])
+
+    def test_incremental_update(self):
+        self.catalog.update([self.root])
+        update = self.catalog.update([self.root])
+        self.assertEqual((update.indexed, update.unchanged, update.removed), ([], 3, []))
+
+        path = os.path.join(self.root, "a.json")
+        write_clip(lens_clip("Macro", [100.0] * 10, 0), path)
+        os.utime(path, ns=(0, 0))
+        os.remove(os.path.join(self.root, "day2", "c.json"))
+        with open(os.path.join(self.root, "notes.json"), "w") as fp:
+            json.dump({"take": "good"}, fp)
+        update = self.catalog.update([self.root])
+        self.assertEqual(update.indexed, [path])
+        self.assertEqual(update.unchanged, 1)
+        self.assertEqual([os.path.relpath(p, self.root) for p in update.failed], ["notes.json"])
+        self.assertEqual([os.path.relpath(p, self.root) for p in update.removed], [os.path.join("day2", "c.json")])
+        self.assertEqual(self.names(self.catalog.query({"lens_model": "Macro"})), ["a.json"])
+        self.assertEqual(len(self.catalog), 2)
+        self.assertEqual(self.catalog.query({"lens_pinhole_focal_length": (34, 36)})[0].statistics.keys(),
+                         {"lens_pinhole_focal_length", "lens_encoders.focus", "lens_encoders.zoom",
+                          "source_number"})
+
+    def test_persistence_and_lazy_clips(self):
+        self.catalog.update([self.root])
+        self.catalog.close()
+        loaded = []
+
+        def loader(path: str) -> Clip:
+            loaded.append(path)
+            return load_clip(path)
+
+        self.catalog = Catalog(os.path.join(self.root, "catalog.sqlite"), loader=loader)
+        entry, = self.catalog.query({"lens_model": "Zoom"})
+        self.assertFalse(entry.loaded)
+        self.assertEqual(loaded, [])
+        self.assertEqual(entry.clip.lens_pinhole_focal_length[-1], 73.0)
+        entry.clip
+        self.assertEqual(loaded, [entry.path])
+        entry.unload()
+        self.assertFalse(entry.loaded)
+
+    def test_reader_clip(self):
+        path = os.path.join(self.root, "arri.json")
+        write_clip(arri_to_clip("src/test/resources/arri/B001C001_180327_R1ZA.mov.csv"), path)
+        self.catalog.add(path)
+        entry, = self.catalog.query({"camera_make": "ARRI", "active_sensor_physical_dimensions.width": (300, 400)})
+        self.assertEqual(entry.static["lens_model"], "SP40 T1.8")
+        self.assertEqual(entry.static["duration"], 125 / 6)
+        self.assertIsNone(entry.timecode_start)
+        self.assertIn("lens_focus_distance", entry.statistics)
+
+    def test_unsupported_version(self):
+        path = os.path.join(self.root, "other.sqlite")
+        connection = sqlite3.connect(path)
+        connection.execute("PRAGMA user_version = 99")
+        connection.close()
+        with self.assertRaises(ValueError):
+            Catalog(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
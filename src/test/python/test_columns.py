@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+import copy
+import json
+import pickle
+import time
+import tracemalloc
+import unittest
+
+from pydantic import ValidationError
+
+from camdkit.clip import Clip
+from camdkit.columns import CategoricalColumn, RunLengthColumn
+from camdkit.model import OPENTRACKIO_PROTOCOL_NAME, OPENTRACKIO_PROTOCOL_VERSION
+from camdkit.timing_types import Synchronization, SynchronizationSource
+from camdkit.versioning_types import VersionedProtocol
+
+
+class CategoricalColumnTestCases(unittest.TestCase):
+
+    def test_encoding(self):
+        column = CategoricalColumn(("Optical Good", "Optical Bad", "Optical Good"))
+        self.assertEqual(column.categories, ("Optical Good", "Optical Bad"))
+        self.assertEqual(list(column.codes), [0, 1, 0])
+        self.assertEqual(column.codes.itemsize, 1)
+        self.assertEqual(len(column), 3)
+        self.assertEqual(column[1], "Optical Bad")
+        self.assertEqual(column[-1], "Optical Good")
+        self.assertEqual(tuple(column[1:]), ("Optical Bad", "Optical Good"))
+        self.assertIn("Optical Bad", column)
+        self.assertNotIn("Optical Lost", column)
+        self.assertEqual(column.count("Optical Good"), 2)
+        self.assertEqual(CategoricalColumn(str(i) for i in range(300)).codes.itemsize, 2)
+
+    def test_from_codes(self):
+        column = CategoricalColumn.from_codes([1, 1, 0], ("a", "b"))
+        self.assertEqual(column, ("b", "b", "a"))
+        with self.assertRaises(ValueError):
+            CategoricalColumn.from_codes([2], ("a", "b"))
+
+    def test_equality(self):
+        column = CategoricalColumn(("a", "b", "a"))
+        self.assertEqual(column, ("a", "b", "a"))
+        self.assertEqual(("a", "b", "a"), column)
+        self.assertNotEqual(column, ("a", "b"))
+        self.assertNotEqual(column, ("a", "b", "c"))
+        self.assertNotEqual(column, ["a", "b", "a"])
+        self.assertEqual(column, CategoricalColumn(("a", "b", "a")))
+        self.assertEqual(column, CategoricalColumn.from_codes([1, 0, 1], ("b", "a")))
+        self.assertEqual(hash(column), hash(("a", "b", "a")))
+
+    def test_concatenation(self):
+        column = CategoricalColumn(("a", "b"))
+        self.assertEqual(column + column, ("a", "b", "a", "b"))
+        self.assertIs((column + column).categories, column.categories)
+        self.assertEqual(column + ("c",), ("a", "b", "c"))
+        self.assertEqual(("c",) + column, ("c", "a", "b"))
+        self.assertIsInstance(("c",) + column, CategoricalColumn)
+
+    def test_copies(self):
+        column = CategoricalColumn(("a", "b"))
+        self.assertIs(copy.copy(column), column)
+        self.assertEqual(copy.deepcopy(column), column)
+        self.assertEqual(pickle.loads(pickle.dumps(column)), column)
+        self.assertEqual(column.as_tuple(), ("a", "b"))
+
+
+class CategoricalClipTestCases(unittest.TestCase):
+
+    def test_clip_storage(self):
+        clip = Clip()
+        clip.tracker_status = ("Optical Good",) * 10000
+        column = clip.tracker.status
+        self.assertIsInstance(column, CategoricalColumn)
+        self.assertEqual(column.categories, ("Optical Good",))
+        self.assertEqual(column.codes.itemsize * len(column), 10000)
+        self.assertIsInstance(clip.tracker_status, tuple)
+        self.assertEqual(clip.tracker_status, ("Optical Good",) * 10000)
+        clip.tracker_slate = ("A101_A_4",)
+        self.assertEqual(clip.tracker_slate, ("A101_A_4",))
+        with self.assertRaises(ValidationError):
+            clip.tracker_notes = ("",)
+        with self.assertRaises(ValidationError):
+            clip.source_id = ("urn:uuid:1",)
+
+    def test_getter_keeps_no_tuple(self):
+        clip = Clip()
+        clip.tracker_status = ("Optical Good", "Optical Bad") * 50000
+        clip.source_number = (1,) * 100000
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            self.assertEqual(len(clip.tracker_status), 100000)
+            self.assertEqual(len(clip.source_number), 100000)
+            clip.to_json()
+            # a kept tuple would hold 8 bytes per frame
+            self.assertLess(tracemalloc.get_traced_memory()[0] - before, 100000)
+        finally:
+            tracemalloc.stop()
+
+    def test_columns_validated_by_category(self):
+        clip = Clip()
+        clip.tracker_status = CategoricalColumn.from_codes([0, 0], ("Optical Good",))
+        self.assertEqual(clip.tracker_status, ("Optical Good", "Optical Good"))
+        with self.assertRaises(ValidationError):
+            clip.tracker_status = CategoricalColumn.from_codes([0], ("x" * 1024,))
+
+    def test_serialization(self):
+        clip = Clip()
+        status = ("Optical Good", "Optical Bad", "Optical Good")
+        clip.tracker_status = status
+        self.assertEqual(clip.to_json()["tracker"]["status"], status)
+        self.assertEqual(json.loads(json.dumps(clip.to_json()))["tracker"]["status"], list(status))
+        self.assertEqual(clip[1].tracker_status, ("Optical Bad",))
+
+    def test_append(self):
+        clip = Clip()
+        clip.tracker_status = ("Optical Good",)
+        other = Clip()
+        other.tracker_status = ("Optical Good", "Optical Bad")
+        clip.append(other)
+        self.assertTupleEqual(clip.tracker_status, ("Optical Good", "Optical Good", "Optical Bad"))
+        self.assertIsInstance(clip.tracker.status, CategoricalColumn)
+
+
+class RunLengthColumnTestCases(unittest.TestCase):
+
+    def test_encoding(self):
+        column = RunLengthColumn((1, 1, 1, 2, 2, 1))
+        self.assertEqual(column.values, (1, 2, 1))
+        self.assertEqual(list(column.starts), [0, 3, 5])
+        self.assertEqual(column.run_lengths(), [3, 2, 1])
+        self.assertEqual(len(column), 6)
+        self.assertEqual([column[i] for i in range(6)], [1, 1, 1, 2, 2, 1])
+        self.assertEqual(column[-1], 1)
+        self.assertEqual(column[-3], 2)
+        with self.assertRaises(IndexError):
+            column[6]
+        self.assertEqual(len(RunLengthColumn()), 0)
+
+    def test_slices(self):
+        values = (1, 1, 1, 2, 2, 1, 3, 3)
+        column = RunLengthColumn(values)
+        for i in range(len(values) + 1):
+            for j in range(len(values) + 1):
+                self.assertEqual(column[i:j], values[i:j])
+        self.assertEqual(column[::2], values[::2])
+        self.assertEqual(column[::-1], values[::-1])
+
+    def test_from_runs(self):
+        column = RunLengthColumn.from_runs(("a", "a", "b", "c"), (2, 1, 0, 4))
+        self.assertEqual(column.values, ("a", "c"))
+        self.assertEqual(column, ("a",) * 3 + ("c",) * 4)
+        with self.assertRaises(ValueError):
+            RunLengthColumn.from_runs(("a",), (-1,))
+
+    def test_equality(self):
+        column = RunLengthColumn(("a", "a", "b"))
+        self.assertEqual(column, ("a", "a", "b"))
+        self.assertEqual(("a", "a", "b"), column)
+        self.assertNotEqual(column, ("a", "b", "b"))
+        self.assertNotEqual(column, ("a", "a"))
+        self.assertEqual(column, RunLengthColumn.from_runs(("a", "b"), (2, 1)))
+        self.assertNotEqual(column, RunLengthColumn.from_runs(("a", "b"), (1, 2)))
+        self.assertEqual(hash(column), hash(("a", "a", "b")))
+
+    def test_concatenation(self):
+        column = RunLengthColumn(("a", "a"))
+        self.assertEqual((column + column).values, ("a",))
+        self.assertEqual(len(column + column), 4)
+        self.assertEqual(column + ("b",), ("a", "a", "b"))
+        self.assertEqual(("b",) + column, ("b", "a", "a"))
+        self.assertIsInstance(("b",) + column, RunLengthColumn)
+
+    def test_copies(self):
+        column = RunLengthColumn((1, 1, 2))
+        self.assertIs(copy.copy(column), column)
+        self.assertEqual(copy.deepcopy(column), column)
+        self.assertEqual(pickle.loads(pickle.dumps(column)), column)
+        protocol = VersionedProtocol(OPENTRACKIO_PROTOCOL_NAME, OPENTRACKIO_PROTOCOL_VERSION)
+        column = RunLengthColumn((protocol,) * 3)
+        copied = copy.deepcopy(column)
+        self.assertEqual(copied, column)
+        self.assertIsNot(copied[0], protocol)
+        copied[0].name = "Other"
+        self.assertEqual(column[2].name, OPENTRACKIO_PROTOCOL_NAME)
+
+
+class RunLengthClipTestCases(unittest.TestCase):
+
+    def test_clip_storage(self):
+        clip = Clip()
+        protocol = VersionedProtocol(OPENTRACKIO_PROTOCOL_NAME, OPENTRACKIO_PROTOCOL_VERSION)
+        clip.protocol = (protocol,) * 10000
+        self.assertIsInstance(clip.global_protocol, RunLengthColumn)
+        self.assertEqual(clip.global_protocol.values, (protocol,))
+        self.assertTupleEqual(clip.protocol, (protocol,) * 10000)
+        clip.source_number = (1, 1, 2)
+        self.assertEqual(clip.global_source_number.run_lengths(), [2, 1])
+        clip.timing_mode = ("internal",)
+        self.assertEqual(clip.timing_mode, ("internal",))
+        with self.assertRaises(ValidationError):
+            clip.timing_mode = ("sometimes",)
+        with self.assertRaises(ValidationError):
+            clip.source_number = RunLengthColumn.from_runs((-1,), (5,))
+        with self.assertRaises(ValidationError):
+            clip.lens_distortions = ()
+
+    def test_shared_columns_not_copied(self):
+        column = RunLengthColumn((1,))
+        clip = Clip()
+        clip.source_number = column
+        self.assertIs(clip.global_source_number, column)
+
+    def test_serialization(self):
+        clip = Clip()
+        sync = Synchronization(locked=True, source=SynchronizationSource.GENLOCK, frequency=25)
+        clip.timing_synchronization = (sync,) * 3
+        serialized = clip.to_json()["timing"]["synchronization"]
+        self.assertEqual(serialized, ({"locked": True, "source": "genlock",
+                                       "frequency": {"num": 25, "denom": 1}},) * 3)
+        self.assertEqual(clip[2].timing_synchronization, (sync,))
+        other = Clip()
+        other.timing_synchronization = (sync,)
+        clip.append(other)
+        self.assertEqual(clip.timing.synchronization.values, (sync,))
+        self.assertEqual(len(clip.timing_synchronization), 4)
+
+
+def column_clip(frames: int) -> Clip:
+    clip = Clip()
+    clip.protocol = RunLengthColumn.from_runs(
+        (VersionedProtocol(OPENTRACKIO_PROTOCOL_NAME, OPENTRACKIO_PROTOCOL_VERSION),), (frames,))
+    clip.source_number = RunLengthColumn.from_runs((1,), (frames,))
+    clip.timing_mode = RunLengthColumn.from_runs(("internal",), (frames,))
+    clip.timing_synchronization = RunLengthColumn.from_runs(
+        (Synchronization(locked=True, source=SynchronizationSource.GENLOCK, frequency=25),), (frames,))
+    clip.tracker_status = CategoricalColumn.from_codes([0, 1] * (frames // 2), ("Optical Good", "Optical Bad"))
+    return clip
+
+
+class ColumnAppendTestCases(unittest.TestCase):
+
+    def test_append_extends_columns(self):
+        clip = column_clip(4)
+        clip.append(column_clip(2))
+        self.assertEqual(clip.global_source_number.values, (1,))
+        self.assertEqual(clip.tracker.status.categories, ("Optical Good", "Optical Bad"))
+        self.assertTupleEqual(clip.tracker_status, ("Optical Good", "Optical Bad") * 3)
+        other = column_clip(2)[0]
+        other.source_number = (2,)
+        other.tracker_status = ("Optical Lost",)
+        clip.append(other)
+        self.assertEqual(clip.global_source_number.run_lengths(), [6, 1])
+        self.assertEqual(clip.tracker_status[-2:], ("Optical Bad", "Optical Lost"))
+        self.assertEqual(clip[6].tracker_status, ("Optical Lost",))
+        self.assertEqual(clip[5].source_number, (1,))
+
+    def test_appended_columns_stay_independent(self):
+        clip = column_clip(2)
+        before = clip.tracker.status
+        first, second = copy.deepcopy(clip), copy.deepcopy(clip)
+        clip.append(column_clip(2))
+        second.append(column_clip(2))
+        self.assertEqual(len(before), 2)
+        self.assertEqual(len(first.tracker_status), 2)
+        third = Clip()
+        third.tracker.status = before + ("Optical Lost",)
+        self.assertTupleEqual(third.tracker_status, ("Optical Good", "Optical Bad", "Optical Lost"))
+        self.assertTupleEqual(clip.tracker_status, ("Optical Good", "Optical Bad") * 2)
+
+    def test_append_cost_does_not_grow(self):
+        def append_time(clip: Clip) -> float:
+            frame = column_clip(2)[1]
+            best = float("inf")
+            for _ in range(20):
+                start = time.perf_counter()
+                clip.append(frame)
+                best = min(best, time.perf_counter() - start)
+            return best
+
+        short = append_time(column_clip(2))
+        long = append_time(column_clip(1_000_000))
+        self.assertLess(long, 3 * short + 1e-4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,6 +10,13 @@
 
 import camdkit.red.cooke
 
+_COOKE_METADATA_HEX = (
+  "64/40/40/46/68/48/70/B8/80/40/40/40/42/66/6D/40/40/46/5E/40/40/46/73/45/4E/41/7F/40/40/53/47/35/33/35/39/39/37/36/34/0A/0D",
+  "64/40/40/46/74/48/70/B8/80/40/40/40/42/67/4B/40/40/46/69/40/40/47/40/45/4E/61/7E/40/40/53/47/35/33/35/39/39/37/36/34/0A/0D",
+)
+
+_COOKE_STATIC = "NSG53599764OSIGMA                          LPN040M040UIT94  B1.00"
+
 _COOKE_METADATA = bytes(map(lambda i: int(i, 16), "64/40/40/46/68/48/70/B8/80/40/40/40/42/66/6D/40/40/46/5E/40/40/46/73/45/4E/41/7F/40/40/53/47/35/33/35/39/39/37/36/34/0A/0D".split("/")))
 
 class CookeDataTest(unittest.TestCase):
@@ -23,3 +30,51 @@ def test__position(self):
     c = camdkit.red.cooke.lens_data_from_binary_string(_COOKE_METADATA)
 
     self.assertEqual(c.aperture_value, 560)
+
+  def test_lens_data_columns(self):
+    data = camdkit.red.cooke.lens_data_array(_COOKE_METADATA_HEX)
+
+    self.assertEqual(data.shape, (2, 41))
+
+    self.assertEqual(bytes(data[0]), _COOKE_METADATA)
+
+    c = camdkit.red.cooke.lens_data_from_array(data)
+
+    self.assertEqual(c.entrance_pupil_position.tolist(), [127, -126])
+
+    self.assertEqual(c.aperture_value.tolist(), [560, 560])
+
+    self.assertEqual(c.focus_distance.tolist(), [424, 436])
+
+    self.assertEqual(c.hyperfocal_distance[0], 10669)
+
+    self.assertEqual((c.near_depth_of_field[0], c.far_depth_of_field[0]), (414, 435))
+
+    self.assertEqual(c.horizontal_field_of_view[0], 334)
+
+  def test_fixed_data(self):
+    c = camdkit.red.cooke.fixed_data_from_string(_COOKE_STATIC)
+
+    self.assertEqual(c.firmware_version_number, "1.00")
+
+    self.assertEqual((c.minimum_focal_length, c.maximum_focal_length), (40, 40))
+
+  def test_lens_data_of_different_lengths(self):
+    with self.assertRaises(ValueError):
+      camdkit.red.cooke.lens_data_array(["64/40", "64/40/40"])
+
+    c = camdkit.red.cooke.lens_data_columns([_COOKE_METADATA_HEX[0], "", _COOKE_METADATA_HEX[1] + "/00",
+                                             _COOKE_METADATA_HEX[0][:20], "64/4"])
+
+    self.assertEqual(c.decoded.tolist(), [True, False, True, False, False])
+
+    self.assertEqual(c.aperture_value.tolist(), [560, 0, 560, 0, 0])
+
+    self.assertEqual(c.entrance_pupil_position.tolist(), [127, 0, -126, 0, 0])
+
+  def test_no_lens_data(self):
+    self.assertEqual(camdkit.red.cooke.lens_data_array([]).shape, (0, 0))
+
+    c = camdkit.red.cooke.lens_data_columns([])
+
+    self.assertEqual((c.decoded.size, c.focus_distance.size), (0, 0))
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""Tests for the OpenLensIO distortion model"""
+
+import unittest
+
+import numpy as np
+
+from camdkit.distortion import (BROWN_CONRADY_U_D,
+                                brown_conrady, inverse_brown_conrady,
+                                undistort_points, distort_points)
+from camdkit.lens_types import Distortion, DistortionOffset, ProjectionOffset
+
+
+class DistortionTestCases(unittest.TestCase):
+
+    def test_identity_without_coefficients(self):
+        x = np.array([-10.0, 0.0, 12.5])
+        y = np.array([3.0, 0.0, -7.25])
+        ux, uy = brown_conrady(x, y, (0.0,))
+        np.testing.assert_array_equal(ux, x)
+        np.testing.assert_array_equal(uy, y)
+
+    def test_radial_coefficients_alternate_numerator_and_denominator(self):
+        # r = 2: R = (1 + k1 r^2) / (1 + k2 r^2)
+        ux, uy = brown_conrady(np.array([2.0]), np.array([0.0]), (0.1, 0.05))
+        self.assertAlmostEqual(ux[0], 2.0 * 1.4 / 1.2)
+        self.assertEqual(uy[0], 0.0)
+
+    def test_tangential_coefficients(self):
+        ux, uy = brown_conrady(np.array([1.0]), np.array([2.0]), (0.0,), (0.01, 0.02))
+        self.assertAlmostEqual(ux[0], 1.0 + 2 * 0.01 * 2.0 + 0.02 * (5.0 + 2.0))
+        self.assertAlmostEqual(uy[0], 2.0 + 2 * 0.02 * 2.0 + 0.01 * (5.0 + 8.0))
+
+    def test_inverse_round_trip(self):
+        x, y = np.meshgrid(np.linspace(-18.0, 18.0, 7), np.linspace(-12.0, 12.0, 5))
+        radial, tangential = (-2e-4, 1e-5, 3e-8), (1e-5, -2e-5)
+        dx, dy = inverse_brown_conrady(x, y, radial, tangential)
+        ux, uy = brown_conrady(dx, dy, radial, tangential)
+        np.testing.assert_allclose(ux, x, atol=1e-7)
+        np.testing.assert_allclose(uy, y, atol=1e-7)
+
+    def test_offsets_and_model_direction(self):
+        d_u = Distortion(radial=(1e-4,))
+        u_d = Distortion(model=BROWN_CONRADY_U_D, radial=(1e-4,))
+        centre_offset = DistortionOffset(0.5, -0.25)
+        projection_offset = ProjectionOffset(0.1, 0.2)
+        # the centre of distortion is a fixed point
+        ux, uy = undistort_points(np.array([0.6]), np.array([-0.05]),
+                                  d_u, centre_offset, projection_offset)
+        self.assertAlmostEqual(ux[0], 0.6)
+        self.assertAlmostEqual(uy[0], -0.05)
+        x, y = np.array([10.0]), np.array([-5.0])
+        ux, uy = undistort_points(x, y, d_u, centre_offset, projection_offset)
+        dx, dy = distort_points(ux, uy, d_u, centre_offset, projection_offset)
+        np.testing.assert_allclose((dx, dy), (x, y), atol=1e-7)
+        # U-D coefficients describe the inverse mapping
+        np.testing.assert_allclose(distort_points(x, y, u_d), undistort_points(x, y, d_u))
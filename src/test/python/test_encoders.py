@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""Tests for raw to normalized encoder conversion"""
+
+import unittest
+
+import numpy as np
+
+from camdkit.clip import Clip
+from camdkit.encoders import EncoderRange, FizCalibration
+from camdkit.lens_types import FizEncoders, RawFizEncoders
+
+
+class EncoderConversionTestCases(unittest.TestCase):
+
+    def test_encoder_range(self):
+        focus = EncoderRange.from_homing(1000, 5000, reversed=True)
+        self.assertEqual((focus.zero, focus.one), (5000, 1000))
+        raw = np.array([5000, 3000, 1000, 0, 2**32 - 1], dtype=np.uint32)
+        np.testing.assert_allclose(focus.normalize(raw), [0.0, 0.5, 1.0, 1.0, 0.0])
+        np.testing.assert_array_equal(focus.denormalize([0.0, 0.5, 1.0]), [5000, 3000, 1000])
+        self.assertEqual(focus.denormalize([0.25]).dtype, np.uint32)
+        with self.assertRaises(ValueError):
+            EncoderRange(10, 10)
+        with self.assertRaises(ValueError):
+            EncoderRange(-1, 10)
+
+    def test_normalize_columns(self):
+        calibration = FizCalibration(zoom=EncoderRange(0, 4096))
+        normalized = calibration.normalize(zoom=np.array([0, 1024, 4096], dtype=np.uint32))
+        self.assertEqual(list(normalized), ['zoom'])
+        np.testing.assert_allclose(normalized['zoom'], [0.0, 0.25, 1.0])
+        with self.assertRaises(ValueError):
+            calibration.normalize(focus=np.array([1], dtype=np.uint32))
+
+    def test_apply_to_clip(self):
+        calibration = FizCalibration(focus=EncoderRange(100, 200), zoom=EncoderRange(0, 4096))
+        clip = Clip()
+        calibration.apply(clip, focus=[100, 150], zoom=[2048, 4096])
+        self.assertEqual(clip.lens_raw_encoders, (RawFizEncoders(focus=100, zoom=2048),
+                                                  RawFizEncoders(focus=150, zoom=4096)))
+        self.assertEqual(clip.lens_encoders, (FizEncoders(focus=0.0, zoom=0.5),
+                                              FizEncoders(focus=0.5, zoom=1.0)))
+        self.assertEqual(clip.to_json(1)["lens"]["encoders"][0], {"focus": 0.5, "zoom": 1.0})
+
+        clip = Clip()
+        clip.lens_raw_encoders = (RawFizEncoders(focus=200), RawFizEncoders(focus=125))
+        calibration.apply(clip)
+        self.assertEqual(clip.lens_encoders, (FizEncoders(focus=1.0), FizEncoders(focus=0.25)))
+        with self.assertRaises(ValueError):
+            calibration.apply(Clip())
+
+
+if __name__ == '__main__':
+    unittest.main()
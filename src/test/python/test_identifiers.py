@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+import re
+import threading
+import unittest
+import uuid
+
+from camdkit.clip import Clip
+from camdkit.identifiers import (SampleIdGenerator, new_sample_id, new_sample_ids,
+                                 clip_with_trusted_sample_ids, uuid_urns)
+from camdkit.string_types import UUID_URN_PATTERN
+
+
+class IdentifiersTestCases(unittest.TestCase):
+
+    def test_uuid_urns(self):
+        urns = uuid_urns(500)
+        self.assertEqual(len(set(urns)), 500)
+        for urn in urns:
+            self.assertRegex(urn, UUID_URN_PATTERN)
+            parsed = uuid.UUID(urn)
+            self.assertEqual(parsed.version, 4)
+            self.assertEqual(parsed.variant, uuid.RFC_4122)
+            self.assertEqual(parsed.urn, urn)
+        self.assertEqual(uuid_urns(0), [])
+        with self.assertRaises(ValueError):
+            uuid_urns(-1)
+
+    def test_uuid_urns_from_bytes(self):
+        self.assertEqual(uuid_urns(1, lambda n: bytes(range(n))),
+                         [uuid.UUID(bytes=bytes(range(16)), version=4).urn])
+        self.assertEqual(uuid_urns(2, lambda n: b"\xff" * n),
+                         ["urn:uuid:ffffffff-ffff-4fff-bfff-ffffffffffff"] * 2)
+
+    def test_generator_batches(self):
+        requested = []
+
+        def random_bytes(n: int) -> bytes:
+            requested.append(n)
+            return bytes(n)
+
+        generator = SampleIdGenerator(batch_size=4, random_bytes=random_bytes)
+        for _ in range(9):
+            generator()
+        self.assertEqual(requested, [64, 64, 64])
+        generator.discard()
+        generator()
+        self.assertEqual(len(requested), 4)
+        self.assertEqual(len(generator.take(3)), 3)
+        self.assertEqual(len(generator.take(10)), 10)
+        self.assertEqual(requested[-1], 160)
+        with self.assertRaises(ValueError):
+            SampleIdGenerator(batch_size=0)
+
+    def test_generator_threads(self):
+        generator = SampleIdGenerator(batch_size=16)
+        results: list[list[str]] = [[] for _ in range(4)]
+
+        def draw(result: list[str]) -> None:
+            for _ in range(1000):
+                result.append(generator())
+
+        threads = [threading.Thread(target=draw, args=(result,)) for result in results]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(urn for result in results for urn in result)), 4000)
+
+    def test_shared_generator(self):
+        self.assertRegex(new_sample_id(), UUID_URN_PATTERN)
+        urns = new_sample_ids(3000)
+        self.assertEqual(len(set(urns)), 3000)
+        self.assertTrue(all(re.match(UUID_URN_PATTERN, urn) for urn in urns))
+
+    def test_clip_with_trusted_sample_ids(self):
+        sample_ids = tuple(new_sample_ids(2))
+        clip = clip_with_trusted_sample_ids(sample_ids)
+        self.assertEqual(clip.sample_id, sample_ids)
+        self.assertEqual(clip.to_json()["sampleId"], sample_ids)
+        validated = Clip()
+        validated.sample_id = sample_ids
+        self.assertEqual(clip.to_json(), validated.to_json())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""Tests for batch ingest"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import cbor2
+
+import camdkit.bmd.reader
+from camdkit.ingest import MANIFEST_NAME, main
+
+RESOURCES = "src/test/resources"
+
+
+class IngestTestCases(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.shoot = os.path.join(self.directory.name, "shoot")
+        self.output = os.path.join(self.directory.name, "out")
+        os.makedirs(os.path.join(self.shoot, "day1", "red"))
+        shutil.copy(os.path.join(RESOURCES, "bmd/metadata.txt"), os.path.join(self.shoot, "day1"))
+        for name in ("A001_C066_0303LZ_001.static.csv", "A001_C066_0303LZ_001.frames.csv"):
+            shutil.copy(os.path.join(RESOURCES, "red", name), os.path.join(self.shoot, "day1", "red"))
+        shutil.copy(os.path.join(RESOURCES, "red/README.txt"), self.shoot)
+        # an ARRI file with an unsupported distance unit fails to convert
+        with open(os.path.join(self.shoot, "feet.csv"), "w", encoding="utf-8") as fp:
+            fp.write("Lens Distance Unit\tCamera Family\nFoot\tALEXALF\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_main(self, *args) -> tuple[int, str]:
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            status = main([self.shoot, "-o", self.output, "-j", "2", *args])
+        return status, stderr.getvalue()
+
+    def test_ingest_and_rerun(self):
+        status, report = self.run_main()
+        self.assertEqual(status, 1)
+        self.assertIn("2 converted, 0 unchanged, 1 failed", report)
+        self.assertIn("feet.csv", report)
+        with open(os.path.join(self.output, "day1", "metadata.txt.json"), encoding="utf-8") as fp:
+            with open(os.path.join(RESOURCES, "bmd/metadata.txt"), encoding="utf-8") as metadata:
+                self.assertEqual(json.load(fp), json.loads(json.dumps(camdkit.bmd.reader.to_clip(metadata).to_json())))
+        self.assertTrue(os.path.exists(os.path.join(self.output, "day1", "red", "A001_C066_0303LZ_001.json")))
+        self.assertTrue(os.path.exists(os.path.join(self.output, MANIFEST_NAME)))
+
+        os.remove(os.path.join(self.shoot, "feet.csv"))
+        status, report = self.run_main()
+        self.assertEqual(status, 0)
+        self.assertIn("0 converted, 2 unchanged, 0 failed", report)
+
+        # touching a file without changing it does not trigger conversion, editing it does
+        metadata = os.path.join(self.shoot, "day1", "metadata.txt")
+        os.utime(metadata, ns=(0, 0))
+        self.assertIn("0 converted, 2 unchanged", self.run_main()[1])
+        with open(metadata, "a", encoding="utf-8") as fp:
+            fp.write("\n")
+        self.assertIn("1 converted, 1 unchanged", self.run_main()[1])
+
+    def test_take_and_file_failures(self):
+        venice = os.path.join(self.shoot, "venice")
+        os.makedirs(venice)
+        for name in ("D001C005_210716AG.csv", "D001C005_210716AGM01.xml"):
+            shutil.copy(os.path.join(RESOURCES, "venice", name), venice)
+        shutil.copy(os.path.join(RESOURCES, "venice/D001C005_210716AGM01.xml"),
+                    os.path.join(venice, "D001C005_210716AGM02.xml"))
+        os.symlink(os.path.join(self.directory.name, "missing.csv"), os.path.join(self.shoot, "missing.csv"))
+        status, report = self.run_main()
+        self.assertEqual(status, 1)
+        self.assertIn("2 converted, 0 unchanged, 5 failed", report)
+        self.assertIn("both claim to be the static file of venice take", report)
+        with open(os.path.join(self.output, MANIFEST_NAME), encoding="utf-8") as fp:
+            failures = json.load(fp)["failures"]
+        self.assertEqual(sorted(os.path.basename(path) for path in failures),
+                         ["D001C005_210716AG.csv", "D001C005_210716AGM01.xml", "D001C005_210716AGM02.xml",
+                          "feet.csv.json", "missing.csv"])
+        self.assertTrue(os.path.exists(os.path.join(self.output, "day1", "metadata.txt.json")))
+
+        os.remove(os.path.join(venice, "D001C005_210716AGM02.xml"))
+        os.remove(os.path.join(self.shoot, "missing.csv"))
+        os.remove(os.path.join(self.shoot, "feet.csv"))
+        status, report = self.run_main()
+        self.assertEqual(status, 0)
+        self.assertIn("1 converted, 2 unchanged, 0 failed", report)
+        with open(os.path.join(self.output, MANIFEST_NAME), encoding="utf-8") as fp:
+            self.assertEqual(json.load(fp)["failures"], {})
+
+    def test_colliding_outputs(self):
+        other = os.path.join(self.directory.name, "other")
+        os.makedirs(os.path.join(other, "day1"))
+        shutil.copy(os.path.join(RESOURCES, "bmd/metadata.txt"), os.path.join(other, "day1"))
+        os.remove(os.path.join(self.shoot, "feet.csv"))
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            status = main([self.shoot, other, "-o", self.output])
+        report = stderr.getvalue()
+        self.assertEqual(status, 1)
+        self.assertIn("1 converted, 0 unchanged, 2 failed", report)
+        self.assertIn("2 takes would be written to", report)
+        self.assertFalse(os.path.exists(os.path.join(self.output, "day1", "metadata.txt.json")))
+        with open(os.path.join(self.output, MANIFEST_NAME), encoding="utf-8") as fp:
+            failures = json.load(fp)["failures"]
+        self.assertEqual(sorted(failures), sorted([os.path.join(self.shoot, "day1", "metadata.txt"),
+                                                   os.path.join(other, "day1", "metadata.txt")]))
+
+        # single files are written by name, so files of the same name collide too
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            status = main([os.path.join(self.shoot, "day1", "metadata.txt"),
+                           os.path.join(other, "day1", "metadata.txt"), "-o", self.output])
+        self.assertEqual(status, 1)
+        self.assertIn("0 converted, 0 unchanged, 2 failed", stderr.getvalue())
+
+    def test_cbor_output(self):
+        os.remove(os.path.join(self.shoot, "feet.csv"))
+        status, _ = self.run_main("--format", "cbor", "--quiet")
+        self.assertEqual(status, 0)
+        with open(os.path.join(self.output, "day1", "metadata.txt.cbor"), "rb") as fp:
+            self.assertEqual(cbor2.load(fp)["static"]["camera"]["make"], "Blackmagic Design")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""Tests for lens calibration tables"""
+
+import unittest
+
+import numpy as np
+
+from camdkit.clip import Clip
+from camdkit.lens_calibration import InterpolationMethod, LensCalibration
+from camdkit.lens_types import FizEncoders
+
+FOCUS = np.array([0.0, 0.2, 0.5, 0.7, 1.0])
+ZOOM = np.array([0.0, 0.3, 0.6, 1.0])
+
+
+def bilinear(f, z):
+    return 24.0 + 10.0 * f + 80.0 * z + 5.0 * f * z
+
+
+def bicubic(f, z):
+    return 1.0 + f ** 3 - 2.0 * z ** 3 + f * z ** 2
+
+
+class LensCalibrationTestCases(unittest.TestCase):
+
+    def setUp(self):
+        f, z = np.meshgrid(FOCUS, ZOOM, indexing='ij')
+        self.calibration = LensCalibration.from_grid(
+            FOCUS, ZOOM,
+            pinhole_focal_length=bilinear(f, z),
+            radial=np.stack((bicubic(f, z) * 1e-4, np.full(f.shape, 1e-7)), axis=-1))
+        self.rng = np.random.default_rng(7)
+
+    def test_linear_reproduces_bilinear_functions(self):
+        f, z = self.rng.random(100), self.rng.random(100)
+        values = self.calibration.evaluate(f, z)
+        self.assertEqual(values['pinhole_focal_length'].shape, (100,))
+        np.testing.assert_allclose(values['pinhole_focal_length'], bilinear(f, z))
+        np.testing.assert_allclose(values['radial'][:, 1], 1e-7)
+
+    def test_cubic_reproduces_cubic_functions(self):
+        f, z = self.rng.random(100), self.rng.random(100)
+        weights = self.calibration.weights(f, z, InterpolationMethod.CUBIC)
+        self.assertEqual(weights.indices.shape, (100, 16))
+        np.testing.assert_allclose(weights.weights.sum(axis=1), 1.0)
+        values = self.calibration.interpolate(weights)
+        np.testing.assert_allclose(values['radial'][:, 0], bicubic(f, z) * 1e-4)
+
+    def test_values_outside_the_calibration_are_clamped(self):
+        values = self.calibration.evaluate([-0.5, 1.5], [1.5, -0.5])
+        np.testing.assert_allclose(values['pinhole_focal_length'],
+                                   [bilinear(0.0, 1.0), bilinear(1.0, 0.0)])
+
+    def test_scattered_rows(self):
+        # every zoom position sweeps its own focus positions
+        focus = np.array([0.0, 1.0, 0.0, 0.4, 1.0])
+        zoom = np.array([0.0, 0.0, 1.0, 1.0, 1.0])
+        calibration = LensCalibration(focus, zoom,
+                                      focus_distance=np.array([100.0, 1.0, 100.0, 2.0, 1.0]))
+        values = calibration.evaluate([0.2, 0.2], [0.0, 1.0])
+        # focus distance is interpolated in diopters
+        np.testing.assert_allclose(values['focus_distance'],
+                                   [1.0 / (0.8 * 0.01 + 0.2 * 1.0), 1.0 / (0.5 * 0.01 + 0.5 * 0.5)])
+        with self.assertRaises(ValueError):
+            LensCalibration([0.0, 0.0], [0.5, 0.5], focus_distance=[1.0, 2.0])
+        with self.assertRaises(ValueError):
+            LensCalibration([0.0], [0.5])
+
+    def test_apply_to_clip(self):
+        clip = Clip()
+        clip.lens_encoders = (FizEncoders(focus=0.1, zoom=0.2), FizEncoders(focus=0.9, zoom=0.8))
+        self.calibration.apply(clip)
+        self.assertEqual(len(clip.lens_pinhole_focal_length), 2)
+        self.assertAlmostEqual(clip.lens_pinhole_focal_length[0], bilinear(0.1, 0.2))
+        self.assertEqual(len(clip.lens_distortions[1][0].radial), 2)
+        self.assertIsNone(clip.lens_distortions[1][0].tangential)
+        clip.lens_encoders = (FizEncoders(iris=0.5),)
+        with self.assertRaises(ValueError):
+            self.calibration.apply(clip)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""Tests for memory-mapped file access"""
+
+import csv
+import os
+import tempfile
+import unittest
+
+from camdkit.mapped_io import iter_lines, map_file, open_lines
+
+
+class MappedIOTestCases(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name: str, content: bytes) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, "wb") as fp:
+            fp.write(content)
+        return path
+
+    def test_map_file(self):
+        path = self.write("data.bin", bytes(range(256)))
+        with map_file(path) as view:
+            self.assertEqual(len(view), 256)
+            self.assertEqual(view[0xF4], 0xF4)
+            self.assertEqual(bytes(view[10:13]), b"\x0a\x0b\x0c")
+        with map_file(self.write("empty.bin", b"")) as view:
+            self.assertEqual(len(view), 0)
+
+    def test_iter_lines_matches_text_mode(self):
+        content = "\ufeffα,β\r\nline two\rthree\n\r\nlast ünïcödé line without newline".encode("utf-8")
+        path = self.write("text.csv", content)
+        with open(path, "r", encoding="utf-8-sig") as fp:
+            expected = list(fp)
+        for chunk_bytes in (1, 2, 3, 7, 1 << 20):
+            self.assertEqual(list(iter_lines(content, chunk_bytes=chunk_bytes)), expected, chunk_bytes)
+        self.assertEqual(list(iter_lines(b"a\rb\r", chunk_bytes=1)), ["a\n", "b\n"])
+
+    def test_open_lines_feeds_csv(self):
+        path = self.write("table.csv", b'a,b\n1,"x\ny"\n2,z\n')
+        with open_lines(path, chunk_bytes=4) as lines:
+            rows = list(csv.reader(lines))
+        self.assertEqual(rows, [["a", "b"], ["1", "x\ny"], ["2", "z"]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+'''Mo-Sys F4 to OpenTrackIO bridge tests'''
+
+import socket
+import sys
+import unittest
+
+from camdkit.mosys.bridge import F4Bridge, LatencyHistogram, open_receiver
+from camdkit.mosys.f4 import F4
+from camdkit.transport import PayloadFormat, Reassembler, decode_payload
+
+F4_FILE = "src/test/resources/mosys/A003_C001_01 15-03-47-01.f4"
+
+def _zero_focus_distance(packet: bytes) -> bytes:
+  # the same packet with an inverse focus distance of 0
+  data = bytearray(packet)
+  for block in range(4, len(data) - 1, 5):
+    if data[block] == F4.FIELD_ID_FOCAL_DISTANCE:
+      data[block + 1:block + 5] = bytes(4)
+  data[-1] = (0x40 - sum(data[:-1])) % 256
+  return bytes(data)
+
+class LatencyHistogramTest(unittest.TestCase):
+
+  def test_percentiles(self):
+    histogram = LatencyHistogram(bin_width=1000, bins=10)
+    for duration in [500] * 90 + [5500] * 9 + [50_000]:
+      histogram.record(duration)
+    self.assertEqual(histogram.count, 100)
+    self.assertEqual(histogram.percentile(50), 1000)
+    self.assertEqual(histogram.percentile(95), 6000)
+    self.assertEqual(histogram.percentile(100), 50_000)
+    self.assertEqual(histogram.maximum, 50_000)
+    self.assertEqual(histogram.mean(), (90 * 500 + 9 * 5500 + 50_000) / 100)
+    histogram.reset()
+    self.assertEqual(histogram.percentile(50), 0)
+
+class F4BridgeTest(unittest.TestCase):
+
+  def test_bridge(self):
+    with open(F4_FILE, "rb") as fp:
+      packets = [fp.read(105) for _ in range(10)]
+    receiver = open_receiver("127.0.0.1", 0)
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    sink.settimeout(5.0)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+      receiver.settimeout(5.0)
+      bridge = F4Bridge(receiver, sender, sink.getsockname(), PayloadFormat.CBOR, source_number=7,
+                        max_payload_size=300)
+      for packet in packets:
+        sender.sendto(packet, receiver.getsockname())
+        self.assertEqual(bridge.serve_once(), 1)
+      reassembler = Reassembler()
+      samples = []
+      while len(samples) < len(packets):
+        result = reassembler.feed(sink.recv(2048))
+        if result is not None:
+          samples.append(decode_payload(result[1], result[0]))
+    finally:
+      for s in (receiver, sink, sender):
+        s.close()
+    self.assertEqual(reassembler.errors, 0)
+    self.assertEqual(bridge.samples_sent, 10)
+    self.assertEqual({sample["sourceNumber"] for sample in samples}, {7})
+    self.assertEqual(len({sample["sourceId"] for sample in samples}), 1)
+    self.assertEqual(len({sample["sampleId"] for sample in samples}), 10)
+    self.assertEqual([sample["timing"]["sequenceNumber"] for sample in samples],
+                     [packet[3] % 16 for packet in packets])
+    self.assertEqual(samples[0]["protocol"]["name"], "OpenTrackIO")
+    for stage in ("receive", "decode", "encode", "send") if sys.platform.startswith("linux") else ("decode", "encode", "send"):
+      self.assertEqual(bridge.histograms[stage].count, 10)
+
+  def test_undecodable_packet(self):
+    with open(F4_FILE, "rb") as fp:
+      packets = [fp.read(105) for _ in range(2)]
+    receiver = open_receiver("127.0.0.1", 0)
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    sink.settimeout(5.0)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+      bridge = F4Bridge(receiver, sender, sink.getsockname(), PayloadFormat.JSON)
+      self.assertEqual(bridge.handle(packets[0] + _zero_focus_distance(packets[1])), 1)
+      self.assertEqual(bridge.handle(_zero_focus_distance(packets[0])), 0)
+      self.assertEqual(bridge.handle(packets[1]), 1)
+      reassembler = Reassembler()
+      samples = []
+      while len(samples) < 2:
+        result = reassembler.feed(sink.recv(2048))
+        if result is not None:
+          samples.append(decode_payload(result[1], result[0]))
+    finally:
+      for s in (receiver, sink, sender):
+        s.close()
+    self.assertEqual(bridge.decode_errors, 2)
+    self.assertEqual(bridge.samples_sent, 2)
+    self.assertEqual([sample["timing"]["sequenceNumber"] for sample in samples],
+                     [packets[0][3] % 16, packets[1][3] % 16])
+
+
+if __name__ == '__main__':
+  unittest.main()
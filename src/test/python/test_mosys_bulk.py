@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+'''Mo-Sys bulk F4 decoder tests'''
+
+import struct
+import tempfile
+import unittest
+
+from camdkit.mosys import bulk, reader
+
+F4_FILE = "src/test/resources/mosys/A003_C001_01 15-03-47-01.f4"
+
+def _packet(status: int, *axes: tuple[int, int, int, int, int]) -> bytes:
+  body = bytes([0xf4, 0x01, len(axes), status]) + b"".join(bytes(axis) for axis in axes)
+  return body + bytes([(0x40 - sum(body)) % 256])
+
+_TIMECODE = (0xf8, 0x20, 0x3c, 0x32, 0xca)
+_FOCUS = (0x03, 0x00, 0x00, 0x80, 0x00)
+_PAN = (0x01, 0x00, 0xff, 0xfc, 0x18)
+_APERTURE = (0x60, 0x40, 0x60, 0x00, 0x00)
+
+def _lens_param(axis_id: int, value: float) -> tuple[int, ...]:
+  return (axis_id, *struct.pack(">f", value))
+
+class MoSysBulkTest(unittest.TestCase):
+
+  def test_matches_reader(self):
+    expected = reader.to_clip(F4_FILE, 20).to_json()
+    clip = bulk.to_clip(F4_FILE, 20)
+    self.assertEqual(len(clip.sample_id), 20)
+    self.assertEqual(len(set(clip.source_id)), 1)
+    self.assertEqual(len(set(clip.sample_id)), 20)
+    actual = clip.to_json()
+    for key in ("sampleId", "sourceId"):
+      del expected[key], actual[key]
+    self.assertEqual(actual, expected)
+
+  def test_runs(self):
+    first = _packet(0x11, _TIMECODE, _FOCUS, _PAN)
+    second = _packet(0x12, _TIMECODE, _FOCUS, _PAN)
+    other = _packet(0x13, _TIMECODE, _FOCUS, _APERTURE)
+    corrupted = bytearray(second)
+    corrupted[6] ^= 0x01
+    data = first + second + first + bytes(corrupted) + other + other + b"\x00" + first
+    runs = list(bulk.find_runs(data))
+    self.assertEqual([(run.offset, run.count, run.axis_ids) for run in runs],
+                     [(0, 3, (0xf8, 0x03, 0x01)),
+                      (4 * len(first), 2, (0xf8, 0x03, 0x60)),
+                      (4 * len(first) + 2 * len(other) + 1, 1, (0xf8, 0x03, 0x01))])
+
+  def test_decode(self):
+    clip = bulk.decode(_packet(0x31, _TIMECODE, _FOCUS, _PAN) * 3, source_id="urn:uuid:5ca5f233-11b7-4f5a-9a5f-4d8b3c1f9a10")
+    self.assertEqual(clip.source_id, ("urn:uuid:5ca5f233-11b7-4f5a-9a5f-4d8b3c1f9a10",) * 3)
+    self.assertEqual(clip.timing_sequence_number, (1, 1, 1))
+    self.assertEqual(clip.tracker_recording, (True,) * 3)
+    self.assertEqual(clip.timing_synchronization[0].locked, True)
+    self.assertEqual(clip.transforms[0][0].rotation.pan, -1.0)
+    self.assertEqual(clip.lens_encoders[2].focus, 0.5)
+    timecode = clip.timing_timecode[0]
+    self.assertEqual((timecode.hours, timecode.minutes, timecode.seconds, timecode.frames), (15, 3, 11, 10))
+    self.assertEqual(clip.timing_sample_rate[0], 25)
+    self.assertEqual(bulk.decode(_packet(0x31, _TIMECODE, _FOCUS, _PAN) * 3, 2).timing_mode,
+                     ("internal",) * 2)
+
+  def test_matches_packet_parser(self):
+    data = (_packet(0x11, _TIMECODE, _lens_param(0x53, 40.0))
+            + _packet(0x12, _TIMECODE, _lens_param(0x53, 0.0))
+            + _packet(0x13, _TIMECODE, _lens_param(0x53, 50.0)))
+    clip = bulk.decode(data)
+    self.assertEqual(len(clip.lens_pinhole_focal_length), 2)
+    with tempfile.NamedTemporaryFile(suffix=".f4") as f4_file:
+      f4_file.write(data)
+      f4_file.flush()
+      expected = reader.to_clip(f4_file.name)
+    self.assertEqual(clip.lens_pinhole_focal_length, expected.lens_pinhole_focal_length)
+    self.assertIsNone(bulk.decode(_packet(0x11, _TIMECODE, _lens_param(0x53, 0.0))).lens_pinhole_focal_length)
+
+  def test_zero_inverse_focus_distance(self):
+    data = _packet(0x11, _TIMECODE, _lens_param(0x57, 0.5)) + _packet(0x12, _TIMECODE, _lens_param(0x57, 0.0))
+    self.assertEqual(bulk.decode(data, 1).lens_focus_distance, (2.0,))
+    with self.assertRaises(ValueError):
+      bulk.decode(data)
+
+  def test_layout_change_must_keep_parameters(self):
+    data = _packet(0x11, _TIMECODE, _FOCUS, _PAN) + _packet(0x11, _TIMECODE, _FOCUS, _APERTURE)
+    with self.assertRaises(ValueError):
+      bulk.decode(data)
+    self.assertEqual(len(bulk.decode(data, 1).sample_id), 1)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+'''Mo-Sys F4 encoder tests'''
+
+import io
+import socket
+import unittest
+
+import numpy as np
+
+from camdkit.mosys import bulk, encoder, reader
+from camdkit.mosys.f4 import F4PacketParser, F4StreamDecoder
+
+F4_FILE = "src/test/resources/mosys/A003_C001_01 15-03-47-01.f4"
+
+class MoSysEncoderTest(unittest.TestCase):
+
+  def test_synthetic_round_trip(self):
+    columns = encoder.synthetic_columns(500, seed=1, start_timecode=(23, 59, 59, 20))
+    packets = encoder.encode_packets(columns, camera_id=np.arange(500) % 3, recording=True)
+    self.assertEqual(packets.shape, (500, 5 + 5 * 19))
+    decoder = F4StreamDecoder(packets.tobytes())
+    self.assertEqual(len(list(decoder)), 500)
+    self.assertEqual(decoder.checksum_errors, 0)
+
+    clip = bulk.decode(packets.tobytes())
+    translations = np.array([(t[0].translation.x, t[0].translation.y, t[0].translation.z)
+                             for t in clip.transforms])
+    np.testing.assert_allclose(translations, np.stack((columns["x"], columns["y"], columns["z"]), axis=1),
+                               atol=0.0005)
+    np.testing.assert_allclose([t[0].rotation.pan for t in clip.transforms], columns["pan"], atol=0.0005)
+    np.testing.assert_allclose([e.zoom for e in clip.lens_encoders], columns["zoom"], atol=1 / 65536)
+    np.testing.assert_allclose(clip.lens_pinhole_focal_length, columns["pinhole_focal_length"], rtol=1e-5)
+    np.testing.assert_allclose(clip.lens_focus_distance, columns["focus_distance"], rtol=1e-6)
+    np.testing.assert_allclose([float(v) for v in clip.lens_entrance_pupil_offset],
+                               columns["entrance_pupil_offset"], rtol=1e-6)
+    self.assertEqual([t[0].id for t in clip.transforms[:4]], ["Camera 0", "Camera 1", "Camera 2", "Camera 0"])
+    self.assertEqual(clip.timing_sequence_number[:3], (0, 1, 2))
+    self.assertEqual(clip.tracker_status[0], "Optical Good")
+    self.assertTrue(all(clip.tracker_recording))
+    timecode = clip.timing_timecode[5]
+    self.assertEqual((timecode.hours, timecode.minutes, timecode.seconds, timecode.frames), (0, 0, 0, 0))
+
+  def test_timecodes(self):
+    np.testing.assert_array_equal(encoder.timecodes((1, 59, 59, 23), 3, 24),
+                                  [(1, 59, 59, 23), (2, 0, 0, 0), (2, 0, 0, 1)])
+
+  def test_encode_clip(self):
+    original = reader.to_clip(F4_FILE, 20)
+    packets = encoder.encode_clip(original)
+    parser = F4PacketParser()
+    for i, packet in enumerate(packets):
+      self.assertTrue(parser.initialise(packet.tobytes()))
+      frame = parser.get_tracking_frame()
+      self.assertEqual(frame.transforms[0][0], original.transforms[i][0])
+      self.assertEqual(frame.lens_encoders[0], original.lens_encoders[i])
+      self.assertEqual(frame.lens_distortions[0], original.lens_distortions[i])
+      self.assertEqual(frame.lens_projection_offset[0], original.lens_projection_offset[i])
+      self.assertEqual(frame.timing_timecode[0], original.timing_timecode[i])
+      self.assertEqual(frame.timing_synchronization[0], original.timing_synchronization[i])
+      self.assertEqual(frame.timing_sequence_number[0], original.timing_sequence_number[i])
+      self.assertEqual(frame.tracker_status[0], original.tracker_status[i])
+      self.assertAlmostEqual(float(frame.lens_entrance_pupil_offset[0]),
+                             float(original.lens_entrance_pupil_offset[i]), places=4)
+      self.assertAlmostEqual(frame.lens_focus_distance[0], original.lens_focus_distance[i], places=5)
+      self.assertAlmostEqual(frame.lens_pinhole_focal_length[0], original.lens_pinhole_focal_length[i], places=3)
+
+  def test_invalid_columns(self):
+    with self.assertRaises(ValueError):
+      encoder.encode_packets({"pan": [9000.0]})
+    with self.assertRaises(ValueError):
+      encoder.encode_packets({"focus": [1.5]})
+    with self.assertRaises(ValueError):
+      encoder.encode_packets({"pan": [0.0, 1.0], "tilt": [0.0]})
+    with self.assertRaises(ValueError):
+      encoder.encode_packets({"heading": [0.0]})
+
+  def test_packets_without_encoders(self):
+    packets = encoder.encode_packets({"pan": [1.0, 2.0]})
+    self.assertIsNone(bulk.decode(packets.tobytes()).lens_encoders)
+    parser = F4PacketParser()
+    self.assertTrue(parser.initialise(packets[0].tobytes()))
+    self.assertIsNone(parser.get_tracking_frame().lens_encoders)
+
+  def test_write_packets(self):
+    chunks = [encoder.encode_packets({"pan": np.full(100, float(i)), "focus": np.zeros(100)})
+              for i in range(3)]
+    fp = io.BytesIO()
+    self.assertEqual(encoder.write_packets(fp, iter(chunks)), 300)
+    clip = bulk.decode(fp.getvalue())
+    self.assertEqual([t[0].rotation.pan for t in clip.transforms[99:101]], [0.0, 1.0])
+
+  def test_send_paced(self):
+    packets = encoder.encode_packets({"pan": np.arange(6, dtype=float)})
+    self.assertEqual(packets.shape, (6, 10))
+    now = [0.0]
+    sleeps = []
+
+    def sleep(duration: float) -> None:
+      sleeps.append(duration)
+      now[0] += duration
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sink, \
+        socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+      sink.bind(("127.0.0.1", 0))
+      sink.settimeout(5.0)
+      lateness = encoder.send_paced(sender, sink.getsockname(), packets, 100.0, packets_per_datagram=2,
+                                    clock=lambda: now[0], sleep=sleep)
+      datagrams = [sink.recv(1024) for _ in range(3)]
+    self.assertEqual(lateness, 0.0)
+    self.assertEqual(len(sleeps), 2)
+    self.assertEqual(b"".join(datagrams), packets.tobytes())
+
+
+if __name__ == '__main__':
+  unittest.main()
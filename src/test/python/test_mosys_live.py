@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+'''Mo-Sys live F4 source tests'''
+
+import asyncio
+import itertools
+import socket
+import unittest
+
+from camdkit.mosys.f4 import F4, F4StreamDecoder
+from camdkit.mosys.live import F4LiveSource
+
+F4_FILE = "src/test/resources/mosys/A003_C001_01 15-03-47-01.f4"
+
+def _packets(count: int) -> list[bytes]:
+  with open(F4_FILE, "rb") as fp:
+    data = fp.read()
+  return [data[i * 105:(i + 1) * 105] for i in range(count)]
+
+def _zero_focus_distance(packet: bytes) -> bytes:
+  # the same packet with an inverse focus distance of 0
+  data = bytearray(packet)
+  for block in range(4, len(data) - 1, 5):
+    if data[block] == F4.FIELD_ID_FOCAL_DISTANCE:
+      data[block + 1:block + 5] = bytes(4)
+  data[-1] = (0x40 - sum(data[:-1])) % 256
+  return bytes(data)
+
+class _Clock:
+
+  def __init__(self):
+    self.now = 1000.0
+
+  def __call__(self) -> float:
+    return self.now
+
+class F4LiveSourceTest(unittest.TestCase):
+
+  def test_stream_pieces(self):
+    packets = _packets(10)
+    corrupted = bytearray(packets[3])
+    corrupted[20] ^= 0x40
+    stream = b"".join(packets[:3]) + bytes(corrupted) + b"\x00\x01" + b"".join(packets[4:])
+    source = F4LiveSource()
+    for start in range(0, len(stream), 37):
+      source.feed(stream[start:start + 37])
+    self.assertEqual([frame.index for frame in source.ring], list(range(9)))
+    self.assertEqual([frame.clip.timing_sequence_number[0] for frame in source.ring],
+                     [packet[3] % 16 for packet in packets if packet != packets[3]])
+    self.assertEqual(len({frame.clip.source_id[0] for frame in source.ring}), 1)
+    statistics = source.statistics()
+    self.assertEqual(statistics.packets, 9)
+    # resynchronising may also try command bytes within the corrupted packet
+    self.assertGreaterEqual(statistics.checksum_errors, 1)
+    self.assertEqual(statistics.bytes_skipped, 105 + 2)
+    self.assertEqual(statistics.bytes, len(stream))
+
+  def test_undecodable_packet(self):
+    packets = _packets(3)
+    source = F4LiveSource()
+    source.feed(packets[0] + _zero_focus_distance(packets[1]) + packets[2][:50])
+    source.feed(packets[2][50:])
+    source.feed_datagram(_zero_focus_distance(packets[0]))
+    source.feed(packets[0])
+    self.assertEqual([frame.clip.timing_sequence_number[0] for frame in source.ring],
+                     [packets[0][3] % 16, packets[2][3] % 16, packets[0][3] % 16])
+    statistics = source.statistics()
+    self.assertEqual(statistics.packets, 5)
+    self.assertEqual(statistics.decode_errors, 2)
+    self.assertEqual(statistics.bytes_skipped, 0)
+
+  def test_datagrams(self):
+    packets = _packets(3)
+    source = F4LiveSource()
+    source.feed_datagram(packets[0])
+    source.feed_datagram(packets[1][:50])
+    source.feed_datagram(packets[2] + packets[0])
+    self.assertEqual(len(source.ring), 3)
+    self.assertEqual(source.statistics().bytes_skipped, 50)
+    self.assertEqual(source.statistics().datagrams, 3)
+
+  def test_ring_and_rates(self):
+    clock = _Clock()
+    source = F4LiveSource(ring_size=4, clock=clock)
+    source.report()
+    for packet in _packets(10):
+      source.feed_datagram(packet)
+    clock.now += 2.0
+    statistics = source.report()
+    self.assertEqual(len(source.ring), 4)
+    self.assertEqual(source.latest().index, 9)
+    self.assertEqual(source.latest().received, 1000.0)
+    self.assertEqual(statistics.packets_per_second, 5.0)
+    self.assertEqual(statistics.bytes_per_second, 525.0)
+    clock.now += 1.0
+    self.assertEqual(source.report().packets_per_second, 0.0)
+
+  def test_slow_consumer(self):
+    async def consume() -> list[int]:
+      source = F4LiveSource(ring_size=4)
+      frames = source.frames()
+      first = asyncio.ensure_future(anext(frames))
+      await asyncio.sleep(0)
+      packets = _packets(10)
+      source.feed_datagram(packets[0])
+      indices = [(await first).index]
+      for packet in packets[1:]:
+        source.feed_datagram(packet)
+      source.close()
+      indices += [frame.index async for frame in frames]
+      self.assertEqual(source.statistics().frames_dropped, 5)
+      return indices
+
+    self.assertEqual(asyncio.run(consume()), [0, 6, 7, 8, 9])
+
+  def test_stream_reader(self):
+    async def read() -> F4LiveSource:
+      reader = asyncio.StreamReader()
+      for packet in _packets(5):
+        reader.feed_data(packet[:60])
+        reader.feed_data(packet[60:])
+      reader.feed_eof()
+      source = F4LiveSource()
+      await source.read_stream(reader)
+      return source
+
+    source = asyncio.run(read())
+    self.assertTrue(source.closed)
+    self.assertEqual(len(source.ring), 5)
+
+  def test_udp(self):
+    packets = _packets(20)
+    received = []
+
+    async def run() -> None:
+      source = F4LiveSource()
+      transport = await source.open_udp("127.0.0.1", 0)
+      port = transport.get_extra_info("sockname")[1]
+
+      async def consume() -> None:
+        async for frame in source.frames():
+          received.append(frame)
+          if frame.index == len(packets) - 1:
+            return
+
+      consumer = asyncio.ensure_future(consume())
+      await asyncio.sleep(0)
+      with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+        for i, packet in enumerate(packets):
+          if i == 7:
+            sender.sendto(b"\xf4garbage", ("127.0.0.1", port))
+          sender.sendto(packet, ("127.0.0.1", port))
+          await asyncio.sleep(0.001)
+      try:
+        await asyncio.wait_for(consumer, 5.0)
+      finally:
+        transport.close()
+      statistics = source.statistics()
+      self.assertEqual(statistics.datagrams, 21)
+      self.assertEqual(statistics.packets, 20)
+
+    asyncio.run(run())
+    self.assertEqual([frame.index for frame in received], list(range(20)))
+    expected = [packet.status % 16 for packet in itertools.islice(F4StreamDecoder(b"".join(packets)), 20)]
+    self.assertEqual([frame.clip.timing_sequence_number[0] for frame in received], expected)
+
+
+if __name__ == '__main__':
+  unittest.main()
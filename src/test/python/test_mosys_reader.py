@@ -6,6 +6,9 @@
 
 '''Mo-Sys tracking data reader tests'''
 
+import concurrent.futures
+import copy
+import itertools
 import unittest
 import uuid
 
@@ -15,7 +18,7 @@
                                FizEncoders, Distortion, ProjectionOffset)
 from camdkit.model import OPENTRACKIO_PROTOCOL_NAME, OPENTRACKIO_PROTOCOL_VERSION
 from camdkit.mosys import reader
-from camdkit.mosys.f4 import F4PacketParser
+from camdkit.mosys.f4 import F4AxisBlock, F4PacketParser, F4StreamDecoder
 
 class MoSysReaderTest(unittest.TestCase):
   
@@ -24,6 +27,7 @@ def test_reader(self):
 
     # Frame count contract: to_clip(f, n) must return exactly n frames (not n+1)
     self.assertEqual(len(clip.sample_id), 20)
+    self.assertEqual(len(set(clip.source_id)), 1)
 
     # Test parameters against known values across multiple frames
     self.assertEqual(clip.protocol[0].name, OPENTRACKIO_PROTOCOL_NAME)
@@ -72,3 +76,132 @@ def test_no_focal_length_axis_does_not_crash(self):
     self.assertTrue(parser.initialise(self._PACKET_NO_FOCAL_LENGTH))
     frame = parser.get_tracking_frame()
     self.assertIsNone(frame.lens_pinhole_focal_length)
+
+
+  def test_parsers_do_not_share_state(self):
+    first = F4PacketParser()
+    second = F4PacketParser(source_id="urn:uuid:00000000-0000-4000-8000-000000000001")
+    self.assertNotEqual(first.source_id, second.source_id)
+    self.assertTrue(first.initialise(self._PACKET_NO_FOCAL_LENGTH))
+    self.assertIsNot(first._packet, second._packet)
+    self.assertIsNot(first._packet.axis_block_list, second._packet.axis_block_list)
+    self.assertEqual(second._packet.axis_block_list, [])
+    self.assertEqual(second.get_tracking_frame().source_id, None)
+
+  def test_parser_reuse(self):
+    with open("src/test/resources/mosys/A003_C001_01 15-03-47-01.f4", "rb") as fp:
+      data = fp.read()
+    parser = F4PacketParser()
+    self.assertTrue(parser.initialise(data))
+    first_blocks = list(parser._packet.axis_block_list)
+    first_frame = parser.get_tracking_frame()
+    self.assertTrue(parser.initialise(data, parser._packet.size))
+    self.assertEqual(parser._packet.axis_block_list, first_blocks)
+    second_frame = parser.get_tracking_frame()
+    self.assertEqual(first_frame.source_id, second_frame.source_id)
+    self.assertEqual(second_frame.source_id[0], parser.source_id)
+    self.assertNotEqual(first_frame.timing_sequence_number, second_frame.timing_sequence_number)
+
+  def test_to_frame(self):
+    with open("src/test/resources/mosys/A003_C001_01 15-03-47-01.f4", "rb") as f4_file:
+      data = f4_file.read()
+    success, first, size = reader.to_frame(data)
+    self.assertTrue(success)
+    success, second, _ = reader.to_frame(data[size:])
+    self.assertTrue(success)
+    self.assertEqual(first.source_id, second.source_id)
+    parser = F4PacketParser()
+    _, frame, _ = reader.to_frame(data, parser)
+    self.assertEqual(frame.source_id, (parser.source_id,))
+
+  def test_frames_do_not_share_protocol(self):
+    with open("src/test/resources/mosys/A003_C001_01 15-03-47-01.f4", "rb") as fp:
+      data = fp.read(210)
+    parser = F4PacketParser()
+    self.assertTrue(parser.initialise(data))
+    first_frame = parser.get_tracking_frame()
+    other_frame = parser.get_tracking_frame()
+    copied = copy.deepcopy(first_frame)
+    copied.protocol[0].version = (9, 9, 9)
+    first_frame.protocol[0].version = (8, 8, 8)
+    other_parser = F4PacketParser()
+    self.assertTrue(other_parser.initialise(data, 105))
+    for frame in (other_frame, other_parser.get_tracking_frame()):
+      self.assertEqual(frame.protocol[0].version, OPENTRACKIO_PROTOCOL_VERSION)
+    self.assertEqual(copied.protocol[0].version, (9, 9, 9))
+
+  def test_parallel_parsers(self):
+    with open("src/test/resources/mosys/A003_C001_01 15-03-47-01.f4", "rb") as fp:
+      data = fp.read()
+    packets = list(itertools.islice(F4StreamDecoder(data), 40))
+    offsets = list(itertools.accumulate((p.size for p in packets[:-1]), initial=0))
+
+    def translations(parser: F4PacketParser) -> list:
+      result = []
+      for offset in offsets:
+        self.assertTrue(parser.initialise(data, offset))
+        result.append(parser.get_tracking_frame().transforms[0][0].translation)
+      return result
+
+    expected = translations(F4PacketParser())
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+      results = list(executor.map(lambda _: translations(F4PacketParser()), range(8)))
+    for result in results:
+      self.assertEqual(result, expected)
+
+    def default_parser_frames(_) -> list:
+      return [reader.to_frame(data[offset:])[1] for offset in offsets]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+      results = list(executor.map(default_parser_frames, range(8)))
+    for frames in results:
+      self.assertEqual([frame.transforms[0][0].translation for frame in frames], expected)
+    self.assertEqual(len({frame.source_id for frames in results for frame in frames}), 1)
+
+
+class F4StreamDecoderTest(unittest.TestCase):
+
+  _PACKET = MoSysF4ParserUnitTest._PACKET_NO_FOCAL_LENGTH
+
+  def test_decode(self):
+    decoder = F4StreamDecoder(self._PACKET * 3)
+    packets = list(decoder)
+    self.assertEqual(len(packets), 3)
+    self.assertEqual(decoder.packets_decoded, 3)
+    self.assertEqual(decoder.offset, 3 * len(self._PACKET))
+    packet = packets[1]
+    self.assertEqual((packet.camera_id, packet.axis_count, packet.size), (1, 2, 15))
+    self.assertEqual([block.axis_id for block in packet.axis_block_list], [0xf8, 0x03])
+    self.assertEqual(packet.axis_block_list[1].data_bits2, 0x80)
+
+  def test_resync(self):
+    corrupted = bytearray(self._PACKET)
+    corrupted[7] ^= 0x01
+    data = b"\x00\x01" + self._PACKET + bytes(corrupted) + b"\xf4\x00" + self._PACKET
+    decoder = F4StreamDecoder(data)
+    packets = list(decoder)
+    self.assertEqual(len(packets), 2)
+    self.assertEqual(decoder.checksum_errors, 1)
+    self.assertEqual(decoder.bytes_skipped, 2 + len(self._PACKET) + 2)
+    self.assertEqual(decoder.offset, len(data))
+
+  def test_truncated(self):
+    decoder = F4StreamDecoder(self._PACKET + self._PACKET[:10])
+    self.assertEqual(len(list(decoder)), 1)
+    self.assertEqual(decoder.offset, len(self._PACKET))
+
+  @staticmethod
+  def _fields(block: F4AxisBlock) -> tuple:
+    return tuple(getattr(block, name) for name in F4AxisBlock.__slots__)
+
+  def test_reader_matches_packet_parser(self):
+    with open("src/test/resources/mosys/A003_C001_01 15-03-47-01.f4", "rb") as fp:
+      data = fp.read()
+    offset = 0
+    for packet in itertools.islice(F4StreamDecoder(data), 20):
+      parser = F4PacketParser()
+      self.assertTrue(parser.initialise(data[offset:]))
+      self.assertEqual(packet.size, parser._packet.size)
+      self.assertEqual([self._fields(block) for block in packet.axis_block_list],
+                       [self._fields(block) for block in parser._packet.axis_block_list])
+      offset += packet.size
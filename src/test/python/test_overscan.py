@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""Tests for overscan computation"""
+
+import unittest
+
+import numpy as np
+
+from camdkit.camera_types import PhysicalDimensions
+from camdkit.clip import Clip
+from camdkit.distortion import BROWN_CONRADY_U_D
+from camdkit.lens_types import Distortion, ProjectionOffset
+from camdkit.overscan import boundary_points, overscan_factors, fill_overscan
+
+SENSOR = PhysicalDimensions(width=36.0, height=24.0)
+
+
+class OverscanTestCases(unittest.TestCase):
+
+    def test_boundary_points_lie_on_the_screen_edges(self):
+        x, y = boundary_points(SENSOR, 5)
+        self.assertEqual(len(x), 20)
+        on_vertical_edge = np.isclose(np.abs(x), 18.0)
+        on_horizontal_edge = np.isclose(np.abs(y), 12.0)
+        self.assertTrue(np.all(on_vertical_edge | on_horizontal_edge))
+
+    def test_no_distortion_needs_no_overscan(self):
+        factors = overscan_factors([Distortion(radial=(0.0,))], SENSOR)
+        np.testing.assert_array_equal(factors, [1.0])
+
+    def test_radial_distortion(self):
+        k1 = 1e-4
+        factors = overscan_factors([Distortion(radial=(k1,)), Distortion(radial=(-k1,))], SENSOR)
+        # the corner sets the width: x (1 + k1 r^2) at the corner (18, 12)
+        expected = 1.0 + k1 * (18.0 ** 2 + 12.0 ** 2)
+        self.assertAlmostEqual(factors[0], expected)
+        # pincushion needs no overscan to fill the screen
+        self.assertEqual(factors[1], 1.0)
+
+    def test_undistortion_of_inverse_model(self):
+        d_u = Distortion(radial=(-1e-4,))
+        u_d = Distortion(model=BROWN_CONRADY_U_D, radial=(-1e-4,))
+        self.assertAlmostEqual(overscan_factors([u_d], SENSOR, undistortion=True)[0],
+                               overscan_factors([d_u], SENSOR)[0])
+        self.assertGreater(overscan_factors([d_u], SENSOR, undistortion=True)[0], 1.0)
+
+    def test_projection_offset_increases_overscan(self):
+        distortion = Distortion(radial=(1e-4,))
+        centred = overscan_factors([distortion], SENSOR)[0]
+        offset = overscan_factors([distortion], SENSOR, projection_offsets=[ProjectionOffset(1.0, 0.0)])[0]
+        self.assertGreater(offset, centred)
+
+    def test_fill_overscan(self):
+        clip = Clip()
+        clip.active_sensor_physical_dimensions = SENSOR
+        clip.lens_distortions = ((Distortion(radial=(1e-4,)),),
+                                 (Distortion(radial=(2e-4,)),),
+                                 (Distortion(radial=(2e-4,), overscan=1.5),))
+        fill_overscan(clip)
+        overscans = [frame[0].overscan for frame in clip.lens_distortions]
+        self.assertAlmostEqual(overscans[0], 1.0468)
+        self.assertAlmostEqual(overscans[1], 1.0936)
+        self.assertEqual(overscans[2], 1.5)
+        self.assertEqual(clip.lens_distortion_overscan_max, 1.5)
+        # undistorting barrel distortion shrinks the plate, so it needs no overscan
+        self.assertEqual(clip.lens_undistortion_overscan_max, 1.0)
+        clip.lens_distortion_overscan_max = 2.0
+        fill_overscan(clip)
+        self.assertEqual(clip.lens_distortion_overscan_max, 2.0)
+        fill_overscan(clip, overwrite=True)
+        self.assertAlmostEqual(clip.lens_distortions[2][0].overscan, 1.0936)
+        self.assertAlmostEqual(clip.lens_distortion_overscan_max, 1.0936)
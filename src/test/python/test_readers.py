@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""Tests for the reader registry"""
+
+import glob
+import os
+import shutil
+import tempfile
+import unittest
+
+import camdkit.arri.reader
+import camdkit.readers
+from camdkit.readers import FileRole, ReaderPlugin
+
+RESOURCES = "src/test/resources"
+
+
+class ReaderRegistryTestCases(unittest.TestCase):
+
+    def test_sniffing(self):
+        expected = {
+            "arri/B001C001_180327_R1ZA.mov.csv": ("arri", FileRole.COMPLETE),
+            "bmd/metadata.txt": ("bmd", FileRole.COMPLETE),
+            "canon/20221007_TNumber_CanonCameraMetadata_Static.csv": ("canon", FileRole.STATIC),
+            "canon/20221007_TNumber_CanonCameraMetadata_Frames.csv": ("canon", FileRole.FRAMES),
+            "red/A001_C066_0303LZ_001.static.csv": ("red", FileRole.STATIC),
+            "red/A001_C066_0303LZ_001.frames.csv": ("red", FileRole.FRAMES),
+            "venice/D001C005_210716AGM01.xml": ("venice", FileRole.STATIC),
+            "venice/D001C005_210716AG.csv": ("venice", FileRole.FRAMES),
+            "mosys/A003_C001_01 15-03-47-01.f4": ("mosys", FileRole.COMPLETE),
+        }
+        for path, (name, role) in expected.items():
+            plugin, sniffed_role = camdkit.readers.sniff(os.path.join(RESOURCES, path))
+            self.assertEqual((plugin.name, sniffed_role), (name, role), path)
+        self.assertIsNone(camdkit.readers.sniff(os.path.join(RESOURCES, "arri/README.txt")))
+
+    def test_group_takes(self):
+        paths = sorted(path for vendor in ("arri", "bmd", "canon", "mosys", "red", "venice")
+                       for path in glob.glob(os.path.join(RESOURCES, vendor, "*")))
+        takes, unrecognised = camdkit.readers.group_takes(paths)
+        self.assertEqual(sorted(t.plugin.name for t in takes),
+                         ["arri", "bmd", "canon", "mosys", "red", "venice"])
+        self.assertTrue(all(t.complete for t in takes))
+        self.assertTrue(all(p.endswith("README.txt") for p in unrecognised))
+
+    def test_group_takes_errors(self):
+        with tempfile.TemporaryDirectory() as directory:
+            venice = [shutil.copy(os.path.join(RESOURCES, "venice", name), directory)
+                      for name in ("D001C005_210716AG.csv", "D001C005_210716AGM01.xml")]
+            copy = shutil.copy(venice[1], os.path.join(directory, "D001C005_210716AGM02.xml"))
+            missing = os.path.join(directory, "missing.csv")
+            with self.assertRaises(ValueError):
+                camdkit.readers.group_takes([venice[1], copy])
+            with self.assertRaises(OSError):
+                camdkit.readers.group_takes([missing])
+            errors = {}
+            takes, unrecognised = camdkit.readers.group_takes(
+                venice + [copy, missing, os.path.join(RESOURCES, "bmd/metadata.txt")], errors)
+        self.assertEqual([t.plugin.name for t in takes], ["bmd"])
+        self.assertEqual(unrecognised, [])
+        self.assertEqual(errors.keys(), {venice[0], venice[1], copy, missing})
+        self.assertIn("both claim to be the static file", errors[copy])
+        self.assertIn("FileNotFoundError", errors[missing])
+
+    def test_open_clip(self):
+        path = os.path.join(RESOURCES, "arri/B001C001_180327_R1ZA.mov.csv")
+        self.assertEqual(camdkit.readers.open_clip(path).to_json(),
+                         camdkit.arri.reader.to_clip(path).to_json())
+        clip = camdkit.readers.open_clip([os.path.join(RESOURCES, "venice/D001C005_210716AG.csv"),
+                                          os.path.join(RESOURCES, "venice/D001C005_210716AGM01.xml")])
+        self.assertEqual(clip.camera_model, "MPC-3610")
+        with self.assertRaises(ValueError):
+            camdkit.readers.open_clip(os.path.join(RESOURCES, "red/A001_C066_0303LZ_001.static.csv"))
+        with self.assertRaises(ValueError):
+            camdkit.readers.open_clip([path, os.path.join(RESOURCES, "bmd/metadata.txt")])
+
+    def test_register(self):
+        plugin = ReaderPlugin("test", (".test",),
+                              lambda path, header: FileRole.COMPLETE if header.startswith(b"TEST") else None,
+                              lambda files: None)
+        camdkit.readers.register(plugin)
+        try:
+            with self.assertRaises(ValueError):
+                camdkit.readers.register(plugin)
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "take.test")
+                with open(path, "wb") as fp:
+                    fp.write(b"TEST")
+                self.assertIs(camdkit.readers.sniff(path)[0], plugin)
+        finally:
+            camdkit.readers.unregister("test")
+        self.assertNotIn(plugin, camdkit.readers.plugins())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,7 @@
 
 '''RED camera reader tests'''
 
+import io
 import unittest
 
 import camdkit.red.reader
@@ -54,3 +55,23 @@ def test_reader(self):
       clip.active_sensor_physical_dimensions,
       camdkit.model.Dimensions(width=(4096 * 5 / 1000.0), height=(2160 * 5 / 1000.0))
     )
+
+  def test_lens_data_packets_of_different_lengths(self):
+    with open("src/test/resources/red/A001_C066_0303LZ_001.frames.csv", "r", encoding="utf-8") as type_5_file:
+      lines = type_5_file.readlines()
+    lines[2] = lines[2].rstrip("\r\n") + "/00\n"
+    with open("src/test/resources/red/A001_C066_0303LZ_001.static.csv", "r", encoding="utf-8") as type_3_file:
+      clip = camdkit.red.reader.to_clip(type_3_file, io.StringIO("".join(lines)))
+
+    self.assertEqual(clip.lens_t_number, (5.6, 5.6))
+
+    # a truncated packet leaves the lens data unset rather than failing the clip
+    lines[1] = lines[1][:lines[1].rindex(",") + 10] + "\n"
+    with open("src/test/resources/red/A001_C066_0303LZ_001.static.csv", "r", encoding="utf-8") as type_3_file:
+      clip = camdkit.red.reader.to_clip(type_3_file, io.StringIO("".join(lines)))
+
+    self.assertEqual(clip.lens_focus_distance[0], 410)
+
+    self.assertIsNone(clip.lens_t_number)
+
+    self.assertIsNone(clip.lens_entrance_pupil_offset)
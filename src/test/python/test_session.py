@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+import json
+import os
+import tempfile
+import unittest
+import uuid
+
+import cbor2
+import numpy as np
+
+from camdkit.clip import Clip
+from camdkit.session import Session, load_clip
+from camdkit.timing_types import Timecode
+
+
+def source_clip(source_number: int, start_seconds: int, count: int, rate: int = 25,
+                camera_label: str | None = None) -> Clip:
+    clip = Clip()
+    clip.source_id = (uuid.uuid4().urn,) * count
+    clip.source_number = (source_number,) * count
+    clip.timing_timecode = tuple(Timecode(hours=10, minutes=0, seconds=start_seconds + i // rate,
+                                          frames=i % rate, frame_rate=rate)
+                                 for i in range(count))
+    clip.camera_label = camera_label
+    return clip
+
+
+class SessionTestCases(unittest.TestCase):
+
+    def setUp(self):
+        self.session = Session()
+        self.a = self.session.add(source_clip(1, 0, 50, camera_label="A"))
+        self.b = self.session.add(source_clip(2, 1, 50, camera_label="B"))
+        self.c = self.session.add(source_clip(1, 10, 25))
+
+    def test_source_indexes(self):
+        self.assertEqual(self.session.by_source_number(1), [self.a, self.c])
+        self.assertEqual(self.session.by_camera_label("B"), [self.b])
+        self.assertEqual(self.session.by_source_id(self.b.source_id), [self.b])
+        self.assertEqual(self.session.by_source_number(3), [])
+        self.assertEqual(len(self.session), 3)
+
+    def test_overlapping(self):
+        base = 36000.0
+        self.assertEqual(self.session.overlapping(base, base + 0.5), [self.a])
+        self.assertEqual(self.session.overlapping(base + 1.5, base + 12), [self.a, self.b, self.c])
+        self.assertEqual(self.session.overlapping(base + 5, base + 9), [])
+
+    def test_at(self):
+        base = 36000.0
+        self.assertEqual(self.session.at(base + 1.5), [(self.a, 37), (self.b, 12)])
+        self.assertEqual(self.session.at(base + 1.51), [(self.a, 38), (self.b, 13)])
+        self.assertEqual(self.session.at(base + 10), [(self.c, 0)])
+        self.assertEqual(self.session.at(base + 1.99), [(self.b, 25)])
+        self.assertEqual(self.session.at(base + 2.01, tolerance=0.06), [(self.a, 49), (self.b, 25)])
+        self.assertEqual(self.session.at(base + 20), [])
+
+    def test_at_many_sources(self):
+        session = Session()
+        for number in range(50):
+            session.add(source_clip(number, number % 5, 250))
+        frames = session.at(36004.0)
+        self.assertEqual(len(frames), 50)
+        self.assertTrue(all(member.times[frame] == 36004.0 for member, frame in frames))
+
+    def test_invalid_members(self):
+        with self.assertRaises(ValueError):
+            Session().add(Clip())
+        clip = source_clip(1, 0, 2)
+        clip.timing_timecode = tuple(reversed(clip.timing_timecode))
+        with self.assertRaises(ValueError):
+            Session().add(clip)
+
+    def test_lazy_loading(self):
+        loaded = []
+
+        def loader(path: str) -> Clip:
+            loaded.append(path)
+            return load_clip(path)
+
+        with tempfile.TemporaryDirectory() as directory:
+            session = Session()
+            for name, clip in (("a.json", source_clip(1, 0, 50)), ("b.cbor", source_clip(2, 1, 50))):
+                path = os.path.join(directory, name)
+                if name.endswith(".json"):
+                    with open(path, "w", encoding="utf-8") as fp:
+                        json.dump(clip.to_json(), fp)
+                else:
+                    with open(path, "wb") as fp:
+                        cbor2.dump(clip.to_json(), fp)
+                member = session.add_file(path, loader=loader)
+                self.assertFalse(member.loaded)
+            irregular = source_clip(3, 0, 3)
+            irregular.timing_timecode = irregular.timing_timecode[:2] + (irregular.timing_timecode[0].model_copy(
+                update={"frames": 5}),)
+            session.add(irregular, os.path.join(directory, "c.json"))
+            self.assertEqual(len(loaded), 2)
+            index_path = os.path.join(directory, "session.json")
+            session.save(index_path)
+
+            reopened = Session.open(index_path, loader=loader)
+            self.assertEqual(len(loaded), 2)
+            self.assertEqual([m.source_number for m in reopened], [1, 2, 3])
+            for original, member in zip(session, reopened):
+                self.assertTrue(np.allclose(original.times, member.times, rtol=0, atol=1e-6))
+            member, frame = reopened.at(36001.0)[1]
+            self.assertEqual(member.source_number, 2)
+            self.assertFalse(member.loaded)
+            self.assertEqual(member.clip.timing_timecode[frame].seconds, 1)
+            self.assertEqual(len(loaded), 3)
+            member.clip
+            self.assertEqual(len(loaded), 3)
+            member.unload()
+            self.assertFalse(member.loaded)
+
+    def test_save_requires_paths(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(ValueError):
+                self.session.save(os.path.join(directory, "session.json"))
+
+
+if __name__ == '__main__':
+    unittest.main()
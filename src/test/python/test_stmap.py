@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+"""Tests for ST map generation"""
+
+import io
+import unittest
+
+import numpy as np
+
+from camdkit.camera_types import PhysicalDimensions, SenselDimensions
+from camdkit.clip import Clip
+from camdkit.lens_types import Distortion, ProjectionOffset
+from camdkit.stmap import STMapCache, STMapDirection, st_map, st_maps, write_st_map
+
+RESOLUTION = SenselDimensions(width=64, height=36)
+SENSOR = PhysicalDimensions(width=36.0, height=20.25)
+
+
+class STMapTestCases(unittest.TestCase):
+
+    def test_identity_map(self):
+        st = st_map(RESOLUTION, SENSOR, Distortion(radial=(0.0,)))
+        self.assertEqual(st.shape, (36, 64, 2))
+        self.assertEqual(st.dtype, np.float32)
+        self.assertAlmostEqual(float(st[0, 0, 0]), 0.5 / 64, places=6)
+        self.assertAlmostEqual(float(st[0, 0, 1]), 1.0 - 0.5 / 36, places=6)
+        self.assertAlmostEqual(float(st[-1, -1, 0]), 1.0 - 0.5 / 64, places=6)
+        self.assertAlmostEqual(float(st[-1, -1, 1]), 0.5 / 36, places=6)
+
+    def test_barrel_distortion_samples_inside_the_plate(self):
+        # undistorting barrel distortion pulls the corners in from the plate edge
+        barrel = Distortion(radial=(1e-4,))
+        st = st_map(RESOLUTION, SENSOR, barrel, direction=STMapDirection.UNDISTORT)
+        self.assertGreater(float(st[0, 0, 0]), 0.5 / 64)
+        st = st_map(RESOLUTION, SENSOR, barrel, direction=STMapDirection.DISTORT)
+        self.assertLess(float(st[0, 0, 0]), 0.5 / 64)
+        st = st_map(RESOLUTION, SENSOR, barrel, direction=STMapDirection.DISTORT, overscan=1.5)
+        self.assertGreater(float(st[0, 0, 0]), 0.0)
+
+    def test_cache_reuses_identical_lens_states(self):
+        cache = STMapCache()
+        first = cache.get(RESOLUTION, SENSOR, Distortion(radial=(1e-4, 2e-7)))
+        second = cache.get(RESOLUTION, SENSOR, Distortion(radial=(1e-4 + 1e-18, 2e-7)))
+        self.assertIs(first, second)
+        self.assertFalse(first.flags.writeable)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache.get(RESOLUTION, SENSOR, Distortion(radial=(1e-4, 2e-7)), projection_offset=ProjectionOffset(0.1, 0.0))
+        self.assertEqual((len(cache), cache.misses), (2, 2))
+
+    def test_cache_evicts_least_recently_used(self):
+        map_bytes = RESOLUTION.width * RESOLUTION.height * 2 * 4
+        cache = STMapCache(max_bytes=2 * map_bytes)
+        a, b, c = (Distortion(radial=(k,)) for k in (1e-4, 2e-4, 3e-4))
+        cache.get(RESOLUTION, SENSOR, a)
+        cache.get(RESOLUTION, SENSOR, b)
+        cache.get(RESOLUTION, SENSOR, a)
+        cache.get(RESOLUTION, SENSOR, c)
+        self.assertEqual((len(cache), cache.nbytes), (2, 2 * map_bytes))
+        cache.get(RESOLUTION, SENSOR, a)
+        self.assertEqual(cache.hits, 2)
+        cache.get(RESOLUTION, SENSOR, b)
+        self.assertEqual(cache.misses, 4)
+
+    def test_clip_maps(self):
+        clip = Clip()
+        clip.active_sensor_physical_dimensions = SENSOR
+        clip.active_sensor_resolution = RESOLUTION
+        clip.lens_distortions = ((Distortion(radial=(1e-4,)),),) * 3 + ((Distortion(radial=(2e-4,)),),)
+        cache = STMapCache()
+        maps = list(st_maps(clip, cache=cache))
+        self.assertEqual(len(maps), 4)
+        self.assertIs(maps[0], maps[2])
+        self.assertEqual(cache.misses, 2)
+        buffer = io.BytesIO()
+        write_st_map(buffer, maps[3])
+        self.assertEqual(len(buffer.getvalue()), maps[3].nbytes)
+        np.testing.assert_array_equal(np.frombuffer(buffer.getvalue(), dtype="<f4").reshape(maps[3].shape), maps[3])
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright Contributors to the SMTPE RIS OSVP Metadata Project
+
+import struct
+import unittest
+
+from camdkit.transport import (HEADER_LENGTH, MAX_PAYLOAD_SIZE, PayloadFormat, Reassembler, Segmenter,
+                               decode_payload, encode_payload, fletcher16, multicast_group)
+
+
+def reference_fletcher16(data: bytes) -> int:
+    # as in src/test/python/parser/opentrackio_lib.py
+    sum1 = sum2 = 0
+    for byte in data:
+        sum1 = (sum1 + byte) % 256
+        sum2 = (sum2 + sum1) % 256
+    return (sum2 << 8) | sum1
+
+
+class TransportTestCases(unittest.TestCase):
+
+    def test_fletcher16(self):
+        for data in (b"", b"\x01", b"OTrk\x00\x02", bytes(range(256)) * 20):
+            self.assertEqual(fletcher16(data), reference_fletcher16(data))
+
+    def test_multicast_group(self):
+        self.assertEqual(multicast_group(3), "239.135.1.3")
+        with self.assertRaises(ValueError):
+            multicast_group(201)
+
+    def test_header(self):
+        segmenter = Segmenter(sequence_number=0xFFFF)
+        payload = encode_payload({"sampleId": "x"}, PayloadFormat.JSON)
+        (segment,) = segmenter.segments(payload, PayloadFormat.JSON)
+        self.assertEqual(segment[:4], b"OTrk")
+        self.assertEqual(segment[5], PayloadFormat.JSON)
+        self.assertEqual(struct.unpack("!HIH", segment[6:14]), (0xFFFF, 0, 0x8000 | len(payload)))
+        self.assertEqual(struct.unpack("!H", segment[14:16])[0],
+                         reference_fletcher16(segment[:14] + segment[16:]))
+        self.assertEqual(segment[HEADER_LENGTH:], payload)
+        self.assertEqual(segmenter.sequence_number, 0)
+
+    def test_segmentation(self):
+        sample = {"notes": "x" * 4000, "values": list(range(100))}
+        for payload_format in PayloadFormat:
+            payload = encode_payload(sample, payload_format)
+            segments = Segmenter().segments(payload, payload_format)
+            self.assertEqual(len(segments), -(-len(payload) // MAX_PAYLOAD_SIZE))
+            self.assertTrue(all(len(segment) <= HEADER_LENGTH + MAX_PAYLOAD_SIZE for segment in segments))
+            reassembler = Reassembler()
+            results = [reassembler.feed(segment) for segment in segments]
+            self.assertTrue(all(result is None for result in results[:-1]))
+            self.assertEqual(results[-1], (payload_format, payload))
+            self.assertEqual(decode_payload(results[-1][1], payload_format), sample)
+
+    def test_reassembly_errors(self):
+        segmenter = Segmenter(max_payload_size=100)
+        payload = bytes(250)
+        first = segmenter.segments(payload, PayloadFormat.CBOR)
+        second = segmenter.segments(payload, PayloadFormat.CBOR)
+        reassembler = Reassembler()
+        corrupted = bytearray(first[1])
+        corrupted[-1] ^= 1
+        self.assertIsNone(reassembler.feed(first[0]))
+        self.assertIsNone(reassembler.feed(bytes(corrupted)))
+        self.assertIsNone(reassembler.feed(first[2]))
+        self.assertEqual(reassembler.errors, 2)
+        for segment in second:
+            result = reassembler.feed(segment)
+        self.assertEqual(result, (PayloadFormat.CBOR, payload))
+        self.assertEqual(reassembler.errors, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,7 @@
 
 '''Sony Venice camera reader tests'''
 
+import io
 import unittest
 
 import camdkit.venice.reader
@@ -53,3 +54,28 @@ def test_reader(self):
       clip.active_sensor_physical_dimensions,
       camdkit.model.Dimensions(width=5674.0 * 5.9375 / 1000.0, height=3192.0 * 5.9375 / 1000.0)
     )
+
+  def test_blank_lines_skipped(self):
+    with open("src/test/resources/venice/D001C005_210716AG.csv", "r", encoding="utf-8") as dynamic_file:
+      lines = dynamic_file.readlines()
+    with open("src/test/resources/venice/D001C005_210716AGM01.xml", "r", encoding="utf-8") as static_file:
+      clip = camdkit.venice.reader.to_clip(static_file, io.StringIO("".join(lines[:3] + ["\n"] + lines[3:] + ["\n"])))
+    with open("src/test/resources/venice/D001C005_210716AGM01.xml", "r", encoding="utf-8") as static_file, \
+      open("src/test/resources/venice/D001C005_210716AG.csv", "r", encoding="utf-8") as dynamic_file:
+      expected = camdkit.venice.reader.to_clip(static_file, dynamic_file)
+    self.assertEqual(clip.duration, expected.duration)
+    self.assertEqual(clip.lens_focus_distance, expected.lens_focus_distance)
+
+  def test_static_metadata(self):
+    with open("src/test/resources/venice/D001C005_210716AGM01.xml", "r", encoding="utf-8") as static_file:
+      metadata = camdkit.venice.reader.read_static_metadata(static_file)
+
+    self.assertEqual(metadata["Item"]["ISOSensitivity"], "500")
+
+    self.assertEqual(metadata["Item"]["LensAttributes"], "7032.0100")
+
+    self.assertEqual(metadata["Camera"]["modelName"], "MPC-3610")
+
+    self.assertEqual(metadata["Main-Board"]["software"], "6.10")
+
+    self.assertEqual(metadata["VideoFrame"]["captureFps"], "24.00p")